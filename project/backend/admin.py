@@ -8,6 +8,11 @@ from .models import (
     ProductParameter,
     Parameter,
     Category,
+    ImportJob,
+    PriceListSource,
+    ImportStage,
+    ParameterFacet,
+    StockHold,
 )
 
 # Регистрируем модели для отображения в админке
@@ -20,6 +25,11 @@ models_to_register = [
     ProductParameter,
     Parameter,
     Category,
+    ImportJob,
+    PriceListSource,
+    ImportStage,
+    ParameterFacet,
+    StockHold,
 ]
 
 for model in models_to_register:
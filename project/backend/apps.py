@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class RetailBackendConfig(AppConfig):
     name = "backend"
     default_auto_field = "django.db.models.BigAutoField"
+
+    def ready(self):
+        from . import signals  # noqa: F401
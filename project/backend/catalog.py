@@ -0,0 +1,115 @@
+from django.db import connection, transaction
+from django.db.models import F, OuterRef, Subquery
+
+from .catalog_cache import bump_catalog_version
+from .models import CatalogEntry, ProductInfo, Shop
+from .search import search_document
+
+
+# Поля строки каталога, которые копируются из ProductInfo без изменений
+ENTRY_FIELDS = ["shop_id", "product_id", "model", "quantity", "price_rrc"]
+
+# Поле строки каталога -> источник значения в связанных таблицах
+ENTRY_NAMES = {
+    "shop_name": F("shop__name"),
+    "product_name": F("product__name"),
+    "category_id": F("product__category_id"),
+    "category_name": F("product__category__name"),
+}
+
+
+def refresh_catalog(infos):
+    """
+    Записывает строки каталога для позиций из QuerySet infos вместе
+    с поисковыми документами: новые добавляет, существующие
+    перезаписывает. Строки удалённых позиций удаляются каскадно вместе
+    с позициями.
+
+    Строки собираются одним INSERT ... SELECT ... ON CONFLICT: значения
+    и документ вычисляются в базе, без выгрузки позиций в Python.
+
+    Возвращает:
+        Количество записанных строк.
+    """
+    rows = (
+        infos.order_by()
+        .annotate(**ENTRY_NAMES)
+        .values("id", *ENTRY_FIELDS, *ENTRY_NAMES)
+        .annotate(search_vector=search_document())
+    )
+    sql, params = rows.query.sql_with_params()
+
+    # Порядок столбцов SELECT: поля модели, затем аннотации
+    meta = CatalogEntry._meta
+    columns = [
+        meta.pk.column,
+        *(meta.get_field(name).column for name in ENTRY_FIELDS),
+        *(meta.get_field(name).column for name in ENTRY_NAMES),
+        meta.get_field("search_vector").column,
+    ]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(meta.db_table)} "
+            f"({', '.join(map(quote, columns))}) {sql} "
+            f"ON CONFLICT ({quote(meta.pk.column)}) DO UPDATE SET "
+            + ", ".join(
+                f"{quote(column)} = EXCLUDED.{quote(column)}"
+                for column in columns[1:]
+            ),
+            params,
+        )
+        return cursor.rowcount
+
+
+def refresh_catalog_quantities(info_ids):
+    """
+    Переносит в каталог остатки позиций info_ids одним UPDATE, например
+    после подтверждения заказа.
+    """
+    return CatalogEntry.objects.filter(pk__in=info_ids).update(
+        quantity=Subquery(
+            ProductInfo.objects.filter(pk=OuterRef("pk")).values("quantity")
+        )
+    )
+
+
+def refresh_shop_catalog(shop_id, batch_size=10000):
+    """
+    Перезаписывает все строки каталога магазина диапазонами по
+    batch_size позиций.
+
+    Возвращает:
+        Количество записанных строк.
+    """
+    written = 0
+    last_id = 0
+    while True:
+        ids = list(
+            ProductInfo.objects.filter(shop_id=shop_id, id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return written
+        written += refresh_catalog(
+            ProductInfo.objects.filter(
+                shop_id=shop_id, id__gte=ids[0], id__lte=ids[-1]
+            )
+        )
+        last_id = ids[-1]
+
+
+def rebuild_catalog(batch_size=10000):
+    """
+    Перезаписывает каталог всех магазинов, каждый в своей транзакции.
+
+    Возвращает:
+        Количество записанных строк.
+    """
+    written = 0
+    for shop_id in Shop.objects.order_by("id").values_list("id", flat=True):
+        with transaction.atomic():
+            written += refresh_shop_catalog(shop_id, batch_size)
+    bump_catalog_version()
+    return written
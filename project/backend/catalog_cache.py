@@ -0,0 +1,164 @@
+import hashlib
+import threading
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+
+from .conditional import query_stamp
+from .models import CatalogCacheStats, CatalogState
+
+
+# ID единственной строки CatalogState и CatalogCacheStats
+STATE_ID = 1
+
+# Счётчики попаданий и промахов, ещё не записанные в базу
+_pending = {"hits": 0, "misses": 0}
+_pending_lock = threading.Lock()
+_flushed_at = time.monotonic()
+
+
+def cache_timeout():
+    """
+    Время жизни ответа каталога в кэше в секундах; 0 отключает кэш.
+    """
+    return getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+
+
+def _create_state():
+    # Версия заводится от текущего времени в микросекундах, а не
+    # от нуля: после пересоздания базы она не совпадёт с версией
+    # ответов, которые ещё лежат в кэше
+    state, _ = CatalogState.objects.get_or_create(
+        pk=STATE_ID, defaults={"version": time.time_ns() // 1000}
+    )
+    return state
+
+
+def catalog_version():
+    """
+    Текущая версия каталога, входящая в ключи кэшированных ответов
+    и ETag списка товаров.
+
+    Версия читается из базы одним запросом по ключу, поэтому изменения
+    каталога из других процессов (обработчика импорта, команд) сразу
+    видны всем процессам сервера при любом бэкенде кэша.
+    """
+    version = (
+        CatalogState.objects.filter(pk=STATE_ID)
+        .values_list("version", flat=True)
+        .first()
+    )
+    if version is None:
+        version = _create_state().version
+    return version
+
+
+def _increment_version():
+    if not CatalogState.objects.filter(pk=STATE_ID).update(
+        version=F("version") + 1
+    ):
+        _create_state()
+        CatalogState.objects.filter(pk=STATE_ID).update(
+            version=F("version") + 1
+        )
+
+
+def bump_catalog_version():
+    """
+    Делает недействительными все кэшированные ответы каталога.
+
+    Версия увеличивается одним UPDATE после фиксации транзакции
+    вызывающего кода, поэтому строка версии не блокируется до конца
+    импорта или подтверждения заказа и они не ждут друг друга. Ответ,
+    собранный между фиксацией и увеличением версии, остаётся под старой
+    версией и сбрасывается вместе с остальными.
+    """
+    transaction.on_commit(_increment_version)
+
+
+def flush_stats():
+    """
+    Записывает накопленные процессом счётчики попаданий и промахов
+    в базу одним UPDATE.
+    """
+    global _flushed_at
+    with _pending_lock:
+        hits, misses = _pending["hits"], _pending["misses"]
+        _pending["hits"] = _pending["misses"] = 0
+        _flushed_at = time.monotonic()
+    if not hits and not misses:
+        return
+    if not CatalogCacheStats.objects.filter(pk=STATE_ID).update(
+        hits=F("hits") + hits, misses=F("misses") + misses
+    ):
+        CatalogCacheStats.objects.get_or_create(pk=STATE_ID)
+        CatalogCacheStats.objects.filter(pk=STATE_ID).update(
+            hits=F("hits") + hits, misses=F("misses") + misses
+        )
+
+
+def _count(name):
+    """
+    Учитывает попадание или промах. Счётчики копятся в памяти процесса
+    и записываются в базу не чаще раза в CATALOG_CACHE_STATS_INTERVAL
+    секунд, чтобы не писать в базу на каждый запрос.
+    """
+    with _pending_lock:
+        _pending[name] += 1
+        due = time.monotonic() - _flushed_at >= getattr(
+            settings, "CATALOG_CACHE_STATS_INTERVAL", 10
+        )
+    if due:
+        flush_stats()
+
+
+def response_key(request, version=None):
+    """
+    Ключ кэша ответа каталога на запрос request при версии каталога
+    version (по умолчанию текущей).
+
+    Параметры запроса нормализуются: порядок параметров и повторов
+    одного параметра на ответ не влияет. Адрес запроса входит в ключ,
+    потому что из него строятся ссылки на соседние страницы.
+    """
+    params = query_stamp(request)
+    digest = hashlib.sha256(
+        f"{request.build_absolute_uri(request.path)}?"
+        f"{urlencode(params)}".encode()
+    ).hexdigest()
+    if version is None:
+        version = catalog_version()
+    return f"catalog:{version}:{digest}"
+
+
+def get_response(key):
+    """
+    Возвращает данные ответа из кэша или None и учитывает попадание
+    или промах.
+    """
+    data = cache.get(key)
+    _count("misses" if data is None else "hits")
+    return data
+
+
+def set_response(key, data):
+    cache.set(key, data, timeout=cache_timeout())
+
+
+def cache_stats():
+    """
+    Счётчики кэша каталога всех процессов: попадания, промахи и текущая
+    версия. Счётчики других процессов учитываются с задержкой до
+    CATALOG_CACHE_STATS_INTERVAL секунд.
+    """
+    flush_stats()
+    stats = CatalogCacheStats.objects.filter(pk=STATE_ID).first()
+    return {
+        "hits": stats.hits if stats else 0,
+        "misses": stats.misses if stats else 0,
+        "version": catalog_version(),
+    }
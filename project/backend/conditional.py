@@ -0,0 +1,60 @@
+import hashlib
+
+from django.utils.cache import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def make_etag(*parts):
+    """
+    Строит ETag из отметок версии данных, от которых зависит ответ.
+    """
+    digest = hashlib.sha256(
+        "|".join(str(part) for part in parts).encode()
+    ).hexdigest()
+    return quote_etag(digest[:32])
+
+
+def query_stamp(request):
+    """
+    Нормализованные параметры запроса для ETag: порядок параметров
+    и повторов одного параметра на ответ не влияет.
+    """
+    return sorted(
+        (name, value)
+        for name in request.query_params
+        for value in request.query_params.getlist(name)
+    )
+
+
+class ETagMixin:
+    """
+    Условный GET по ETag для представлений DRF.
+
+    ETag строится методом get_etag по отметкам версии данных до чтения
+    и сериализации ответа. Если он совпадает с заголовком
+    If-None-Match, клиент получает 304 Not Modified без тела. Проверка
+    выполняется после аутентификации и проверки прав на представление.
+    """
+
+    def get_etag(self, request, *args, **kwargs):
+        """
+        Возвращает ETag ответа или None, если ответ нужно собрать
+        обычным образом.
+        """
+        raise NotImplementedError
+
+    def get(self, request, *args, **kwargs):
+        etag = self.get_etag(request, *args, **kwargs)
+        if etag is not None:
+            # Представления в разных форматах различаются телом
+            etag = make_etag(etag, request.accepted_renderer.format)
+            if etag in parse_etags(request.headers.get("If-None-Match", "")):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag},
+                )
+        response = super().get(request, *args, **kwargs)
+        if etag is not None and response.status_code == status.HTTP_200_OK:
+            response["ETag"] = etag
+        return response
@@ -0,0 +1,91 @@
+import csv
+import io
+import json
+
+try:
+    from orjson import dumps as json_dumps
+except ImportError:
+
+    def json_dumps(value):
+        return json.dumps(value, ensure_ascii=False).encode()
+
+
+# Поля строки выгрузки каталога в порядке колонок CSV
+EXPORT_FIELDS = (
+    "id",
+    "shop_id",
+    "shop_name",
+    "product_id",
+    "product_name",
+    "category_id",
+    "category_name",
+    "model",
+    "quantity",
+    "price_rrc",
+)
+
+# Поле строки выгрузки -> поле строки каталога
+EXPORT_SOURCES = {"id": "pk"}
+
+CONTENT_TYPES = {
+    "jsonl": "application/jsonl; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_rows(queryset, chunk_size):
+    """
+    Перебирает строки каталога queryset кортежами значений EXPORT_FIELDS
+    в порядке ключа.
+
+    Строки читаются курсором на стороне сервера порциями по chunk_size,
+    поэтому в памяти одновременно находится не больше одной порции.
+    """
+    return (
+        queryset.order_by("pk")
+        .values_list(*(EXPORT_SOURCES.get(f, f) for f in EXPORT_FIELDS))
+        .iterator(chunk_size=chunk_size)
+    )
+
+
+def _batches(rows, size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def jsonl_chunks(rows, size):
+    """
+    Кодирует строки выгрузки в JSON Lines кусками по size строк:
+    отдельная запись в ответ на каждую строку обошлась бы дороже самой
+    строки.
+    """
+    for batch in _batches(rows, size):
+        yield b"".join(
+            json_dumps(dict(zip(EXPORT_FIELDS, row))) + b"\n" for row in batch
+        )
+
+
+def csv_chunks(rows, size):
+    """
+    Кодирует строки выгрузки в CSV с заголовком кусками по size строк.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for batch in _batches(rows, size):
+        writer.writerows(batch)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        # Пустая выгрузка: только заголовок
+        yield buffer.getvalue().encode()
+
+
+ENCODERS = {"jsonl": jsonl_chunks, "csv": csv_chunks}
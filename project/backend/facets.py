@@ -0,0 +1,258 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import (
+    Count,
+    Exists,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Q,
+    Sum,
+    Window,
+)
+from django.db.models.functions import RowNumber
+
+from .catalog_cache import bump_catalog_version
+from .models import Shop, Parameter, ParameterFacet, ProductParameter
+from .parameters import typed_values
+
+
+def refresh_shop_facets(shop_id):
+    """
+    Пересчитывает счётчики фасетов одного магазина по параметрам всех
+    его позиций. Нужен для пересборки фасетов; импорт меняет счётчики
+    на разницу через update_shop_facets.
+
+    Возвращает:
+        Количество записанных значений фасетов.
+    """
+    ParameterFacet.objects.filter(shop_id=shop_id).delete()
+    rows = (
+        ProductParameter.objects.filter(product_info__shop_id=shop_id)
+        .values(
+            "parameter_id",
+            "value",
+            "number",
+            "flag",
+            category_id=F("product_info__product__category_id"),
+        )
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    facets = ParameterFacet.objects.bulk_create(
+        ParameterFacet(
+            shop_id=shop_id,
+            category_id=row["category_id"],
+            parameter_id=row["parameter_id"],
+            value=row["value"],
+            number=row["number"],
+            flag=row["flag"],
+            count=row["count"],
+        )
+        for row in rows
+    )
+    return len(facets)
+
+
+def facet_counts(parameters):
+    """
+    Число параметров позиций parameters по ключам фасетов: словарь
+    (ID категории, ID параметра, значение) -> количество.
+    """
+    rows = (
+        parameters.values(
+            "parameter_id",
+            "value",
+            category_id=F("product_info__product__category_id"),
+        )
+        .annotate(count=Count("id"))
+        .order_by()
+    )
+    return {
+        (row["category_id"], row["parameter_id"], row["value"]): row["count"]
+        for row in rows
+    }
+
+
+def update_shop_facets(shop_id, changes):
+    """
+    Меняет счётчики фасетов магазина на разницу changes без пересчёта
+    остальных значений. Вызывается в транзакции импорта, поэтому
+    счётчики меняются вместе с каталогом магазина.
+
+    Аргументы:
+        shop_id (int): ID магазина.
+        changes (dict): (ID категории, ID параметра, значение) ->
+            изменение числа позиций.
+
+    Возвращает:
+        Количество изменённых значений фасетов.
+    """
+    changes = {key: delta for key, delta in changes.items() if delta}
+    if not changes:
+        return 0
+
+    facets = {
+        (facet.category_id, facet.parameter_id, facet.value): facet
+        for facet in ParameterFacet.objects.filter(
+            shop_id=shop_id,
+            parameter_id__in={key[1] for key in changes},
+            value__in={key[2] for key in changes},
+        )
+    }
+    to_create, to_update, to_delete = [], [], []
+    for key, delta in changes.items():
+        facet = facets.get(key)
+        if facet is None:
+            category_id, parameter_id, value = key
+            to_create.append(
+                ParameterFacet(
+                    shop_id=shop_id,
+                    category_id=category_id,
+                    parameter_id=parameter_id,
+                    value=value,
+                    count=delta,
+                    **typed_values(value),
+                )
+            )
+        elif facet.count + delta > 0:
+            facet.count += delta
+            to_update.append(facet)
+        else:
+            to_delete.append(facet.pk)
+
+    ParameterFacet.objects.bulk_create(to_create)
+    ParameterFacet.objects.bulk_update(to_update, ["count"])
+    ParameterFacet.objects.filter(pk__in=to_delete).delete()
+    return len(changes)
+
+
+def rebuild_facets():
+    """
+    Пересчитывает фасеты всех магазинов, каждый в своей транзакции.
+
+    Возвращает:
+        Количество записанных значений фасетов.
+    """
+    written = 0
+    for shop_id in Shop.objects.order_by("id").values_list("id", flat=True):
+        with transaction.atomic():
+            written += refresh_shop_facets(shop_id)
+    bump_catalog_version()
+    return written
+
+
+def catalog_facets(limit=None, shop_ids=None, category_ids=None):
+    """
+    Собирает блок фасетов каталога из счётчиков магазинов.
+
+    Для каждого параметра возвращаются limit самых частых значений
+    с количеством позиций, а для параметров, все значения которых
+    числа, — ещё и границы диапазона:
+
+        {"Цвет": {"values": [{"value": "черный", "count": 3}, ...]},
+         "Диагональ_дюймы": {"values": [...], "min": 1.4, "max": 13.4}}
+
+    Аргументы:
+        limit (int): Число значений параметра; по умолчанию
+            CATALOG_FACET_VALUES.
+        shop_ids (list): ID магазинов; по умолчанию все магазины.
+        category_ids (list): ID категорий; по умолчанию все категории.
+    """
+    if limit is None:
+        limit = getattr(settings, "CATALOG_FACET_VALUES", 20)
+
+    # Счётчики отбираются до группировки и окна, чтобы они не
+    # перебирали значения остальных магазинов и категорий
+    counters = ParameterFacet.objects.all()
+    if shop_ids:
+        counters = counters.filter(shop_id__in=shop_ids)
+    if category_ids:
+        counters = counters.filter(category_id__in=category_ids)
+
+    top = (
+        counters.values("parameter__name", "value")
+        .annotate(total=Sum("count"))
+        .annotate(
+            position=Window(
+                RowNumber(),
+                partition_by=F("parameter__name"),
+                order_by=[F("total").desc(), F("value").asc()],
+            )
+        )
+        .filter(position__lte=limit)
+        .order_by("parameter__name", "position")
+    )
+    facets = {}
+    for row in top:
+        facet = facets.setdefault(row["parameter__name"], {"values": []})
+        facet["values"].append({"value": row["value"], "count": row["total"]})
+
+    ranges = (
+        counters.values("parameter__name")
+        .annotate(
+            low=Min("number"),
+            high=Max("number"),
+            text=Count("id", filter=Q(number=None)),
+        )
+        .filter(text=0)
+        .order_by()
+    )
+    for row in ranges:
+        facet = facets.get(row["parameter__name"])
+        if facet is not None:
+            facet["min"] = row["low"]
+            facet["max"] = row["high"]
+    return facets
+
+
+def filter_by_parameters(queryset, conditions, prefetch_limit=None):
+    """
+    Отбирает строки каталога по значениям параметров позиций.
+
+    Статистика PostgreSQL по полю number общая для всех параметров,
+    поэтому для редких значений планировщик перебирает позиции в порядке
+    сортировки и проверяет каждую. Чтобы этого избежать, число
+    подходящих позиций сначала считается по таблице фасетов: ID позиций
+    с редкими значениями выбираются заранее по индексу (parameter,
+    number) или (parameter, value), частые значения проверяются
+    подзапросом EXISTS. От фасетов зависит только способ отбора,
+    но не его результат.
+
+    Аргументы:
+        queryset: Строки каталога (ключ — ID позиции).
+        conditions (dict): Название параметра -> условия на поля
+            ProductParameter (value__in, number__in, flag__in,
+            number__gte и т. п.). Условия разных параметров должны
+            выполняться все.
+        prefetch_limit (int): Наибольшее число позиций, ID которых
+            выбираются заранее; по умолчанию CATALOG_PARAMETER_PREFETCH.
+    """
+    if prefetch_limit is None:
+        prefetch_limit = getattr(settings, "CATALOG_PARAMETER_PREFETCH", 2000)
+
+    parameter_ids = {}
+    for name, pk in Parameter.objects.filter(name__in=conditions).values_list(
+        "name", "id"
+    ):
+        parameter_ids.setdefault(name, []).append(pk)
+
+    info_ids = None
+    for name, lookups in conditions.items():
+        parameters = ProductParameter.objects.filter(
+            parameter_id__in=parameter_ids.get(name, []), **lookups
+        )
+        matches = ParameterFacet.objects.filter(
+            parameter_id__in=parameter_ids.get(name, []), **lookups
+        ).aggregate(total=Sum("count"))["total"]
+        if (matches or 0) <= prefetch_limit:
+            found = set(parameters.values_list("product_info_id", flat=True))
+            info_ids = found if info_ids is None else info_ids & found
+        else:
+            queryset = queryset.filter(
+                Exists(parameters.filter(product_info=OuterRef("pk")))
+            )
+    if info_ids is not None:
+        queryset = queryset.filter(pk__in=info_ids)
+    return queryset
@@ -0,0 +1,33 @@
+from rest_framework.response import Response
+
+
+class ValuesListMixin:
+    """
+    Быстрый режим списка для ListAPIView.
+
+    Вместо экземпляров моделей и вложенных полей DRF из базы выбираются
+    только столбцы values_fields сериализатора и аннотации запроса
+    представления, а строки ответа собирает его статический метод
+    represent_values. Ответ совпадает с выводом обычного сериализатора
+    байт в байт; обычный сериализатор остаётся для схемы API
+    и браузерного интерфейса.
+    """
+
+    def get_values_queryset(self, queryset):
+        # Аннотации запроса (суммы заказов, релевантность поиска)
+        # остаются в строках: их выводит сериализатор, по ним может идти
+        # сортировка и строиться курсор
+        return queryset.values(
+            *self.get_serializer_class().values_fields,
+            *queryset.query.annotations,
+        )
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        represent = self.get_serializer_class().represent_values
+        rows = self.get_values_queryset(queryset)
+
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([represent(r) for r in page])
+        return Response([represent(row) for row in rows])
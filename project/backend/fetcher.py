@@ -0,0 +1,172 @@
+import hashlib
+from dataclasses import dataclass
+
+from django.conf import settings
+from django.core.files.uploadhandler import (
+    StopUpload,
+    TemporaryFileUploadHandler,
+)
+from requests import Session
+from requests.adapters import HTTPAdapter
+
+from .models import PriceListSource
+
+
+CHUNK_SIZE = 64 * 1024
+
+_session = None
+
+
+class FetchError(Exception):
+    """
+    Ошибка загрузки прайс-листа: неуспешный ответ сервера или превышение
+    допустимого размера файла.
+    """
+
+
+@dataclass
+class FetchResult:
+    """
+    Итог загрузки прайс-листа.
+    """
+
+    url: str
+    not_modified: bool = False
+    fingerprint: str = ""
+    etag: str = ""
+    last_modified: str = ""
+    content_type: str = ""
+    size: int = 0
+    shop_id: int = None
+
+
+def max_price_list_size():
+    """
+    Предельный размер прайс-листа в байтах (PRICE_LIST_MAX_SIZE).
+    """
+    return getattr(settings, "PRICE_LIST_MAX_SIZE", 512 * 2**20)
+
+
+class PriceListUploadHandler(TemporaryFileUploadHandler):
+    """
+    Обработчик загрузки прайс-листа файлом: пишет тело во временный файл
+    на диске и прерывает загрузку, как только файл превысит
+    max_price_list_size(). Превышение отмечается в too_large.
+
+    Остаток тела запроса дочитывается и отбрасывается, не попадая
+    на диск: так клиент получает ответ с ошибкой, а не обрыв соединения.
+    """
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        self.max_size = max_price_list_size()
+        self.too_large = False
+
+    def receive_data_chunk(self, raw_data, start):
+        if start + len(raw_data) > self.max_size:
+            # Парсер закрывает, а значит и удаляет временный файл
+            self.too_large = True
+            raise StopUpload(connection_reset=False)
+        return super().receive_data_chunk(raw_data, start)
+
+
+def get_session():
+    """
+    Возвращает общую для процесса сессию requests с пулом соединений,
+    чтобы повторные загрузки с одного хоста не открывали новое соединение.
+    """
+    global _session
+    if _session is None:
+        pool_size = getattr(settings, "PRICE_LIST_POOL_SIZE", 10)
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        _session = Session()
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+
+
+def fetch_price_list(url, f, user, max_size=None):
+    """
+    Скачивает прайс-лист в файл f условным запросом.
+
+    Если для ссылки сохранены ETag или Last-Modified последнего успешного
+    импорта, они отправляются в If-None-Match/If-Modified-Since, и ответ
+    304 завершает загрузку без скачивания тела.
+
+    Аргументы:
+        url (str): Ссылка на прайс-лист.
+        f: Файл, открытый на запись в двоичном режиме.
+        user (CustomUser): Магазин, загружающий прайс-лист.
+        max_size (int): Предельный размер тела в байтах.
+
+    Возвращает:
+        FetchResult; при ответе 200 файл f перемотан в начало.
+    """
+    if max_size is None:
+        max_size = max_price_list_size()
+    timeout = getattr(settings, "PRICE_LIST_FETCH_TIMEOUT", 30)
+
+    headers = {}
+    source = PriceListSource.objects.filter(user=user, url=url).first()
+    if source is not None:
+        if source.etag:
+            headers["If-None-Match"] = source.etag
+        if source.last_modified:
+            headers["If-Modified-Since"] = source.last_modified
+
+    with get_session().get(
+        url, headers=headers, stream=True, timeout=timeout
+    ) as response:
+        if response.status_code == 304 and source is not None:
+            return FetchResult(
+                url=url,
+                not_modified=True,
+                etag=source.etag,
+                last_modified=source.last_modified,
+                shop_id=source.shop_id,
+            )
+        if response.status_code != 200:
+            raise FetchError(
+                f"Unexpected response {response.status_code} from {url}"
+            )
+
+        length = response.headers.get("Content-Length")
+        if length and length.isdigit() and int(length) > max_size:
+            raise FetchError(f"Price list exceeds {max_size} bytes")
+
+        digest = hashlib.sha256()
+        size = 0
+        for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+            size += len(chunk)
+            if size > max_size:
+                raise FetchError(f"Price list exceeds {max_size} bytes")
+            digest.update(chunk)
+            f.write(chunk)
+
+        f.seek(0)
+        return FetchResult(
+            url=url,
+            fingerprint=digest.hexdigest(),
+            etag=response.headers.get("ETag", ""),
+            last_modified=response.headers.get("Last-Modified", ""),
+            content_type=response.headers.get("Content-Type", ""),
+            size=size,
+        )
+
+
+def remember_source(fetched, user, shop_id):
+    """
+    Сохраняет ETag и Last-Modified успешно импортированного прайс-листа
+    для следующих условных запросов.
+    """
+    PriceListSource.objects.update_or_create(
+        user=user,
+        url=fetched.url,
+        defaults={
+            "etag": fetched.etag,
+            "last_modified": fetched.last_modified,
+            "shop_id": shop_id,
+        },
+    )
@@ -0,0 +1,220 @@
+import re
+from datetime import datetime, time, timedelta
+
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+from .facets import filter_by_parameters
+from .models import ORDER_STATUS
+from .parameters import value_lookups
+from .search import fulltext_search, fuzzy_search
+
+
+class CatalogScopeFilter(filters.BaseFilterBackend):
+    """
+    Отбор позиций каталога по магазинам и категориям: параметры shop
+    и category (повтор ключа — любое из значений).
+    """
+
+    scope_params = ("shop", "category")
+
+    @classmethod
+    def get_scope(cls, request):
+        """
+        Возвращает словарь параметр -> список ID из запроса.
+        """
+        scope = {}
+        for name in cls.scope_params:
+            values = request.query_params.getlist(name)
+            if not values:
+                continue
+            try:
+                scope[name] = [int(value) for value in values]
+            except ValueError:
+                raise ValidationError({"Error": f"{name} must be an integer"})
+        return scope
+
+    def filter_queryset(self, request, queryset, view):
+        for name, ids in self.get_scope(request).items():
+            queryset = queryset.filter(**{f"{name}_id__in": ids})
+        return queryset
+
+
+class ParameterFilter(filters.BaseFilterBackend):
+    """
+    Отбор позиций каталога по параметрам:
+
+    - param[Цвет]=белый — значение параметра; при повторе ключа подходит
+      любое из значений; числа и логические значения сравниваются
+      по типизированным полям (param[Поддержка_4K]=да);
+    - param[Диагональ_дюймы][gte]=13 — граница числового значения,
+      также lte, gt и lt.
+
+    Условия разных параметров должны выполняться все.
+    """
+
+    param_re = re.compile(
+        r"^param\[(?P<name>[^\]]+)\](?:\[(?P<lookup>\w+)\])?$"
+    )
+    range_lookups = ("gte", "lte", "gt", "lt")
+
+    def filter_queryset(self, request, queryset, view):
+        conditions = {}
+        for key in request.query_params:
+            match = self.param_re.match(key)
+            if match is None:
+                continue
+            lookups = conditions.setdefault(match["name"], {})
+            lookup = match["lookup"]
+            if lookup is None:
+                lookups.update(
+                    value_lookups(request.query_params.getlist(key))
+                )
+                continue
+            if lookup not in self.range_lookups:
+                raise ValidationError(
+                    {"Error": f"Unknown parameter lookup: {lookup}"}
+                )
+            try:
+                lookups[f"number__{lookup}"] = float(request.query_params[key])
+            except ValueError:
+                raise ValidationError({"Error": f"{key} must be a number"})
+        if not conditions:
+            return queryset
+        return filter_by_parameters(queryset, conditions)
+
+
+class CatalogSearchFilter(filters.SearchFilter):
+    """
+    Поиск по каталогу с выбором режима в параметре search_mode:
+
+    - contains (по умолчанию) — вхождение подстроки в search_fields;
+    - fulltext — полнотекстовый поиск по поисковому документу позиции
+      с сортировкой по релевантности;
+    - fuzzy — нечёткий поиск по модели и названию товара с сортировкой
+      по триграммному сходству; порог сходства можно задать параметром
+      min_similarity.
+    """
+
+    search_mode_param = "search_mode"
+    search_modes = ("contains", "fulltext", "fuzzy")
+    threshold_param = "min_similarity"
+
+    def filter_queryset(self, request, queryset, view):
+        mode = request.query_params.get(self.search_mode_param, "contains")
+        if mode == "contains":
+            return super().filter_queryset(request, queryset, view)
+        if mode not in self.search_modes:
+            raise ValidationError({"Error": f"Unknown search mode: {mode}"})
+
+        terms = request.query_params.get(self.search_param, "").strip()
+        if not terms:
+            return queryset
+        return getattr(self, f"search_{mode}")(request, queryset, terms)
+
+    def search_fulltext(self, request, queryset, terms):
+        return fulltext_search(queryset, terms)
+
+    def search_fuzzy(self, request, queryset, terms):
+        threshold = request.query_params.get(self.threshold_param)
+        if threshold is not None:
+            try:
+                threshold = float(threshold)
+            except ValueError:
+                threshold = -1
+            if not 0 <= threshold <= 1:
+                raise ValidationError(
+                    {
+                        "Error": f"{self.threshold_param} must be between 0 and 1"
+                    }
+                )
+        return fuzzy_search(queryset, terms, threshold)
+
+
+class CatalogOrderingFilter(filters.OrderingFilter):
+    """
+    Сортировка каталога. Поля сортировки в запросе названы по связям
+    позиции (product__name), а в каталоге для чтения это собственные
+    столбцы строки (product_name).
+    """
+
+    ordering_columns = {
+        "product__name": "product_name",
+        "shop__name": "shop_name",
+        "product__category__name": "category_name",
+    }
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if not ordering:
+            return ordering
+        return [
+            ("-" if field.startswith("-") else "")
+            + self.ordering_columns.get(field.lstrip("-"), field.lstrip("-"))
+            for field in ordering
+        ]
+
+
+class OrderFilter(filters.BaseFilterBackend):
+    """
+    Отбор заказов:
+
+    - status=new — статус заказа; при повторе ключа или перечислении
+      через запятую подходит любой из статусов;
+    - date_from=2024-09-01, date_to=2024-09-30 — границы даты создания
+      включительно; вместо даты можно передать дату со временем
+      (2024-09-01T12:00:00), время без часового пояса считается
+      в текущем поясе.
+    """
+
+    status_param = "status"
+    date_params = {"date_from": "dt__gte", "date_to": "dt__lte"}
+    statuses = {value for value, _ in ORDER_STATUS}
+
+    def filter_queryset(self, request, queryset, view):
+        statuses = [
+            value
+            for param in request.query_params.getlist(self.status_param)
+            for value in param.split(",")
+            if value
+        ]
+        for value in statuses:
+            if value not in self.statuses:
+                raise ValidationError(
+                    {"Error": f"Unknown order status: {value}"}
+                )
+        if statuses:
+            queryset = queryset.filter(status__in=statuses)
+
+        for param, lookup in self.date_params.items():
+            value = request.query_params.get(param)
+            if value:
+                bound = self.parse_bound(param, value)
+                queryset = queryset.filter(**{lookup: bound})
+        return queryset
+
+    def parse_bound(self, param, value):
+        """
+        Переводит границу диапазона в момент времени. Дата без времени
+        означает начало дня для date_from и его конец для date_to.
+        """
+        try:
+            # Дата проверяется первой: parse_datetime принимает и её,
+            # как полночь
+            day = parse_date(value)
+            moment = None if day else parse_datetime(value)
+        except ValueError:
+            moment = day = None
+        if day is not None:
+            moment = datetime.combine(day, time.min)
+            if param == "date_to":
+                moment += timedelta(days=1) - timedelta(microseconds=1)
+        if moment is None:
+            raise ValidationError(
+                {"Error": f"{param} must be a date or a date and time"}
+            )
+        if timezone.is_naive(moment):
+            moment = timezone.make_aware(moment)
+        return moment
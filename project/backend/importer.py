@@ -0,0 +1,568 @@
+import hashlib
+import json
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from itertools import islice
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from .models import (
+    Shop,
+    Category,
+    Product,
+    ProductInfo,
+    Parameter,
+    ProductParameter,
+    ImportStage,
+    ImportStageItem,
+)
+from .catalog import refresh_catalog
+from .catalog_cache import bump_catalog_version
+from .facets import facet_counts, update_shop_facets
+from .parameters import typed_values
+
+
+# Поля ProductInfo, которые берутся из прайс-листа и обновляются при импорте
+PRODUCT_INFO_FIELDS = (
+    "product_id",
+    "model",
+    "quantity",
+    "price",
+    "price_rrc",
+    "source_hash",
+)
+
+
+class PriceListError(Exception):
+    """
+    Ошибка в содержимом прайс-листа (например, ссылка на неизвестную
+    категорию). Импорт при этом откатывается целиком.
+    """
+
+
+@dataclass
+class ImportResult:
+    """
+    Итоги импорта прайс-листа.
+    """
+
+    shop_id: int = None
+    categories: int = 0
+    products_created: int = 0
+    processed: int = 0
+    created: int = 0
+    updated: int = 0
+    skipped: int = 0
+    deleted: int = 0
+    unchanged: bool = False
+
+    def as_dict(self):
+        return {
+            "shop_id": self.shop_id,
+            "categories": self.categories,
+            "products_created": self.products_created,
+            "processed": self.processed,
+            "created": self.created,
+            "updated": self.updated,
+            "skipped": self.skipped,
+            "deleted": self.deleted,
+            "unchanged": self.unchanged,
+        }
+
+
+def item_hash(item, category_id, category_name):
+    """
+    Возвращает хэш записи товара из прайс-листа. Позиции с неизменным
+    хэшем при повторном импорте не перезаписываются.
+
+    В хэш входит не только внешний ID категории, но и найденная по нему
+    категория с названием: после переименования категории в прайс-листе
+    позиции переносятся в неё.
+    """
+    payload = json.dumps(
+        [
+            item["name"],
+            item["category"],
+            category_id,
+            category_name,
+            item["model"],
+            item["price"],
+            item["price_rrc"],
+            item["quantity"],
+            item["parameters"],
+        ],
+        ensure_ascii=False,
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
+
+
+def chunked(iterable, size):
+    """
+    Разбивает итерируемый объект на списки длиной не более size.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class CatalogImporter:
+    """
+    Пакетный импорт каталога магазина.
+
+    Существующие категории, товары, имена параметров и позиции магазина
+    загружаются один раз в словари, после чего для каждой пачки товаров
+    вычисляется, что нужно создать, а что обновить, и изменения пишутся
+    через bulk_create/bulk_update. Число запросов зависит от количества
+    пачек, а не от количества товаров.
+
+    Для каждой позиции хранится хэш исходной записи, поэтому при
+    повторном импорте записываются только новые и изменившиеся товары,
+    а исчезнувшие из прайс-листа удаляются.
+    """
+
+    def __init__(self, shop, batch_size=None):
+        self.shop = shop
+        self.batch_size = batch_size or getattr(
+            settings, "IMPORT_BATCH_SIZE", 1000
+        )
+        self.result = ImportResult(shop_id=shop.id)
+        # external_id категории -> id категории
+        self.categories = {}
+        # external_id категории -> название категории
+        self.category_names = {}
+        # (название, id категории) -> id товара
+        self.products = {}
+        # название параметра -> id параметра
+        self.parameters = dict(
+            Parameter.objects.order_by("-pk").values_list("name", "id")
+        )
+        # external_id позиции -> (id, хэш исходной записи)
+        self.infos = {
+            external_id: (pk, source_hash)
+            for external_id, pk, source_hash in ProductInfo.objects.filter(
+                shop=shop
+            ).values_list("external_id", "id", "source_hash")
+        }
+        self._seen = set()
+        # (id категории, id параметра, значение) -> изменение счётчика
+        # фасета магазина
+        self.facet_changes = Counter()
+
+    def import_categories(self, categories):
+        """
+        Создаёт недостающие категории, привязывает их к магазину и
+        загружает товары этих категорий в словарь поиска.
+        """
+        wanted = {}
+        for cat in categories:
+            wanted[cat["id"]] = cat["name"]
+        if not wanted:
+            return
+
+        existing = {}
+        for pk, external_id, name in Category.objects.filter(
+            external_id__in=wanted
+        ).values_list("id", "external_id", "name"):
+            existing.setdefault((external_id, name), pk)
+
+        missing = [
+            Category(external_id=external_id, name=name)
+            for external_id, name in wanted.items()
+            if (external_id, name) not in existing
+        ]
+        for cat_obj in Category.objects.bulk_create(missing):
+            existing[(cat_obj.external_id, cat_obj.name)] = cat_obj.id
+
+        for external_id, name in wanted.items():
+            self.categories[external_id] = existing[(external_id, name)]
+            self.category_names[external_id] = name
+        # Категории, которых нет в прайс-листе (в том числе прежние
+        # названия переименованных), отвязываются от магазина
+        self.shop.categories.set(self.categories.values())
+        self.result.categories = len(self.categories)
+
+        for pk, name, category_id in Product.objects.filter(
+            category_id__in=self.categories.values()
+        ).values_list("id", "name", "category_id"):
+            self.products.setdefault((name, category_id), pk)
+
+    def import_goods(self, goods):
+        """
+        Импортирует товары пачками по batch_size штук, удаляет позиции
+        магазина, которых больше нет в прайс-листе, и сбрасывает кэш
+        каталога, если его позиции изменились. Счётчики фасетов магазина
+        меняются только на значения параметров изменившихся позиций.
+        """
+        for batch in chunked(goods, self.batch_size):
+            self._import_batch(batch)
+        self._delete_removed()
+        if self.result.created or self.result.updated or self.result.deleted:
+            update_shop_facets(self.shop.id, self.facet_changes)
+            bump_catalog_version()
+        return self.result
+
+    def _import_batch(self, items):
+        rows = []
+        for item in items:
+            self.result.processed += 1
+            external_id = item["id"]
+            if external_id in self._seen:
+                # Повтор позиции в одном прайс-листе
+                self.result.skipped += 1
+                continue
+            self._seen.add(external_id)
+
+            category_id = self.categories.get(item["category"])
+            if category_id is None:
+                raise PriceListError(
+                    f"Unknown category {item['category']} "
+                    f"for product {external_id}"
+                )
+            source_hash = item_hash(
+                item, category_id, self.category_names[item["category"]]
+            )
+            current = self.infos.get(external_id)
+            if current is not None and current[1] == source_hash:
+                # Позиция не изменилась с прошлого импорта
+                self.result.skipped += 1
+                continue
+            rows.append(
+                (
+                    external_id,
+                    (item["name"], category_id),
+                    {
+                        "model": item["model"],
+                        "quantity": item["quantity"],
+                        "price": item["price"],
+                        "price_rrc": item["price_rrc"],
+                        "source_hash": source_hash,
+                    },
+                    {
+                        name: str(value)
+                        for name, value in item["parameters"].items()
+                    },
+                )
+            )
+
+        self._create_products(rows)
+        self._create_parameters(rows)
+        self._count_facets(rows)
+        info_ids = self._write_product_infos(rows)
+        self._write_product_parameters(rows, info_ids)
+        if info_ids:
+            refresh_catalog(
+                ProductInfo.objects.filter(id__in=info_ids.values())
+            )
+
+    def _create_products(self, rows):
+        missing = {}
+        for _, key, _, _ in rows:
+            if key not in self.products and key not in missing:
+                missing[key] = Product(name=key[0], category_id=key[1])
+        created = Product.objects.bulk_create(
+            missing.values(), batch_size=self.batch_size
+        )
+        for key, product in zip(missing, created):
+            self.products[key] = product.id
+        self.result.products_created += len(created)
+
+    def _create_parameters(self, rows):
+        missing = {}
+        for _, _, _, params in rows:
+            for name in params:
+                if name not in self.parameters and name not in missing:
+                    missing[name] = Parameter(name=name)
+        for param in Parameter.objects.bulk_create(missing.values()):
+            self.parameters[param.name] = param.id
+
+    def _count_facets(self, rows):
+        """
+        Учитывает в разнице фасетов прежние значения параметров
+        изменившихся позиций (до их перезаписи, пока позиция ещё
+        в прежней категории) и новые значения из прайс-листа.
+        """
+        existing = [
+            self.infos[external_id][0]
+            for external_id, _, _, _ in rows
+            if external_id in self.infos
+        ]
+        if existing:
+            self.facet_changes.subtract(
+                facet_counts(
+                    ProductParameter.objects.filter(
+                        product_info_id__in=existing
+                    )
+                )
+            )
+        for _, (_, category_id), _, params in rows:
+            for name, value in params.items():
+                self.facet_changes[
+                    (category_id, self.parameters[name], value)
+                ] += 1
+
+    def _write_product_infos(self, rows):
+        """
+        Создаёт новые и обновляет изменившиеся позиции магазина.
+        Возвращает словарь external_id -> id позиции.
+        """
+        to_create, to_update, info_ids = [], [], {}
+        for external_id, key, fields, _ in rows:
+            current = self.infos.get(external_id)
+            if current is None:
+                to_create.append(
+                    ProductInfo(
+                        shop_id=self.shop.id,
+                        external_id=external_id,
+                        product_id=self.products[key],
+                        **fields,
+                    )
+                )
+                continue
+
+            info_ids[external_id] = current[0]
+            to_update.append(
+                ProductInfo(
+                    id=current[0], product_id=self.products[key], **fields
+                )
+            )
+            self.infos[external_id] = (current[0], fields["source_hash"])
+
+        for info in ProductInfo.objects.bulk_create(
+            to_create, batch_size=self.batch_size
+        ):
+            info_ids[info.external_id] = info.id
+            self.infos[info.external_id] = (info.id, info.source_hash)
+        ProductInfo.objects.bulk_update(
+            to_update, PRODUCT_INFO_FIELDS, batch_size=self.batch_size
+        )
+        self.result.created += len(to_create)
+        self.result.updated += len(to_update)
+        return info_ids
+
+    def _write_product_parameters(self, rows, info_ids):
+        """
+        Приводит параметры изменившихся позиций к прайс-листу: добавляет
+        новые, обновляет значения и удаляет исчезнувшие. Числовые и
+        логические значения дублируются в типизированные поля.
+        """
+        existing = {
+            (info_id, param_id): (pk, value)
+            for pk, info_id, param_id, value in ProductParameter.objects.filter(
+                product_info_id__in=info_ids.values()
+            ).values_list(
+                "id", "product_info_id", "parameter_id", "value"
+            )
+        }
+
+        to_create, to_update = [], []
+        for external_id, _, _, params in rows:
+            info_id = info_ids[external_id]
+            for name, value in params.items():
+                param_id = self.parameters[name]
+                current = existing.pop((info_id, param_id), None)
+                if current is None:
+                    to_create.append(
+                        ProductParameter(
+                            product_info_id=info_id,
+                            parameter_id=param_id,
+                            value=value,
+                            **typed_values(value),
+                        )
+                    )
+                elif current[1] != value:
+                    to_update.append(
+                        ProductParameter(
+                            id=current[0], value=value, **typed_values(value)
+                        )
+                    )
+
+        ProductParameter.objects.bulk_create(
+            to_create, batch_size=self.batch_size
+        )
+        ProductParameter.objects.bulk_update(
+            to_update, ["value", "number", "flag"], batch_size=self.batch_size
+        )
+        if existing:
+            ProductParameter.objects.filter(
+                id__in=[pk for pk, _ in existing.values()]
+            ).delete()
+
+    def _delete_removed(self):
+        removed = [
+            pk
+            for external_id, (pk, _) in self.infos.items()
+            if external_id not in self._seen
+        ]
+        for ids in chunked(removed, self.batch_size):
+            self.facet_changes.subtract(
+                facet_counts(
+                    ProductParameter.objects.filter(product_info_id__in=ids)
+                )
+            )
+            ProductInfo.objects.filter(id__in=ids).delete()
+        self.result.deleted += len(removed)
+
+
+@contextmanager
+def shop_import_lock(user_id, shop_name):
+    """
+    Сессионная advisory-блокировка PostgreSQL на импорт магазина.
+
+    Ключ вычисляется по владельцу и названию магазина, поэтому
+    блокировка берётся ещё до создания магазина, и параллельные загрузки
+    одного прайс-листа выполняются по очереди. На других СУБД
+    блокировка не берётся.
+    """
+    if connection.vendor != "postgresql":
+        yield
+        return
+
+    digest = hashlib.blake2b(
+        f"{user_id}:{shop_name}".encode(), digest_size=8
+    ).digest()
+    key = int.from_bytes(digest, "big", signed=True)
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [key])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [key])
+
+
+def stage_price_list(
+    shop, data, fingerprint=None, chunk_size=None, progress=None
+):
+    """
+    Записывает товары прайс-листа в промежуточную таблицу.
+
+    Каждая порция из chunk_size товаров фиксируется отдельной
+    транзакцией вместе с числом записанных товаров. Если для магазина
+    остался незавершённый импорт того же документа, уже записанные
+    товары пропускаются, и запись продолжается с последней порции.
+
+    Возвращает:
+        ImportStage с полностью записанным прайс-листом.
+    """
+    chunk_size = chunk_size or getattr(settings, "IMPORT_CHUNK_SIZE", 10000)
+    stage = ImportStage.objects.filter(shop=shop).first()
+    if stage is not None and not (
+        fingerprint and stage.fingerprint == fingerprint
+    ):
+        # Незавершённый импорт другого документа продолжить нельзя
+        stage.delete()
+        stage = None
+    if stage is None:
+        stage = ImportStage.objects.create(
+            shop=shop,
+            fingerprint=fingerprint or "",
+            categories=list(data.get("categories") or []),
+        )
+
+    result = ImportResult(shop_id=shop.id, processed=stage.staged)
+    goods = islice(iter(data.get("goods") or []), stage.staged, None)
+    for chunk in chunked(goods, chunk_size):
+        with transaction.atomic():
+            ImportStageItem.objects.bulk_create(
+                [
+                    ImportStageItem(
+                        stage=stage, position=stage.staged + i, data=item
+                    )
+                    for i, item in enumerate(chunk)
+                ],
+                batch_size=getattr(settings, "IMPORT_BATCH_SIZE", 1000),
+            )
+            stage.staged += len(chunk)
+            stage.save(update_fields=["staged"])
+        result.processed = stage.staged
+        if progress is not None:
+            progress(result)
+    return stage
+
+
+def apply_stage(stage, batch_size=None):
+    """
+    Переносит записанный прайс-лист в каталог магазина одной
+    транзакцией, поэтому покупатели видят либо старый, либо новый
+    прайс-лист целиком. После успешного переноса или ошибки в данных
+    промежуточные записи удаляются.
+    """
+    shop = stage.shop
+    try:
+        with transaction.atomic():
+            importer = CatalogImporter(shop, batch_size=batch_size)
+            importer.import_categories(stage.categories)
+            result = importer.import_goods(
+                stage.items.order_by("position")
+                .values_list("data", flat=True)
+                .iterator(chunk_size=importer.batch_size)
+            )
+            if stage.fingerprint:
+                shop.import_fingerprint = stage.fingerprint
+                shop.save(update_fields=["import_fingerprint"])
+            stage.delete()
+    except (KeyError, PriceListError):
+        # Повторный перенос того же документа завершится той же ошибкой
+        stage.delete()
+        raise
+    return result
+
+
+def import_price_list(
+    data,
+    user,
+    batch_size=None,
+    progress=None,
+    fingerprint=None,
+    chunk_size=None,
+):
+    """
+    Импортирует прайс-лист магазина.
+
+    Импорт выполняется под блокировкой магазина в два этапа: товары
+    порциями записываются в промежуточную таблицу (stage_price_list),
+    затем одной транзакцией переносятся в каталог (apply_stage). После
+    сбоя повторный импорт того же документа продолжается с последней
+    записанной порции.
+
+    Аргументы:
+        data (dict): Прайс-лист в формате shop1.yaml (shop, categories,
+            goods); goods может быть любым итерируемым объектом.
+        user (CustomUser): Пользователь-владелец магазина; None для
+            магазина без владельца.
+        batch_size (int): Размер пачки для записи в БД.
+        progress (callable): Вызывается с текущим ImportResult после
+            каждой записанной порции.
+        fingerprint (str): Отпечаток исходного документа. Если он
+            совпадает с отпечатком последнего успешного импорта магазина,
+            товары не разбираются; по нему же продолжается прерванный
+            импорт.
+        chunk_size (int): Число товаров в одной транзакции записи.
+
+    Возвращает:
+        ImportResult с количеством созданных, обновлённых, пропущенных
+        и удалённых позиций.
+    """
+    user_id = user.id if user is not None else None
+    with shop_import_lock(user_id, data["shop"]):
+        shop, _ = Shop.objects.get_or_create(
+            name=data["shop"], user_id=user_id
+        )
+        if fingerprint and shop.import_fingerprint == fingerprint:
+            return ImportResult(shop_id=shop.id, unchanged=True)
+
+        stage = stage_price_list(
+            shop,
+            data,
+            fingerprint=fingerprint,
+            chunk_size=chunk_size,
+            progress=progress,
+        )
+        return apply_stage(stage, batch_size=batch_size)
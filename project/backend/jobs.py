@@ -0,0 +1,280 @@
+import hashlib
+from tempfile import TemporaryFile
+from urllib.parse import urlparse
+
+from django.core.files.storage import default_storage
+from django.db import IntegrityError, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .fetcher import fetch_price_list, remember_source, FetchError, CHUNK_SIZE
+from .importer import import_price_list, ImportResult, PriceListError
+from .models import ImportJob
+from .pricelist import read_price_list
+
+
+def submit_import(user, url="", upload=None):
+    """
+    Ставит загрузку прайс-листа в очередь.
+
+    Если та же ссылка или файл с тем же именем уже ждёт в очереди, новая
+    загрузка объединяется с ожидающей задачей: задача получает новый файл
+    и сохраняет ID. Загрузки из разных источников ставятся отдельными
+    задачами, даже если относятся к одному магазину: магазин известен
+    только после разбора прайс-листа, а у пользователя их может быть
+    несколько.
+
+    Аргументы:
+        user (CustomUser): Пользователь-магазин.
+        url (str): Ссылка на прайс-лист.
+        upload (UploadedFile): Загруженный файл прайс-листа, если прайс-лист
+            передан напрямую, а не ссылкой.
+
+    Возвращает:
+        ImportJob, в которую попала загрузка.
+    """
+    file_name = upload.name if upload is not None else ""
+    stored_name = ""
+    if upload is not None:
+        # Файл сохраняется до транзакции один раз: временный файл
+        # загрузки перемещается в хранилище, а не копируется
+        stored_name = default_storage.save(
+            ImportJob._meta.get_field("file").generate_filename(
+                None, upload.name
+            ),
+            upload,
+        )
+
+    try:
+        return _enqueue(user, url, file_name, stored_name)
+    except Exception:
+        # Сохранённый файл не попал ни в одну задачу
+        if stored_name:
+            default_storage.delete(stored_name)
+        raise
+
+
+def _enqueue(user, url, file_name, stored_name):
+    for _ in range(2):
+        try:
+            with transaction.atomic():
+                job = (
+                    ImportJob.objects.select_for_update()
+                    .filter(
+                        user=user,
+                        url=url,
+                        file_name=file_name,
+                        state="pending",
+                    )
+                    .first()
+                )
+                if job is None:
+                    job = ImportJob(user=user, url=url, file_name=file_name)
+                else:
+                    job.merged += 1
+                    if job.file:
+                        # Предыдущий файл больше не нужен
+                        old_name = job.file.name
+                        transaction.on_commit(
+                            lambda: default_storage.delete(old_name)
+                        )
+                job.file.name = stored_name
+                job.save()
+                return job
+        except IntegrityError:
+            # Параллельный запрос успел создать ожидающую задачу,
+            # повторяем попытку и объединяемся с ней
+            continue
+    raise IntegrityError("Failed to enqueue import job")
+
+
+def claim_next_job():
+    """
+    Забирает из очереди самую старую ожидающую задачу, прайс-лист
+    которой (та же ссылка или файл с тем же именем) сейчас
+    не импортируется.
+
+    Возвращает:
+        ImportJob в состоянии running или None, если очередь пуста.
+    """
+    running = ImportJob.objects.filter(
+        state="running",
+        user=OuterRef("user"),
+        url=OuterRef("url"),
+        file_name=OuterRef("file_name"),
+    )
+    try:
+        with transaction.atomic():
+            job = (
+                ImportJob.objects.select_for_update(skip_locked=True)
+                .filter(state="pending")
+                .exclude(Exists(running))
+                .order_by("created_at")
+                .first()
+            )
+            if job is None:
+                return None
+            job.state = "running"
+            job.started_at = timezone.now()
+            job.save(update_fields=["state", "started_at"])
+    except IntegrityError:
+        # Другой обработчик уже запустил импорт этого прайс-листа
+        return None
+    return job
+
+
+def requeue_interrupted_jobs():
+    """
+    Возвращает в очередь задачи, оставшиеся в состоянии running после
+    остановки обработчика. Повторный импорт того же прайс-листа
+    продолжится с последней записанной порции товаров.
+
+    Если пока задача выполнялась, тот же прайс-лист загрузили снова,
+    прерванная задача завершается с ошибкой: её заменит ожидающая.
+
+    Возвращает:
+        Количество возвращённых в очередь задач.
+    """
+    requeued = 0
+    for job in ImportJob.objects.filter(state="running"):
+        if ImportJob.objects.filter(
+            user=job.user_id,
+            url=job.url,
+            file_name=job.file_name,
+            state="pending",
+        ).exists():
+            job.state = "failed"
+            job.errors.append(
+                "Import interrupted and superseded by a newer upload"
+            )
+            job.finished_at = timezone.now()
+            if job.file:
+                job.file.delete(save=False)
+            job.save()
+            continue
+        job.state = "pending"
+        job.save(update_fields=["state"])
+        requeued += 1
+    return requeued
+
+
+def import_url(job, progress):
+    """
+    Скачивает прайс-лист по ссылке задачи и импортирует его.
+    """
+    with TemporaryFile() as f:
+        fetched = fetch_price_list(job.url, f, job.user)
+        if fetched.not_modified:
+            # Сервер ответил 304: файл не менялся с последнего импорта
+            return ImportResult(shop_id=fetched.shop_id, unchanged=True)
+
+        data = read_price_list(
+            f,
+            content_type=fetched.content_type,
+            name=urlparse(job.url).path,
+        )
+        result = import_price_list(
+            data,
+            job.user,
+            progress=progress,
+            fingerprint=fetched.fingerprint,
+        )
+    remember_source(fetched, job.user, result.shop_id)
+    return result
+
+
+def import_file(f, user, name="", progress=None):
+    """
+    Импортирует прайс-лист из открытого двоичного файла.
+
+    Аргументы:
+        f: Файл с произвольным доступом.
+        user (CustomUser): Владелец магазина или None.
+        name (str): Имя файла для определения формата.
+        progress (callable): Обработчик прогресса импорта.
+    """
+    digest = hashlib.sha256()
+    for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+        digest.update(chunk)
+    f.seek(0)
+    data = read_price_list(f, name=name)
+    return import_price_list(
+        data, user, progress=progress, fingerprint=digest.hexdigest()
+    )
+
+
+def import_uploaded_file(job, progress):
+    """
+    Импортирует прайс-лист, загруженный в задачу файлом.
+    """
+    with job.file.open("rb") as f:
+        return import_file(f, job.user, job.file_name, progress)
+
+
+def run_job(job):
+    """
+    Загружает прайс-лист задачи, импортирует его и сохраняет итог.
+    """
+
+    def progress(result):
+        ImportJob.objects.filter(pk=job.pk).update(
+            processed=result.processed,
+            created=result.created,
+            updated=result.updated,
+            skipped=result.skipped,
+        )
+
+    # Счётчики прерванного импорта уже записаны обработчиком прогресса,
+    # поэтому при ошибке сохраняются только состояние и ошибки
+    fields = ["state", "errors", "file", "finished_at"]
+    try:
+        if job.file:
+            result = import_uploaded_file(job, progress)
+        else:
+            result = import_url(job, progress)
+    except KeyError as e:
+        job.state = "failed"
+        job.errors.append(f"Missing key in data: {e}")
+    except (FetchError, PriceListError) as e:
+        job.state = "failed"
+        job.errors.append(str(e))
+    except Exception as e:
+        job.state = "failed"
+        job.errors.append(f"Failed to import price list: {e}")
+    else:
+        job.state = "done"
+        job.shop_id = result.shop_id
+        job.processed = result.processed
+        job.created = result.created
+        job.updated = result.updated
+        job.skipped = result.skipped
+        job.deleted = result.deleted
+        job.unchanged = result.unchanged
+        fields += [
+            "shop",
+            "processed",
+            "created",
+            "updated",
+            "skipped",
+            "deleted",
+            "unchanged",
+        ]
+
+    if job.file:
+        job.file.delete(save=False)
+    job.finished_at = timezone.now()
+    job.save(update_fields=fields)
+    return job
+
+
+def process_next_job():
+    """
+    Обрабатывает одну задачу из очереди.
+
+    Возвращает:
+        Обработанную ImportJob или None, если задач нет.
+    """
+    job = claim_next_job()
+    if job is None:
+        return None
+    return run_job(job)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.parameters import backfill_typed_values
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет числовые и логические значения параметров позиций, "
+        "загруженных до появления типизированных полей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = backfill_typed_values(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Updated {updated} parameter values in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
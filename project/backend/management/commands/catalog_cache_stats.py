@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from backend.catalog_cache import cache_stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Выводит счётчики кэша списка товаров: попадания, промахи и "
+        "текущую версию каталога."
+    )
+
+    def handle(self, *args, **options):
+        stats = cache_stats()
+        requests = stats["hits"] + stats["misses"]
+        ratio = stats["hits"] / requests if requests else 0
+        self.stdout.write(
+            f"Catalog cache: {stats['hits']} hits, {stats['misses']} misses "
+            f"({ratio:.1%} hit rate), version {stats['version']}"
+        )
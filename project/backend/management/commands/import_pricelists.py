@@ -0,0 +1,133 @@
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import get_context
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from backend.jobs import import_file
+from backend.pricelist import read_price_list
+
+
+def read_shop_name(path):
+    """
+    Возвращает название магазина из заголовка прайс-листа.
+    """
+    with open(path, "rb") as f:
+        return read_price_list(f, name=path)["shop"]
+
+
+def import_shop_files(paths, user_id):
+    """
+    Импортирует файлы одного магазина по очереди в дочернем процессе.
+    Каждый файл импортируется в своей транзакции.
+
+    Возвращает:
+        Список словарей с итогами по каждому файлу.
+    """
+    user = None
+    if user_id is not None:
+        user = get_user_model().objects.get(pk=user_id)
+
+    stats = []
+    for path in paths:
+        started = time.perf_counter()
+        try:
+            with open(path, "rb") as f:
+                result = import_file(f, user, name=path)
+        except Exception as e:
+            stats.append({"path": path, "error": str(e)})
+            continue
+        stats.append(
+            {
+                "path": path,
+                "seconds": time.perf_counter() - started,
+                **result.as_dict(),
+            }
+        )
+    connections.close_all()
+    return stats
+
+
+class Command(BaseCommand):
+    help = (
+        "Импортирует прайс-листы из локальных файлов. Магазины "
+        "обрабатываются параллельно, файлы одного магазина — по очереди."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("files", nargs="+", help="Файлы прайс-листов.")
+        parser.add_argument(
+            "--user",
+            help="Email пользователя-владельца магазинов. Без него "
+            "магазины создаются без владельца.",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=os.cpu_count(),
+            help="Количество параллельных процессов.",
+        )
+
+    def handle(self, *args, **options):
+        user_id = None
+        if options["user"]:
+            User = get_user_model()
+            try:
+                user_id = User.objects.get(email=options["user"]).pk
+            except User.DoesNotExist:
+                raise CommandError(f"User {options['user']} not found")
+
+        shops = defaultdict(list)
+        for path in options["files"]:
+            try:
+                shops[read_shop_name(path)].append(path)
+            except Exception as e:
+                raise CommandError(f"{path}: {e}")
+
+        # Дочерние процессы не должны наследовать открытое соединение
+        # родителя: каждый откроет своё
+        connections.close_all()
+
+        started = time.perf_counter()
+        failed = processed = 0
+        with ProcessPoolExecutor(
+            max_workers=max(1, min(options["workers"], len(shops))),
+            mp_context=get_context("fork"),
+        ) as pool:
+            futures = [
+                pool.submit(import_shop_files, paths, user_id)
+                for paths in shops.values()
+            ]
+            for future in as_completed(futures):
+                for stat in future.result():
+                    if "error" in stat:
+                        failed += 1
+                        self.stderr.write(f"{stat['path']}: {stat['error']}")
+                        continue
+                    processed += stat["processed"]
+                    self.stdout.write(self.format_stat(stat))
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"Total: {len(options['files'])} files, {len(shops)} shops, "
+            f"{processed} goods in {elapsed:.2f} s "
+            f"({processed / elapsed:.0f} goods/s), {failed} failed"
+        )
+        if failed:
+            raise CommandError(f"{failed} file(s) failed to import")
+
+    @staticmethod
+    def format_stat(stat):
+        if stat["unchanged"]:
+            return f"{stat['path']}: unchanged"
+        rate = stat["processed"] / stat["seconds"] if stat["seconds"] else 0
+        return (
+            f"{stat['path']}: {stat['processed']} goods in "
+            f"{stat['seconds']:.2f} s ({rate:.0f} goods/s), "
+            f"created={stat['created']} updated={stat['updated']} "
+            f"skipped={stat['skipped']} deleted={stat['deleted']}"
+        )
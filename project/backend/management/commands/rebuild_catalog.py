@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.catalog import rebuild_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Перезаписывает каталог товаров для чтения по позициям всех "
+        "магазинов, например после правки товаров или категорий вне "
+        "импорта."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_catalog(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Wrote {written} catalog entries in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
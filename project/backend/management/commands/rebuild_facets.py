@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.facets import rebuild_facets
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает фасеты параметров всех магазинов, например после "
+        "первого развёртывания таблицы фасетов."
+    )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_facets()
+        self.stdout.write(
+            f"Wrote {written} facet values in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.search import rebuild_search_vectors
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересчитывает поисковые документы всех позиций каталога, например "
+        "после изменения конфигурации поиска."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = rebuild_search_vectors(batch_size=options["batch_size"])
+        self.stdout.write(
+            f"Updated {updated} search vectors in "
+            f"{time.perf_counter() - started:.2f} s"
+        )
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.stock import release_expired_holds
+
+
+class Command(BaseCommand):
+    help = "Снимает просроченные резервы остатков корзин."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Снять просроченные резервы один раз и завершиться.",
+        )
+        parser.add_argument(
+            "--interval",
+            type=float,
+            default=60.0,
+            help="Пауза между очистками, в секундах.",
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.perf_counter()
+            released = release_expired_holds()
+            if released or options["once"]:
+                self.stdout.write(
+                    f"Released {released} reserved unit(s) in "
+                    f"{time.perf_counter() - started:.2f} s"
+                )
+            if options["once"]:
+                return
+            time.sleep(options["interval"])
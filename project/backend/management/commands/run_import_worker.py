@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from backend.jobs import process_next_job, requeue_interrupted_jobs
+
+
+class Command(BaseCommand):
+    help = "Обрабатывает очередь задач импорта прайс-листов."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Обработать все задачи в очереди и завершиться.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=2.0,
+            help="Пауза между проверками пустой очереди, в секундах.",
+        )
+        parser.add_argument(
+            "--requeue-interrupted",
+            action="store_true",
+            help="Перед запуском вернуть в очередь задачи, прерванные "
+            "остановкой обработчика. Используйте, только если других "
+            "обработчиков не запущено.",
+        )
+
+    def handle(self, *args, **options):
+        if options["requeue_interrupted"]:
+            requeued = requeue_interrupted_jobs()
+            if requeued:
+                self.stdout.write(f"Requeued {requeued} interrupted job(s)")
+        while True:
+            job = process_next_job()
+            if job is not None:
+                self.stdout.write(
+                    f"Job #{job.pk} {job.state}: "
+                    f"processed={job.processed} created={job.created} "
+                    f"updated={job.updated} skipped={job.skipped}"
+                )
+                continue
+            if options["once"]:
+                return
+            time.sleep(options["poll_interval"])
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.seeding import ScaleSeeder
+
+
+class Command(BaseCommand):
+    help = (
+        "Заполняет базу синтетическими магазинами, каталогом, покупателями "
+        "и историей заказов для проверки производительности."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shops", type=int, default=10)
+        parser.add_argument("--categories", type=int, default=50)
+        parser.add_argument("--products", type=int, default=100000)
+        parser.add_argument(
+            "--offers",
+            type=int,
+            default=2,
+            help="Сколько магазинов продают каждый товар.",
+        )
+        parser.add_argument(
+            "--parameters",
+            type=int,
+            default=4,
+            help="Количество параметров у позиции магазина.",
+        )
+        parser.add_argument("--buyers", type=int, default=10000)
+        parser.add_argument("--orders", type=int, default=100000)
+        parser.add_argument(
+            "--items",
+            type=int,
+            default=5,
+            help="Наибольшее количество позиций в заказе.",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Зерно генератора; одно зерно даёт одинаковые данные.",
+        )
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        seeder = ScaleSeeder(
+            shops=options["shops"],
+            categories=options["categories"],
+            products=options["products"],
+            offers=options["offers"],
+            parameters=options["parameters"],
+            buyers=options["buyers"],
+            orders=options["orders"],
+            items=options["items"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+            log=self.stdout.write,
+        )
+        started = time.perf_counter()
+        try:
+            counts = seeder.run()
+        except ValueError as e:
+            raise CommandError(str(e))
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        self.stdout.write(
+            f"Total: {total} rows in {elapsed:.2f} s "
+            f"({total / elapsed:.0f} rows/s)"
+        )
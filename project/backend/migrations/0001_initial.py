@@ -0,0 +1,599 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:26
+
+import django.contrib.postgres.search
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="ProductInfo",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("external_id", models.PositiveIntegerField(verbose_name="Внешний ID")),
+                (
+                    "model",
+                    models.CharField(blank=True, max_length=80, verbose_name="Модель"),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="Количество")),
+                (
+                    "reserved",
+                    models.PositiveIntegerField(
+                        db_default=0, default=0, verbose_name="В резерве"
+                    ),
+                ),
+                ("price", models.PositiveIntegerField(verbose_name="Цена")),
+                (
+                    "price_rrc",
+                    models.PositiveIntegerField(verbose_name="Розничная цена"),
+                ),
+                (
+                    "source_hash",
+                    models.CharField(
+                        blank=True, max_length=32, verbose_name="Хэш записи прайс-листа"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Информация о продукте",
+                "verbose_name_plural": "Информация о продуктах",
+                "ordering": ["-model"],
+            },
+        ),
+        migrations.CreateModel(
+            name="CatalogState",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("version", models.BigIntegerField(verbose_name="Версия каталога")),
+                ("hits", models.BigIntegerField(default=0, verbose_name="Попадания")),
+                ("misses", models.BigIntegerField(default=0, verbose_name="Промахи")),
+            ],
+            options={
+                "verbose_name": "Состояние кэша каталога",
+                "verbose_name_plural": "Состояние кэша каталога",
+            },
+        ),
+        migrations.CreateModel(
+            name="Category",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("external_id", models.PositiveIntegerField(verbose_name="Внешний ID")),
+                ("name", models.CharField(max_length=50, verbose_name="Название")),
+            ],
+            options={
+                "verbose_name": "Категория",
+                "verbose_name_plural": "Список категорий",
+                "ordering": ["-name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ImportJob",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "url",
+                    models.URLField(blank=True, max_length=255, verbose_name="Ссылка"),
+                ),
+                (
+                    "file",
+                    models.FileField(
+                        blank=True, upload_to="price_lists/", verbose_name="Файл"
+                    ),
+                ),
+                (
+                    "file_name",
+                    models.CharField(
+                        blank=True,
+                        max_length=255,
+                        verbose_name="Имя загруженного файла",
+                    ),
+                ),
+                (
+                    "state",
+                    models.CharField(
+                        choices=[
+                            ("pending", "В очереди"),
+                            ("running", "Выполняется"),
+                            ("done", "Завершён"),
+                            ("failed", "Ошибка"),
+                        ],
+                        default="pending",
+                        max_length=10,
+                        verbose_name="Состояние",
+                    ),
+                ),
+                (
+                    "merged",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Объединено загрузок"
+                    ),
+                ),
+                (
+                    "processed",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Обработано товаров"
+                    ),
+                ),
+                (
+                    "created",
+                    models.PositiveIntegerField(default=0, verbose_name="Создано"),
+                ),
+                (
+                    "updated",
+                    models.PositiveIntegerField(default=0, verbose_name="Обновлено"),
+                ),
+                (
+                    "skipped",
+                    models.PositiveIntegerField(default=0, verbose_name="Пропущено"),
+                ),
+                (
+                    "deleted",
+                    models.PositiveIntegerField(default=0, verbose_name="Удалено"),
+                ),
+                (
+                    "unchanged",
+                    models.BooleanField(
+                        default=False, verbose_name="Прайс-лист не изменился"
+                    ),
+                ),
+                (
+                    "errors",
+                    models.JSONField(blank=True, default=list, verbose_name="Ошибки"),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "started_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Начало обработки"
+                    ),
+                ),
+                (
+                    "finished_at",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="Окончание обработки"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Задача импорта",
+                "verbose_name_plural": "Список задач импорта",
+                "ordering": ["-created_at"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ImportStage",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "fingerprint",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="Отпечаток прайс-листа"
+                    ),
+                ),
+                (
+                    "categories",
+                    models.JSONField(default=list, verbose_name="Категории"),
+                ),
+                (
+                    "staged",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Записано товаров"
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Незавершённый импорт",
+                "verbose_name_plural": "Список незавершённых импортов",
+            },
+        ),
+        migrations.CreateModel(
+            name="ImportStageItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "position",
+                    models.PositiveIntegerField(verbose_name="Номер в прайс-листе"),
+                ),
+                (
+                    "data",
+                    models.JSONField(
+                        encoder=django.core.serializers.json.DjangoJSONEncoder,
+                        verbose_name="Товар",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Товар незавершённого импорта",
+                "verbose_name_plural": "Список товаров незавершённых импортов",
+            },
+        ),
+        migrations.CreateModel(
+            name="Order",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dt",
+                    models.DateTimeField(
+                        auto_now_add=True, verbose_name="Дата создания"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата изменения"),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("basket", "Статус корзины"),
+                            ("new", "Новый"),
+                            ("confirmed", "Подтвержден"),
+                            ("assembled", "Собран"),
+                            ("sent", "Отправлен"),
+                            ("delivered", "Доставлен"),
+                            ("canceled", "Отменен"),
+                        ],
+                        default="new",
+                        max_length=12,
+                        verbose_name="Статус",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Заказ",
+                "verbose_name_plural": "Список заказов",
+                "ordering": ["-dt"],
+            },
+        ),
+        migrations.CreateModel(
+            name="OrderItem",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="Количество")),
+                (
+                    "unit_price",
+                    models.DecimalField(
+                        blank=True,
+                        decimal_places=2,
+                        max_digits=10,
+                        null=True,
+                        verbose_name="Цена за единицу",
+                    ),
+                ),
+                (
+                    "total_price",
+                    models.DecimalField(
+                        decimal_places=2, max_digits=10, verbose_name="Общая стоимость"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Заказанная позиция",
+                "verbose_name_plural": "Список заказанных позиций",
+                "ordering": ["-pk"],
+            },
+        ),
+        migrations.CreateModel(
+            name="Parameter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=80, verbose_name="Название")),
+            ],
+            options={
+                "verbose_name": "Имя параметра",
+                "verbose_name_plural": "Список имён параметров",
+                "ordering": ["-name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ParameterFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.CharField(max_length=150, verbose_name="Значение")),
+                (
+                    "number",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Числовое значение"
+                    ),
+                ),
+                (
+                    "flag",
+                    models.BooleanField(
+                        blank=True, null=True, verbose_name="Логическое значение"
+                    ),
+                ),
+                (
+                    "count",
+                    models.PositiveIntegerField(verbose_name="Количество позиций"),
+                ),
+            ],
+            options={
+                "verbose_name": "Значение фасета",
+                "verbose_name_plural": "Фасеты параметров",
+            },
+        ),
+        migrations.CreateModel(
+            name="PriceListSource",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("url", models.URLField(max_length=255, verbose_name="Ссылка")),
+                (
+                    "etag",
+                    models.CharField(blank=True, max_length=255, verbose_name="ETag"),
+                ),
+                (
+                    "last_modified",
+                    models.CharField(
+                        blank=True, max_length=64, verbose_name="Last-Modified"
+                    ),
+                ),
+                (
+                    "updated_at",
+                    models.DateTimeField(auto_now=True, verbose_name="Дата обновления"),
+                ),
+            ],
+            options={
+                "verbose_name": "Источник прайс-листа",
+                "verbose_name_plural": "Список источников прайс-листов",
+            },
+        ),
+        migrations.CreateModel(
+            name="Product",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=80, verbose_name="Название")),
+            ],
+            options={
+                "verbose_name": "Продукт",
+                "verbose_name_plural": "Список продуктов",
+                "ordering": ["-name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductParameter",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("value", models.CharField(max_length=150, verbose_name="Значение")),
+                (
+                    "number",
+                    models.FloatField(
+                        blank=True, null=True, verbose_name="Числовое значение"
+                    ),
+                ),
+                (
+                    "flag",
+                    models.BooleanField(
+                        blank=True, null=True, verbose_name="Логическое значение"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Параметр",
+                "verbose_name_plural": "Список параметров",
+            },
+        ),
+        migrations.CreateModel(
+            name="Shop",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("name", models.CharField(max_length=80, verbose_name="Название")),
+                (
+                    "url",
+                    models.URLField(
+                        blank=True, max_length=255, null=True, verbose_name="Ссылка"
+                    ),
+                ),
+                (
+                    "import_fingerprint",
+                    models.CharField(
+                        blank=True,
+                        max_length=64,
+                        verbose_name="Отпечаток последнего прайс-листа",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Магазин",
+                "verbose_name_plural": "Список магазинов",
+                "ordering": ["-name"],
+            },
+        ),
+        migrations.CreateModel(
+            name="StockHold",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="Количество")),
+                (
+                    "expires_at",
+                    models.DateTimeField(db_index=True, verbose_name="Действует до"),
+                ),
+            ],
+            options={
+                "verbose_name": "Резерв остатка",
+                "verbose_name_plural": "Резервы остатков",
+            },
+        ),
+        migrations.CreateModel(
+            name="CatalogEntry",
+            fields=[
+                (
+                    "product_info",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="catalog_entry",
+                        serialize=False,
+                        to="backend.productinfo",
+                        verbose_name="Информация о продукте",
+                    ),
+                ),
+                ("shop_name", models.CharField(max_length=80, verbose_name="Магазин")),
+                (
+                    "product_name",
+                    models.CharField(max_length=80, verbose_name="Продукт"),
+                ),
+                (
+                    "category_name",
+                    models.CharField(max_length=50, verbose_name="Категория"),
+                ),
+                (
+                    "model",
+                    models.CharField(blank=True, max_length=80, verbose_name="Модель"),
+                ),
+                ("quantity", models.PositiveIntegerField(verbose_name="Количество")),
+                (
+                    "price_rrc",
+                    models.PositiveIntegerField(verbose_name="Розничная цена"),
+                ),
+                (
+                    "search_vector",
+                    django.contrib.postgres.search.SearchVectorField(
+                        editable=False, null=True, verbose_name="Поисковый документ"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Строка каталога",
+                "verbose_name_plural": "Каталог товаров",
+                "ordering": ["-model"],
+            },
+        ),
+    ]
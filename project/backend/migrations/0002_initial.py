@@ -0,0 +1,423 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:26
+
+import django.contrib.postgres.indexes
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("backend", "0001_initial"),
+        ("users", "0001_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="importjob",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="import_jobs",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importstageitem",
+            name="stage",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="items",
+                to="backend.importstage",
+                verbose_name="Незавершённый импорт",
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="contact",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="users.contact",
+                verbose_name="Контактная информация",
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="orders",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="order",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="backend.order",
+                verbose_name="Заказ",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="price_source",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="order_items",
+                to="backend.productinfo",
+                verbose_name="Источник цены",
+            ),
+        ),
+        migrations.AddField(
+            model_name="parameterfacet",
+            name="parameter",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="facets",
+                to="backend.parameter",
+                verbose_name="Параметр",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pricelistsource",
+            name="user",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="price_list_sources",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productinfo",
+            name="product",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_info",
+                to="backend.product",
+                verbose_name="Продукт",
+            ),
+        ),
+        migrations.AddField(
+            model_name="product",
+            name="category",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                to="backend.category",
+                verbose_name="Категория",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="product",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="backend.product",
+                verbose_name="Продукт",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productparameter",
+            name="parameter",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_parameters",
+                to="backend.parameter",
+                verbose_name="Параметр",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productparameter",
+            name="product_info",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_parameters",
+                to="backend.productinfo",
+                verbose_name="Информация о продукте",
+            ),
+        ),
+        migrations.AddField(
+            model_name="shop",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Пользователь",
+            ),
+        ),
+        migrations.AddField(
+            model_name="productinfo",
+            name="shop",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="product_info",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="pricelistsource",
+            name="shop",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="price_list_sources",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="parameterfacet",
+            name="shop",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="parameter_facets",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="orderitem",
+            name="shop",
+            field=models.ForeignKey(
+                blank=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importstage",
+            name="shop",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="import_stage",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="importjob",
+            name="shop",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="import_jobs",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="shops",
+            field=models.ManyToManyField(
+                blank=True,
+                related_name="categories",
+                to="backend.shop",
+                verbose_name="Магазины",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stockhold",
+            name="item",
+            field=models.OneToOneField(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="hold",
+                to="backend.orderitem",
+                verbose_name="Строка заказа",
+            ),
+        ),
+        migrations.AddField(
+            model_name="stockhold",
+            name="offer",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="holds",
+                to="backend.productinfo",
+                verbose_name="Позиция магазина",
+            ),
+        ),
+        migrations.AddField(
+            model_name="catalogentry",
+            name="category",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="catalog_entries",
+                to="backend.category",
+                verbose_name="Категория",
+            ),
+        ),
+        migrations.AddField(
+            model_name="catalogentry",
+            name="product",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="catalog_entries",
+                to="backend.product",
+                verbose_name="Продукт",
+            ),
+        ),
+        migrations.AddField(
+            model_name="catalogentry",
+            name="shop",
+            field=models.ForeignKey(
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="catalog_entries",
+                to="backend.shop",
+                verbose_name="Магазин",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="importstageitem",
+            constraint=models.UniqueConstraint(
+                fields=("stage", "position"), name="unique_stage_item"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["user", "status", "dt", "id"], name="order_user_status_dt_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productparameter",
+            index=models.Index(
+                fields=["parameter", "value"], name="product_parameter_value_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productparameter",
+            index=models.Index(
+                condition=models.Q(("number__isnull", False)),
+                fields=["parameter", "number"],
+                name="product_parameter_number_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="productparameter",
+            index=models.Index(
+                condition=models.Q(("flag__isnull", False)),
+                fields=["parameter", "flag"],
+                name="product_parameter_flag_idx",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productparameter",
+            constraint=models.UniqueConstraint(
+                fields=("product_info", "parameter"), name="unique_product_parameter"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="productinfo",
+            constraint=models.UniqueConstraint(
+                fields=("external_id", "shop"), name="unique_product_info"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="pricelistsource",
+            constraint=models.UniqueConstraint(
+                fields=("user", "url"), name="unique_price_list_source"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="parameterfacet",
+            constraint=models.UniqueConstraint(
+                fields=("shop", "parameter", "value"), name="unique_parameter_facet"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="importjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("state", "pending")),
+                fields=("user", "url", "file_name"),
+                name="unique_pending_import_job",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="importjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("state", "running")),
+                fields=("user",),
+                name="unique_running_import_job",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["model", "product_info"], name="catalog_model_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["price_rrc", "product_info"], name="catalog_price_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["quantity", "product_info"], name="catalog_quantity_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["product_name", "product_info"], name="catalog_product_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["shop_name", "product_info"], name="catalog_shop_name_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=models.Index(
+                fields=["category_name", "product_info"],
+                name="catalog_category_name_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["search_vector"], name="catalog_search_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["model"],
+                name="catalog_model_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="catalogentry",
+            index=django.contrib.postgres.indexes.GinIndex(
+                fields=["product_name"],
+                name="catalog_product_name_trgm_idx",
+                opclasses=["gin_trgm_ops"],
+            ),
+        ),
+    ]
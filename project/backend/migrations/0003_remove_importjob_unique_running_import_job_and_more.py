@@ -0,0 +1,27 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:31
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("backend", "0002_initial"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name="importjob",
+            name="unique_running_import_job",
+        ),
+        migrations.AddConstraint(
+            model_name="importjob",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("state", "running")),
+                fields=("user", "url", "file_name"),
+                name="unique_running_import_job",
+            ),
+        ),
+    ]
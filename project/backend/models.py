@@ -1,5 +1,9 @@
 from django.db import models
 from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
 
 from users.models import Contact
 
@@ -14,6 +18,13 @@ ORDER_STATUS = (
     ("canceled", "Отменен"),
 )
 
+IMPORT_JOB_STATES = (
+    ("pending", "В очереди"),
+    ("running", "Выполняется"),
+    ("done", "Завершён"),
+    ("failed", "Ошибка"),
+)
+
 
 class Shop(models.Model):
     name = models.CharField(max_length=80, verbose_name="Название")
@@ -27,6 +38,11 @@ class Shop(models.Model):
     url = models.URLField(
         max_length=255, verbose_name="Ссылка", blank=True, null=True
     )
+    import_fingerprint = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name="Отпечаток последнего прайс-листа",
+    )
 
     class Meta:
         ordering = ["-name"]
@@ -86,8 +102,16 @@ class ProductInfo(models.Model):
     external_id = models.PositiveIntegerField(verbose_name="Внешний ID")
     model = models.CharField(max_length=80, verbose_name="Модель", blank=True)
     quantity = models.PositiveIntegerField(verbose_name="Количество")
+    # Сумма активных резервов корзин (StockHold); доступно к заказу
+    # quantity - reserved
+    reserved = models.PositiveIntegerField(
+        default=0, db_default=0, verbose_name="В резерве"
+    )
     price = models.PositiveIntegerField(verbose_name="Цена")
     price_rrc = models.PositiveIntegerField(verbose_name="Розничная цена")
+    source_hash = models.CharField(
+        max_length=32, blank=True, verbose_name="Хэш записи прайс-листа"
+    )
 
     class Meta:
         ordering = ["-model"]
@@ -103,6 +127,138 @@ class ProductInfo(models.Model):
         return f"{self.product} : {self.quantity} pcs"
 
 
+class CatalogEntry(models.Model):
+    """
+    Строка каталога товаров для чтения: позиция магазина вместе
+    с названиями товара, категории и магазина.
+
+    Список товаров читается из этой таблицы без соединений, для всех
+    полей сортировки есть индексы постраничного вывода по ключу, для
+    поиска — поисковый документ и триграммные индексы. Строки
+    обновляются при импорте прайс-листа и при изменении остатков
+    (модуль catalog).
+    """
+
+    product_info = models.OneToOneField(
+        ProductInfo,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="catalog_entry",
+        verbose_name="Информация о продукте",
+    )
+    shop = models.ForeignKey(
+        Shop,
+        on_delete=models.CASCADE,
+        related_name="catalog_entries",
+        verbose_name="Магазин",
+    )
+    shop_name = models.CharField(max_length=80, verbose_name="Магазин")
+    product = models.ForeignKey(
+        Product,
+        on_delete=models.CASCADE,
+        related_name="catalog_entries",
+        verbose_name="Продукт",
+    )
+    product_name = models.CharField(max_length=80, verbose_name="Продукт")
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="catalog_entries",
+        verbose_name="Категория",
+    )
+    category_name = models.CharField(max_length=50, verbose_name="Категория")
+    model = models.CharField(max_length=80, verbose_name="Модель", blank=True)
+    quantity = models.PositiveIntegerField(verbose_name="Количество")
+    price_rrc = models.PositiveIntegerField(verbose_name="Розничная цена")
+    search_vector = SearchVectorField(
+        null=True, editable=False, verbose_name="Поисковый документ"
+    )
+
+    class Meta:
+        ordering = ["-model"]
+        verbose_name = "Строка каталога"
+        verbose_name_plural = "Каталог товаров"
+        # Индексы для постраничного вывода каталога по ключу и поиска
+        indexes = [
+            models.Index(
+                fields=["model", "product_info"], name="catalog_model_idx"
+            ),
+            models.Index(
+                fields=["price_rrc", "product_info"], name="catalog_price_idx"
+            ),
+            models.Index(
+                fields=["quantity", "product_info"],
+                name="catalog_quantity_idx",
+            ),
+            models.Index(
+                fields=["product_name", "product_info"],
+                name="catalog_product_name_idx",
+            ),
+            models.Index(
+                fields=["shop_name", "product_info"],
+                name="catalog_shop_name_idx",
+            ),
+            models.Index(
+                fields=["category_name", "product_info"],
+                name="catalog_category_name_idx",
+            ),
+            GinIndex(fields=["search_vector"], name="catalog_search_idx"),
+            GinIndex(
+                fields=["model"],
+                opclasses=["gin_trgm_ops"],
+                name="catalog_model_trgm_idx",
+            ),
+            GinIndex(
+                fields=["product_name"],
+                opclasses=["gin_trgm_ops"],
+                name="catalog_product_name_trgm_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product_name} ({self.shop_name})"
+
+
+class CatalogState(models.Model):
+    """
+    Общее для всех процессов состояние кэша каталога (одна строка):
+    версия каталога, входящая в ключи кэшированных ответов и ETag списка
+    товаров.
+
+    Хранится в базе, а не в кэше Django: импорт выполняет отдельный
+    процесс, а кэш в памяти у каждого процесса свой.
+    """
+
+    version = models.BigIntegerField(verbose_name="Версия каталога")
+
+    class Meta:
+        verbose_name = "Состояние кэша каталога"
+        verbose_name_plural = "Состояние кэша каталога"
+
+    def __str__(self):
+        return f"Версия каталога {self.version}"
+
+
+class CatalogCacheStats(models.Model):
+    """
+    Счётчики попаданий и промахов кэша каталога всех процессов (одна
+    строка).
+
+    Хранятся отдельно от версии каталога: запись счётчиков из запросов
+    не ждёт увеличения версии и не мешает ему.
+    """
+
+    hits = models.BigIntegerField(default=0, verbose_name="Попадания")
+    misses = models.BigIntegerField(default=0, verbose_name="Промахи")
+
+    class Meta:
+        verbose_name = "Счётчики кэша каталога"
+        verbose_name_plural = "Счётчики кэша каталога"
+
+    def __str__(self):
+        return f"Попадания {self.hits}, промахи {self.misses}"
+
+
 class Parameter(models.Model):
     name = models.CharField(max_length=80, verbose_name="Название")
 
@@ -131,6 +287,14 @@ class ProductParameter(models.Model):
         blank=True,
     )
     value = models.CharField(max_length=150, verbose_name="Значение")
+    # Типизированные копии value, которые заполняет импорт: число или
+    # логическое значение, если value можно так прочитать
+    number = models.FloatField(
+        null=True, blank=True, verbose_name="Числовое значение"
+    )
+    flag = models.BooleanField(
+        null=True, blank=True, verbose_name="Логическое значение"
+    )
 
     class Meta:
         verbose_name = "Параметр"
@@ -141,6 +305,24 @@ class ProductParameter(models.Model):
                 name="unique_product_parameter",
             )
         ]
+        indexes = [
+            # Отбор позиций по значению параметра
+            models.Index(
+                fields=["parameter", "value"],
+                name="product_parameter_value_idx",
+            ),
+            # Диапазоны и равенство по типизированным значениям
+            models.Index(
+                fields=["parameter", "number"],
+                name="product_parameter_number_idx",
+                condition=models.Q(number__isnull=False),
+            ),
+            models.Index(
+                fields=["parameter", "flag"],
+                name="product_parameter_flag_idx",
+                condition=models.Q(flag__isnull=False),
+            ),
+        ]
 
     def __str__(self):
         return (
@@ -148,6 +330,59 @@ class ProductParameter(models.Model):
         )
 
 
+class ParameterFacet(models.Model):
+    """
+    Количество позиций магазина в категории с данным значением
+    параметра.
+
+    Импорт прайс-листа меняет счётчики магазина на разницу по своим
+    изменившимся позициям, поэтому блок фасетов каталога складывается из
+    небольшой таблицы, а не подсчитывается по всем параметрам позиций.
+    """
+
+    shop = models.ForeignKey(
+        Shop,
+        on_delete=models.CASCADE,
+        related_name="parameter_facets",
+        verbose_name="Магазин",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.CASCADE,
+        related_name="parameter_facets",
+        verbose_name="Категория",
+    )
+    parameter = models.ForeignKey(
+        Parameter,
+        on_delete=models.CASCADE,
+        related_name="facets",
+        verbose_name="Параметр",
+    )
+    value = models.CharField(max_length=150, verbose_name="Значение")
+    # Типизированные значения как у ProductParameter, чтобы условия
+    # отбора позиций можно было проверить и по фасетам
+    number = models.FloatField(
+        null=True, blank=True, verbose_name="Числовое значение"
+    )
+    flag = models.BooleanField(
+        null=True, blank=True, verbose_name="Логическое значение"
+    )
+    count = models.PositiveIntegerField(verbose_name="Количество позиций")
+
+    class Meta:
+        verbose_name = "Значение фасета"
+        verbose_name_plural = "Фасеты параметров"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["shop", "category", "parameter", "value"],
+                name="unique_parameter_facet",
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.parameter.name}: {self.value} ({self.count})"
+
+
 class Order(models.Model):
     user = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -156,6 +391,9 @@ class Order(models.Model):
         verbose_name="Пользователь",
     )
     dt = models.DateTimeField(auto_now_add=True, verbose_name="Дата создания")
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата изменения"
+    )
     status = models.CharField(
         max_length=12,
         choices=ORDER_STATUS,
@@ -173,10 +411,26 @@ class Order(models.Model):
         ordering = ["-dt"]
         verbose_name = "Заказ"
         verbose_name_plural = "Список заказов"
+        # Список заказов пользователя с отбором по статусу и дате
+        # и постраничным выводом по ключу (дата, ID)
+        indexes = [
+            models.Index(
+                fields=["user", "status", "dt", "id"],
+                name="order_user_status_dt_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"Статус: {self.status} / Пользователь: {self.user}"
 
+    def touch(self):
+        """
+        Отмечает изменение заказа, например его позиций, одним UPDATE,
+        не перезаписывая остальные поля.
+        """
+        self.updated_at = timezone.now()
+        Order.objects.filter(pk=self.pk).update(updated_at=self.updated_at)
+
 
 class OrderItem(models.Model):
     order = models.ForeignKey(
@@ -189,6 +443,21 @@ class OrderItem(models.Model):
         Shop, on_delete=models.CASCADE, verbose_name="Магазин", blank=True
     )
     quantity = models.PositiveIntegerField(verbose_name="Количество")
+    unit_price = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        verbose_name="Цена за единицу",
+    )
+    price_source = models.ForeignKey(
+        ProductInfo,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="order_items",
+        verbose_name="Источник цены",
+    )
     total_price = models.DecimalField(
         max_digits=10, decimal_places=2, verbose_name="Общая стоимость"
     )
@@ -201,9 +470,236 @@ class OrderItem(models.Model):
     def __str__(self):
         return f"{self.order} | {self.product} × {self.quantity} шт."
 
+    def set_price(self, price_rrc, source_id):
+        """
+        Запоминает рекомендованную розничную цену позиции магазина
+        source_id на момент добавления товара в заказ. Цена передаётся
+        вызывающим кодом, который уже прочитал позицию магазина.
+        """
+        self.unit_price = price_rrc
+        self.price_source_id = source_id
+
+    def update_total(self):
+        """
+        Пересчитывает общую стоимость по запомненной цене без обращения
+        к базе.
+        """
+        self.total_price = self.quantity * self.unit_price
+
     def save(self, *args, **kwargs):
-        # Расчет общей стоимости с учетом рекомендованной розничной цены
-        self.total_price = (
-            self.quantity * self.product.product_info.first().price_rrc
-        )
+        if self.unit_price is None:
+            # Цена не передана: берётся у позиции магазина этой строки
+            offer = (
+                ProductInfo.objects.filter(
+                    product_id=self.product_id, shop_id=self.shop_id
+                )
+                .values_list("price_rrc", "id")
+                .first()
+            )
+            if offer is None:
+                raise ProductInfo.DoesNotExist(
+                    f"Product {self.product_id} is not sold by "
+                    f"shop {self.shop_id}."
+                )
+            self.set_price(*offer)
+        self.update_total()
         super().save(*args, **kwargs)
+
+
+class StockHold(models.Model):
+    """
+    Резерв остатка позиции магазина под строку корзины.
+
+    Резерв живёт до expires_at, после чего его снимает периодическая
+    очистка (release_stock_holds). Сумма резервов позиции хранится
+    в ProductInfo.reserved, поэтому меняется только вместе с ним
+    функциями модуля stock.
+    """
+
+    item = models.OneToOneField(
+        OrderItem,
+        on_delete=models.CASCADE,
+        related_name="hold",
+        verbose_name="Строка заказа",
+    )
+    offer = models.ForeignKey(
+        ProductInfo,
+        on_delete=models.CASCADE,
+        related_name="holds",
+        verbose_name="Позиция магазина",
+    )
+    quantity = models.PositiveIntegerField(verbose_name="Количество")
+    expires_at = models.DateTimeField(
+        db_index=True, verbose_name="Действует до"
+    )
+
+    class Meta:
+        verbose_name = "Резерв остатка"
+        verbose_name_plural = "Резервы остатков"
+
+    def __str__(self):
+        return f"{self.item} до {self.expires_at}"
+
+
+class PriceListSource(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="price_list_sources",
+        verbose_name="Пользователь",
+    )
+    url = models.URLField(max_length=255, verbose_name="Ссылка")
+    shop = models.ForeignKey(
+        Shop,
+        on_delete=models.CASCADE,
+        related_name="price_list_sources",
+        verbose_name="Магазин",
+        blank=True,
+        null=True,
+    )
+    etag = models.CharField(max_length=255, blank=True, verbose_name="ETag")
+    last_modified = models.CharField(
+        max_length=64, blank=True, verbose_name="Last-Modified"
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True, verbose_name="Дата обновления"
+    )
+
+    class Meta:
+        verbose_name = "Источник прайс-листа"
+        verbose_name_plural = "Список источников прайс-листов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "url"], name="unique_price_list_source"
+            )
+        ]
+
+    def __str__(self):
+        return self.url
+
+
+class ImportJob(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="import_jobs",
+        verbose_name="Пользователь",
+    )
+    shop = models.ForeignKey(
+        Shop,
+        on_delete=models.SET_NULL,
+        related_name="import_jobs",
+        verbose_name="Магазин",
+        blank=True,
+        null=True,
+    )
+    url = models.URLField(max_length=255, verbose_name="Ссылка", blank=True)
+    file = models.FileField(
+        upload_to="price_lists/", verbose_name="Файл", blank=True
+    )
+    file_name = models.CharField(
+        max_length=255, verbose_name="Имя загруженного файла", blank=True
+    )
+    state = models.CharField(
+        max_length=10,
+        choices=IMPORT_JOB_STATES,
+        default="pending",
+        verbose_name="Состояние",
+    )
+    merged = models.PositiveIntegerField(
+        default=0, verbose_name="Объединено загрузок"
+    )
+    processed = models.PositiveIntegerField(
+        default=0, verbose_name="Обработано товаров"
+    )
+    created = models.PositiveIntegerField(default=0, verbose_name="Создано")
+    updated = models.PositiveIntegerField(default=0, verbose_name="Обновлено")
+    skipped = models.PositiveIntegerField(default=0, verbose_name="Пропущено")
+    deleted = models.PositiveIntegerField(default=0, verbose_name="Удалено")
+    unchanged = models.BooleanField(
+        default=False, verbose_name="Прайс-лист не изменился"
+    )
+    errors = models.JSONField(default=list, blank=True, verbose_name="Ошибки")
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата создания"
+    )
+    started_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="Начало обработки"
+    )
+    finished_at = models.DateTimeField(
+        blank=True, null=True, verbose_name="Окончание обработки"
+    )
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Задача импорта"
+        verbose_name_plural = "Список задач импорта"
+        constraints = [
+            # Магазин прайс-листа известен только после разбора файла,
+            # поэтому с ожидающей задачей объединяются загрузки той же
+            # ссылки или файла с тем же именем: у пользователя может
+            # быть несколько магазинов
+            models.UniqueConstraint(
+                fields=["user", "url", "file_name"],
+                condition=models.Q(state="pending"),
+                name="unique_pending_import_job",
+            ),
+            # Один прайс-лист не импортируется дважды одновременно;
+            # прайс-листы из разных источников импортируются параллельно,
+            # а одновременные импорты одного магазина упорядочивает
+            # блокировка shop_import_lock
+            models.UniqueConstraint(
+                fields=["user", "url", "file_name"],
+                condition=models.Q(state="running"),
+                name="unique_running_import_job",
+            ),
+        ]
+
+    def __str__(self):
+        return f"Импорт #{self.pk} ({self.state}) / {self.user}"
+
+
+class ImportStage(models.Model):
+    shop = models.OneToOneField(
+        Shop,
+        on_delete=models.CASCADE,
+        related_name="import_stage",
+        verbose_name="Магазин",
+    )
+    fingerprint = models.CharField(
+        max_length=64, blank=True, verbose_name="Отпечаток прайс-листа"
+    )
+    categories = models.JSONField(default=list, verbose_name="Категории")
+    staged = models.PositiveIntegerField(
+        default=0, verbose_name="Записано товаров"
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата создания"
+    )
+
+    class Meta:
+        verbose_name = "Незавершённый импорт"
+        verbose_name_plural = "Список незавершённых импортов"
+
+    def __str__(self):
+        return f"{self.shop} ({self.staged})"
+
+
+class ImportStageItem(models.Model):
+    stage = models.ForeignKey(
+        ImportStage,
+        on_delete=models.CASCADE,
+        related_name="items",
+        verbose_name="Незавершённый импорт",
+    )
+    position = models.PositiveIntegerField(verbose_name="Номер в прайс-листе")
+    data = models.JSONField(encoder=DjangoJSONEncoder, verbose_name="Товар")
+
+    class Meta:
+        verbose_name = "Товар незавершённого импорта"
+        verbose_name_plural = "Список товаров незавершённых импортов"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["stage", "position"], name="unique_stage_item"
+            )
+        ]
@@ -0,0 +1,226 @@
+import datetime
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as Base64Error
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по ключу (keyset) без OFFSET.
+
+    Страница выбирается условием «строки после последней строки
+    предыдущей страницы» по полям сортировки запроса, к которым
+    добавляется первичный ключ для однозначного порядка. Поэтому дальние
+    страницы стоят столько же, сколько первая, если для полей сортировки
+    есть индекс (поле, ключ). Поля сортировки не должны принимать NULL.
+
+    Курсор непрозрачен для клиента: это base64 от значений полей
+    сортировки граничной строки. Курсор, выданный для одной сортировки,
+    с другой не принимается.
+    """
+
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    page_size_setting = "CATALOG_PAGE_SIZE"
+    max_page_size = 1000
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_page_size(self, request):
+        page_size = getattr(settings, self.page_size_setting, 50)
+        value = request.query_params.get(self.page_size_query_param)
+        if value is not None:
+            try:
+                page_size = int(value)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        cursor = self.decode_cursor(request)
+
+        reverse = cursor is not None and cursor["r"]
+        ordering = self.ordering
+        if reverse:
+            ordering = [flip(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if cursor is not None:
+            queryset = queryset.filter(rows_after(ordering, cursor["v"]))
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+        self.rows = rows
+        return rows
+
+    def get_ordering(self, queryset):
+        """
+        Возвращает поля сортировки запроса с первичным ключом в конце.
+        """
+        key = queryset.model._meta.pk.attname
+        # pk заменяется столбцом ключа: так значение поля есть и в строке
+        # values()
+        ordering = [
+            field.replace("pk", key) if field.lstrip("-") == "pk" else field
+            for field in (
+                queryset.query.order_by or queryset.model._meta.ordering
+            )
+            if isinstance(field, str)
+        ]
+        if not any(field.lstrip("-") == key for field in ordering):
+            # Ключ сортируется в ту же сторону, что и последнее поле,
+            # чтобы подходил индекс (поле, ключ)
+            desc = bool(ordering) and ordering[-1].startswith("-")
+            ordering.append(f"-{key}" if desc else key)
+        return ordering
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            if cursor["o"] != self.ordering or len(cursor["v"]) != len(
+                self.ordering
+            ):
+                raise ValueError("Cursor ordering mismatch")
+            cursor["r"] = bool(cursor["r"])
+        except (
+            Base64Error,
+            KeyError,
+            TypeError,
+            UnicodeDecodeError,
+            ValueError,
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    def encode_cursor(self, row, reverse):
+        cursor = {
+            "o": self.ordering,
+            "v": [row_value(row, field) for field in self.ordering],
+            "r": int(reverse),
+        }
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, cls=CursorEncoder).encode()
+        ).decode()
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, encoded
+        )
+
+    def get_next_link(self):
+        if not self.has_next or not self.rows:
+            return None
+        return self.encode_cursor(self.rows[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.rows:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        return self.encode_cursor(self.rows[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {
+                    "type": "string",
+                    "nullable": True,
+                    "format": "uri",
+                },
+                "results": schema,
+            },
+        }
+
+
+class OrderPagination(KeysetPagination):
+    """
+    Постраничный вывод заказов по ключу; размер страницы задаёт
+    ORDER_PAGE_SIZE.
+    """
+
+    page_size_setting = "ORDER_PAGE_SIZE"
+
+
+class CursorEncoder(DjangoJSONEncoder):
+    """
+    Сохраняет время в курсоре с микросекундами: DjangoJSONEncoder
+    округляет его до миллисекунд, и строки с одинаковым началом
+    времени пропускались бы на границе страницы.
+    """
+
+    def default(self, o):
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def flip(field):
+    """
+    Меняет направление сортировки поля.
+    """
+    return field[1:] if field.startswith("-") else f"-{field}"
+
+
+def row_value(row, field):
+    """
+    Возвращает значение поля сортировки, в том числе через связи
+    (product__name). Строка — экземпляр модели или словарь values().
+    """
+    if isinstance(row, dict):
+        return row[field.lstrip("-")]
+    value = row
+    for name in field.lstrip("-").split("__"):
+        value = getattr(value, name)
+    return value
+
+
+def rows_after(ordering, values):
+    """
+    Строит условие «строка идёт после строки со значениями values» для
+    сортировки ordering:
+    (a > x) OR (a = x AND b > y) OR (a = x AND b = y AND id > z).
+
+    Добавочное условие a >= x по первому полю позволяет базе начать
+    просмотр индекса с нужного места.
+    """
+    condition = None
+    for field, value in reversed(list(zip(ordering, values))):
+        name = field.lstrip("-")
+        lookup = "lt" if field.startswith("-") else "gt"
+        after = Q(**{f"{name}__{lookup}": value})
+        if condition is not None:
+            after |= Q(**{name: value}) & condition
+        condition = after
+
+    first, value = ordering[0], values[0]
+    lookup = "lte" if first.startswith("-") else "gte"
+    return Q(**{f"{first.lstrip('-')}__{lookup}": value}) & condition
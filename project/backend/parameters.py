@@ -0,0 +1,148 @@
+import re
+
+from django.db.models import (
+    BooleanField,
+    Case,
+    F,
+    FloatField,
+    Func,
+    Value,
+    When,
+)
+from django.db.models.functions import Cast, Replace
+from django.db.models.lookups import Exact
+
+from .models import ProductParameter
+
+
+# Значение параметра считается числом, только если оно целиком записано
+# цифрами с необязательными знаком и дробной частью через точку или
+# запятую. Шаблон проверяется на всю строку: в Python через fullmatch,
+# в SQL между ^ и $ (в PostgreSQL $ совпадает только с концом строки,
+# а в Python — и перед завершающим переводом строки)
+NUMBER_PATTERN = r"-?[0-9]+([.,][0-9]+)?"
+
+# Значения логических параметров (после приведения к нижнему регистру);
+# булевы значения YAML и JSON приходят из прайс-листа как True и False
+FLAG_VALUES = {
+    "true": True,
+    "да": True,
+    "yes": True,
+    "false": False,
+    "нет": False,
+    "no": False,
+}
+
+# Буквы значений FLAG_VALUES: к нижнему регистру приводятся только они,
+# заменой по таблице в Python и функцией TRANSLATE в SQL. lower() и
+# UPPER() базы для кириллицы зависят от локали (LC_CTYPE) и могли бы
+# разойтись с Python
+FLAG_LETTERS = "".join(sorted(set("".join(FLAG_VALUES))))
+
+_number_re = re.compile(NUMBER_PATTERN)
+_flag_case = str.maketrans(FLAG_LETTERS.upper(), FLAG_LETTERS)
+
+
+def parse_number(value):
+    """
+    Возвращает числовое значение параметра или None, если значение
+    не число.
+    """
+    if _number_re.fullmatch(value):
+        return float(value.replace(",", "."))
+    return None
+
+
+def parse_flag(value):
+    """
+    Возвращает логическое значение параметра или None, если значение
+    не логическое.
+    """
+    return FLAG_VALUES.get(value.translate(_flag_case))
+
+
+def typed_values(value):
+    """
+    Разбирает строковое значение параметра в типизированные поля
+    ProductParameter.
+
+    Возвращает:
+        Словарь с полями number и flag.
+    """
+    return {"number": parse_number(value), "flag": parse_flag(value)}
+
+
+def number_expression():
+    """
+    SQL-выражение числового значения ProductParameter.value, совпадающее
+    с parse_number.
+    """
+    return Case(
+        When(
+            value__regex=f"^{NUMBER_PATTERN}$",
+            then=Cast(Replace("value", Value(","), Value(".")), FloatField()),
+        ),
+        output_field=FloatField(),
+    )
+
+
+def flag_expression():
+    """
+    SQL-выражение логического значения ProductParameter.value,
+    совпадающее с parse_flag.
+    """
+    folded = Func(
+        F("value"),
+        Value(FLAG_LETTERS.upper()),
+        Value(FLAG_LETTERS),
+        function="TRANSLATE",
+    )
+    return Case(
+        *(
+            When(Exact(folded, Value(text)), then=Value(flag))
+            for text, flag in FLAG_VALUES.items()
+        ),
+        output_field=BooleanField(),
+    )
+
+
+def backfill_typed_values(batch_size=10000):
+    """
+    Заполняет типизированные поля параметров, записанных до их
+    появления, диапазонами id, чтобы не держать блокировки на всю
+    таблицу. Значения вычисляются в базе, без выгрузки строк.
+
+    Возвращает:
+        Количество обновлённых параметров.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        ids = list(
+            ProductParameter.objects.filter(id__gt=last_id)
+            .order_by("id")
+            .values_list("id", flat=True)[:batch_size]
+        )
+        if not ids:
+            return updated
+        updated += ProductParameter.objects.filter(
+            id__gte=ids[0], id__lte=ids[-1]
+        ).update(number=number_expression(), flag=flag_expression())
+        last_id = ids[-1]
+
+
+def value_lookups(values):
+    """
+    Условие равенства параметра одному из значений values.
+
+    Если все значения логические или все числа, сравнение идёт по
+    типизированному полю, поэтому «да» совпадает с «True», а «16» —
+    с «16.0».
+    """
+    flags = [parse_flag(value) for value in values]
+    if None not in flags:
+        return {"flag__in": flags}
+    numbers = [parse_number(value) for value in values]
+    if None not in numbers:
+        return {"number__in": numbers}
+    return {"value__in": values}
@@ -19,3 +19,12 @@ class IsOwnerOrder(BasePermission):
     def has_object_permission(self, request, view, obj):
         # Проверка, принадлежит ли заказ текущему пользователю
         return obj.user == request.user
+
+
+class IsOwnerImportJob(BasePermission):
+    """
+    Разрешение на доступ только владельцу задачи импорта.
+    """
+
+    def has_object_permission(self, request, view, obj):
+        return obj.user == request.user
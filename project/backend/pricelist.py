@@ -0,0 +1,410 @@
+import csv
+import gzip
+import io
+import json
+from posixpath import splitext
+
+from yaml import (
+    AliasEvent,
+    MappingEndEvent,
+    MappingNode,
+    MappingStartEvent,
+    ScalarEvent,
+    ScalarNode,
+    SequenceEndEvent,
+    SequenceNode,
+    SequenceStartEvent,
+)
+
+try:
+    # Парсер на libyaml работает на порядок быстрее чистого Python
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
+try:
+    from orjson import loads as json_loads
+except ImportError:
+    json_loads = json.loads
+
+try:
+    # Потоковый разбор JSON; с бэкендом yajl2_c объекты собираются в C
+    import ijson
+    from ijson.common import ObjectBuilder
+except ImportError:
+    ijson = None
+
+
+CONTENT_TYPES = {
+    "application/json": "json",
+    "text/json": "json",
+    "text/csv": "csv",
+    "application/csv": "csv",
+    "application/yaml": "yaml",
+    "application/x-yaml": "yaml",
+    "text/yaml": "yaml",
+    "text/x-yaml": "yaml",
+}
+
+GZIP_CONTENT_TYPES = ("application/gzip", "application/x-gzip")
+
+EXTENSIONS = {
+    ".json": "json",
+    ".csv": "csv",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+}
+
+# Колонки CSV с полями товара; остальные колонки считаются параметрами
+CSV_FIELDS = {
+    "shop",
+    "category",
+    "category_name",
+    "id",
+    "name",
+    "model",
+    "price",
+    "price_rrc",
+    "quantity",
+}
+CSV_INT_FIELDS = ("id", "category", "price", "price_rrc", "quantity")
+
+
+class YamlPriceListReader:
+    """
+    Потоковое чтение прайс-листа в формате shop1.yaml.
+
+    Документ разбирается по событиям парсера PyYAML, а в объекты Python
+    превращается только один элемент goods за раз, поэтому расход памяти
+    не зависит от размера файла.
+    """
+
+    def __init__(self, stream):
+        self.loader = YamlLoader(stream)
+        self.anchors = {}
+
+    def read(self):
+        """
+        Разбирает заголовок документа до списка goods.
+
+        Возвращает:
+            dict с ключами документа; значение goods — генератор,
+            выдающий товары по одному.
+        """
+        loader = self.loader
+        loader.get_event()  # StreamStartEvent
+        loader.get_event()  # DocumentStartEvent
+        if not loader.check_event(MappingStartEvent):
+            raise ValueError("Price list must be a mapping")
+        loader.get_event()
+
+        data = {}
+        while not loader.check_event(MappingEndEvent):
+            key = self._construct(self._compose())
+            if key == "goods" and loader.check_event(SequenceStartEvent):
+                loader.get_event()
+                if "categories" in data:
+                    data["goods"] = self._stream_goods()
+                    return data
+                # Категории идут после товаров: потоково разобрать нельзя
+                data["goods"] = list(self._iter_goods())
+                continue
+            data[key] = self._construct(self._compose())
+        self._finish()
+        return data
+
+    def _stream_goods(self):
+        yield from self._iter_goods()
+        self._finish()
+
+    def _iter_goods(self):
+        loader = self.loader
+        while not loader.check_event(SequenceEndEvent):
+            yield self._construct(self._compose())
+        loader.get_event()
+
+    def _finish(self):
+        # Остаток документа после goods не нужен импорту, но его
+        # синтаксис всё равно проверяется
+        loader = self.loader
+        while loader.peek_event() is not None:
+            loader.get_event()
+        loader.dispose()
+
+    def _construct(self, node):
+        return self.loader.construct_document(node)
+
+    def _compose(self):
+        loader = self.loader
+        event = loader.get_event()
+        if isinstance(event, AliasEvent):
+            return self.anchors[event.anchor]
+
+        if isinstance(event, ScalarEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(ScalarNode, event.value, event.implicit)
+            node = ScalarNode(
+                tag,
+                event.value,
+                event.start_mark,
+                event.end_mark,
+                style=event.style,
+            )
+        elif isinstance(event, SequenceStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(SequenceNode, None, event.implicit)
+            node = SequenceNode(tag, [], event.start_mark, None)
+            while not loader.check_event(SequenceEndEvent):
+                node.value.append(self._compose())
+            node.end_mark = loader.get_event().end_mark
+        elif isinstance(event, MappingStartEvent):
+            tag = event.tag
+            if tag is None or tag == "!":
+                tag = loader.resolve(MappingNode, None, event.implicit)
+            node = MappingNode(tag, [], event.start_mark, None)
+            while not loader.check_event(MappingEndEvent):
+                key = self._compose()
+                node.value.append((key, self._compose()))
+            node.end_mark = loader.get_event().end_mark
+        else:
+            raise ValueError(f"Unexpected YAML event: {event}")
+
+        if event.anchor is not None:
+            self.anchors[event.anchor] = node
+        return node
+
+
+def read_yaml(stream):
+    """
+    Читает прайс-лист YAML из файлоподобного объекта.
+
+    Аргументы:
+        stream: Объект с методом read(), возвращающим bytes или str.
+
+    Возвращает:
+        dict с ключами shop, categories и генератором goods.
+    """
+    return YamlPriceListReader(stream).read()
+
+
+class JsonPriceListReader:
+    """
+    Потоковое чтение прайс-листа JSON той же структуры, что и shop1.yaml.
+
+    Заголовок документа до массива goods разбирается по событиям ijson,
+    затем товары по одному выдаёт ijson.items, поэтому расход памяти
+    не зависит от размера файла. Поток читается дважды и должен
+    допускать произвольный доступ.
+    """
+
+    starts = ("start_map", "start_array")
+    ends = ("end_map", "end_array")
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self):
+        """
+        Разбирает ключи документа, кроме goods.
+
+        Возвращает:
+            dict с ключами документа; значение goods — генератор,
+            выдающий товары по одному.
+        """
+        self.stream.seek(0)
+        events = ijson.parse(self.stream, use_float=True)
+        if next(events)[1] != "start_map":
+            raise ValueError("Price list must be an object")
+
+        data = {}
+        has_goods = False
+        for _, event, key in events:
+            if event == "end_map":
+                break
+            _, event, value = next(events)
+            if key == "goods" and event == "start_array":
+                has_goods = True
+                if "categories" in data:
+                    break
+                # Категории идут после товаров: товары пропускаются
+                # и читаются вторым проходом
+                self._skip(events)
+                continue
+            data[key] = self._build(events, event, value)
+        if has_goods:
+            data["goods"] = self._iter_goods()
+        return data
+
+    def _iter_goods(self):
+        self.stream.seek(0)
+        yield from ijson.items(self.stream, "goods.item", use_float=True)
+
+    def _build(self, events, event, value):
+        if event not in self.starts:
+            return value
+        builder = ObjectBuilder()
+        builder.event(event, value)
+        depth = 1
+        for _, event, value in events:
+            builder.event(event, value)
+            if event in self.starts:
+                depth += 1
+            elif event in self.ends:
+                depth -= 1
+                if not depth:
+                    return builder.value
+
+    def _skip(self, events):
+        depth = 1
+        for _, event, _ in events:
+            if event in self.starts:
+                depth += 1
+            elif event in self.ends:
+                depth -= 1
+                if not depth:
+                    return
+
+
+def read_json(stream):
+    """
+    Читает прайс-лист JSON той же структуры, что и shop1.yaml.
+
+    С установленным ijson товары разбираются потоково (см.
+    JsonPriceListReader), без него документ загружается в память
+    целиком.
+    """
+    if ijson is not None:
+        return JsonPriceListReader(stream).read()
+    data = json_loads(stream.read())
+    if not isinstance(data, dict):
+        raise ValueError("Price list must be an object")
+    return data
+
+
+class CsvPriceListReader:
+    """
+    Чтение плоского прайс-листа CSV: одна строка на товар, параметры
+    товара — в отдельных колонках.
+
+    Обязательные колонки: shop, category, id, name, model, price,
+    price_rrc, quantity; необязательная category_name задаёт название
+    категории. Пустая ячейка параметра означает, что параметра у товара
+    нет. Файл читается дважды: первый проход собирает магазин и
+    категории, второй выдаёт товары по одному.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def read(self):
+        shop = None
+        categories = {}
+        for row in self._rows():
+            shop = shop or row.get("shop")
+            category = int(row["category"])
+            name = row.get("category_name") or categories.get(category)
+            categories[category] = name or str(category)
+
+        if shop is None:
+            raise ValueError("Price list has no shop")
+        return {
+            "shop": shop,
+            "categories": [
+                {"id": category, "name": name}
+                for category, name in categories.items()
+            ],
+            "goods": self._iter_goods(),
+        }
+
+    def _rows(self):
+        self.stream.seek(0)
+        text = io.TextIOWrapper(self.stream, encoding="utf-8-sig", newline="")
+        try:
+            try:
+                dialect = csv.Sniffer().sniff(
+                    text.readline(), delimiters=",;\t"
+                )
+            except csv.Error:
+                dialect = csv.excel
+            text.seek(0)
+            yield from csv.DictReader(text, dialect=dialect)
+        finally:
+            # Исходный поток нужен для второго прохода
+            text.detach()
+
+    def _iter_goods(self):
+        for row in self._rows():
+            item = {
+                "name": row["name"],
+                "model": row["model"],
+                "parameters": {
+                    name: value
+                    for name, value in row.items()
+                    if name not in CSV_FIELDS and name and value != ""
+                },
+            }
+            for field in CSV_INT_FIELDS:
+                item[field] = int(row[field])
+            yield item
+
+
+def read_csv(stream):
+    """
+    Читает плоский прайс-лист CSV из двоичного потока с произвольным
+    доступом.
+    """
+    return CsvPriceListReader(stream).read()
+
+
+READERS = {
+    "yaml": read_yaml,
+    "json": read_json,
+    "csv": read_csv,
+}
+
+
+def detect_format(content_type="", name=""):
+    """
+    Определяет формат прайс-листа по типу содержимого или расширению.
+
+    Возвращает:
+        Кортеж (формат, сжат ли gzip); формат None, если его не удалось
+        определить.
+    """
+    content_type = content_type.split(";")[0].strip().lower()
+    root, ext = splitext(name.lower())
+    compressed = content_type in GZIP_CONTENT_TYPES or ext == ".gz"
+    if ext == ".gz":
+        ext = splitext(root)[1]
+    fmt = CONTENT_TYPES.get(content_type) or EXTENSIONS.get(ext)
+    return fmt, compressed
+
+
+def read_price_list(stream, content_type="", name=""):
+    """
+    Читает прайс-лист в любом поддерживаемом формате: YAML, JSON, CSV и
+    их сжатые gzip варианты. Сжатие распознаётся и по сигнатуре файла,
+    формат без явных признаков — по первому символу (JSON или YAML).
+
+    Аргументы:
+        stream: Двоичный поток с произвольным доступом (например,
+            временный файл).
+        content_type (str): Заголовок Content-Type.
+        name (str): Имя файла или путь из ссылки.
+
+    Возвращает:
+        dict с ключами shop, categories и goods в формате shop1.yaml.
+    """
+    fmt, compressed = detect_format(content_type, name)
+    if compressed or stream.read(2) == b"\x1f\x8b":
+        stream.seek(0)
+        stream = gzip.GzipFile(fileobj=stream)
+    stream.seek(0)
+
+    if fmt is None:
+        head = stream.read(64).lstrip()
+        stream.seek(0)
+        fmt = "json" if head.startswith(b"{") else "yaml"
+    return READERS[fmt](stream)
@@ -0,0 +1,162 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramWordSimilarity,
+)
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.functions import Cast, Greatest
+from django.db.models.lookups import GreaterThanOrEqual
+
+from .models import CatalogEntry
+
+
+# Порог оператора %> (pg_trgm.word_similarity_threshold) по умолчанию
+OPERATOR_THRESHOLD = 0.6
+
+
+def search_config():
+    return getattr(settings, "CATALOG_SEARCH_CONFIG", "russian")
+
+
+def search_document():
+    """
+    Выражение поискового документа строки каталога: название товара и
+    модель с весом A, категория с весом B, магазин с весом C.
+    """
+    config = search_config()
+    return (
+        SearchVector("product_name", weight="A", config=config)
+        + SearchVector("model", weight="A", config=config)
+        + SearchVector("category_name", weight="B", config=config)
+        + SearchVector("shop_name", weight="C", config=config)
+    )
+
+
+def refresh_search_vectors(queryset):
+    """
+    Пересчитывает поисковые документы строк каталога queryset одним
+    UPDATE.
+
+    Возвращает:
+        Количество обновлённых строк.
+    """
+    return queryset.update(search_vector=search_document())
+
+
+def rebuild_search_vectors(batch_size=10000):
+    """
+    Пересчитывает поисковые документы всего каталога диапазонами ключей,
+    чтобы не держать блокировки на всю таблицу.
+
+    Возвращает:
+        Количество обновлённых строк.
+    """
+    updated = 0
+    last_id = 0
+    while True:
+        ids = list(
+            CatalogEntry.objects.filter(pk__gt=last_id)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return updated
+        updated += refresh_search_vectors(
+            CatalogEntry.objects.filter(pk__gte=ids[0], pk__lte=ids[-1])
+        )
+        last_id = ids[-1]
+
+
+def prefix_query(terms):
+    """
+    Строит запрос, в котором каждое слово terms может быть началом
+    слова документа, чтобы поиск работал по мере набора текста.
+
+    Возвращает:
+        SearchQuery или None, если в terms нет слов.
+    """
+    words = re.findall(r"\w+", terms)
+    if not words:
+        return None
+    return SearchQuery(
+        " & ".join(f"{word}:*" for word in words),
+        config=search_config(),
+        search_type="raw",
+    )
+
+
+def fulltext_search(queryset, terms):
+    """
+    Отбирает строки каталога по полнотекстовому запросу и сортирует их
+    по релевантности (аннотация rank), при равной релевантности —
+    по ключу.
+    """
+    query = prefix_query(terms)
+    if query is None:
+        return queryset
+    # ts_rank возвращает real; приведение к double precision нужно,
+    # чтобы значение из курсора страницы точно совпадало со значением
+    # в базе
+    return (
+        queryset.filter(search_vector=query)
+        .annotate(
+            rank=Cast(SearchRank(F("search_vector"), query), FloatField())
+        )
+        .order_by("-rank", "-pk")
+    )
+
+
+def fuzzy_search(queryset, terms, threshold=None):
+    """
+    Нечёткий поиск по модели и названию товара с помощью pg_trgm.
+
+    Строка сравнивается с самым похожим фрагментом модели или названия
+    (word_similarity), поэтому находятся и части модели, и строки
+    с опечатками. Сходство сравнивается с порогом явно, результаты
+    сортируются по сходству (аннотация similarity), затем по ключу.
+
+    Порог не задаётся параметром сеанса pg_trgm.word_similarity_threshold:
+    на постоянных соединениях он остался бы и для следующих запросов.
+    Если порог не ниже порога оператора %> по умолчанию, строки
+    предварительно отбираются этим оператором через триграммные
+    GIN-индексы.
+
+    Аргументы:
+        queryset: Строки каталога.
+        terms (str): Строка поиска.
+        threshold (float): Порог сходства от 0 до 1; по умолчанию
+            CATALOG_TRIGRAM_THRESHOLD.
+    """
+    if threshold is None:
+        threshold = getattr(settings, "CATALOG_TRIGRAM_THRESHOLD", 0.6)
+    if threshold >= OPERATOR_THRESHOLD:
+        queryset = queryset.filter(
+            Q(model__trigram_word_similar=terms)
+            | Q(product_name__trigram_word_similar=terms)
+        )
+
+    # Сходство сравнивается с порогом в real, как в операторе %>; для
+    # точного сравнения значения из курсора страницы оно приводится
+    # к double precision
+    similarity = Greatest(
+        TrigramWordSimilarity(terms, "model"),
+        TrigramWordSimilarity(terms, "product_name"),
+    )
+    return (
+        queryset.filter(
+            GreaterThanOrEqual(
+                similarity,
+                Func(
+                    Value(threshold),
+                    template="CAST(%(expressions)s AS real)",
+                    output_field=FloatField(),
+                ),
+            )
+        )
+        .annotate(similarity=Cast(similarity, FloatField()))
+        .order_by("-similarity", "-pk")
+    )
@@ -0,0 +1,441 @@
+import random
+import time
+from array import array
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from users.models import CustomUser, Contact
+from .models import (
+    Shop,
+    Category,
+    Product,
+    ProductInfo,
+    CatalogEntry,
+    Parameter,
+    ProductParameter,
+    ParameterFacet,
+    Order,
+    OrderItem,
+)
+from .catalog import refresh_catalog
+from .facets import refresh_shop_facets
+from .parameters import typed_values
+
+
+# Домен адресов сгенерированных пользователей
+EMAIL_DOMAIN = "scale.test"
+
+# Заказы распределяются по году до этой даты, чтобы одно и то же зерно
+# давало одинаковые данные независимо от дня запуска
+SEED_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+ORDER_STATUS_WEIGHTS = {
+    "new": 5,
+    "confirmed": 10,
+    "assembled": 5,
+    "sent": 10,
+    "delivered": 60,
+    "canceled": 10,
+}
+
+CATEGORY_NAMES = [
+    "Смартфоны",
+    "Ноутбуки",
+    "Планшеты",
+    "Телевизоры",
+    "Наушники",
+    "Смарт-часы",
+    "Игровые консоли",
+    "Фотоаппараты",
+    "Мониторы",
+    "Принтеры",
+]
+
+BRANDS = [
+    "Apple",
+    "Samsung",
+    "Xiaomi",
+    "Huawei",
+    "Lenovo",
+    "Asus",
+    "Sony",
+    "LG",
+    "Philips",
+    "Honor",
+]
+
+COLORS = ["белый", "черный", "серебристый", "синий", "красный", "золотой"]
+
+CITIES = ["Москва", "Санкт-Петербург", "Казань", "Новосибирск", "Самара"]
+
+# Параметр -> функция, генерирующая значение
+PARAMETERS = {
+    "Цвет": lambda rnd: rnd.choice(COLORS),
+    "Вес_г": lambda rnd: rnd.randrange(100, 3000),
+    "Диагональ_дюймы": lambda rnd: round(rnd.uniform(5, 65), 1),
+    "Оперативная_память_Гб": lambda rnd: rnd.choice([2, 4, 8, 16, 32, 64]),
+    "Встроенная_память_Гб": lambda rnd: rnd.choice([32, 64, 128, 256, 512]),
+    "Гарантия_мес": lambda rnd: rnd.choice([6, 12, 24, 36]),
+    "Беспроводная_зарядка": lambda rnd: rnd.choice(["да", "нет"]),
+    "Страна": lambda rnd: rnd.choice(["Китай", "Корея", "Вьетнам"]),
+}
+
+
+@contextmanager
+def historical_dates(model, field_name):
+    """
+    Временно отключает auto_now_add у поля, чтобы bulk_create записал
+    переданные даты, а не текущее время.
+    """
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+class ScaleSeeder:
+    """
+    Генератор синтетического каталога и истории заказов для проверки
+    производительности.
+
+    Все данные выводятся из одного зерна генератора случайных чисел,
+    поэтому повторный запуск на пустой базе даёт те же строки. Записи
+    пишутся через bulk_create пачками по batch_size; в памяти держатся
+    только ID и цены позиций, нужные для заказов.
+
+    Аргументы:
+        shops (int): Количество магазинов (и пользователей-магазинов).
+        categories (int): Количество категорий.
+        products (int): Количество товаров.
+        offers (int): Сколько магазинов продают каждый товар.
+        parameters (int): Количество параметров у позиции магазина.
+        buyers (int): Количество покупателей, у каждого один контакт.
+        orders (int): Количество заказов.
+        items (int): Наибольшее количество позиций в заказе.
+        seed (int): Зерно генератора.
+        batch_size (int): Размер пачки bulk_create.
+        log (callable): Вызывается со строкой после каждой таблицы.
+    """
+
+    def __init__(
+        self,
+        shops=10,
+        categories=50,
+        products=100000,
+        offers=2,
+        parameters=4,
+        buyers=10000,
+        orders=100000,
+        items=5,
+        seed=0,
+        batch_size=5000,
+        log=None,
+    ):
+        self.shops = shops
+        self.categories = categories
+        self.products = products
+        self.offers = min(offers, shops)
+        self.parameters = min(parameters, len(PARAMETERS))
+        self.buyers = buyers
+        self.orders = orders
+        self.items = items
+        self.batch_size = batch_size
+        self.log = log or (lambda message: None)
+        self.rnd = random.Random(seed)
+        # Пароль хэшируется один раз: хэширование медленное намеренно
+        self.password = make_password("password", salt="scale")
+        self.counts = {}
+
+    def run(self):
+        """
+        Заполняет базу и возвращает словарь с количеством строк
+        по таблицам.
+        """
+        if CustomUser.objects.filter(
+            email__endswith=f"@{EMAIL_DOMAIN}"
+        ).exists():
+            raise ValueError(
+                f"Users @{EMAIL_DOMAIN} already exist, flush the database "
+                "before seeding"
+            )
+        with transaction.atomic():
+            shop_ids = self.create_shops()
+            category_ids = self.create_categories(shop_ids)
+            product_ids = self.create_products(category_ids)
+            infos = self.create_product_infos(shop_ids, product_ids)
+            buyers = self.create_buyers()
+        with historical_dates(Order, "dt"):
+            self.create_orders(buyers, infos)
+        return self.counts
+
+    def _bulk_create(self, model, objs):
+        """
+        Пишет объекты пачками и возвращает ID созданных строк.
+        """
+        started = time.perf_counter()
+        ids = array("q")
+        batch = []
+        count = 0
+        for obj in objs:
+            batch.append(obj)
+            if len(batch) >= self.batch_size:
+                ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+                count += len(batch)
+                batch = []
+        if batch:
+            ids.extend(obj.pk for obj in model.objects.bulk_create(batch))
+            count += len(batch)
+        self._report(model, count, started)
+        return ids
+
+    def _report(self, model, count, started):
+        name = model._meta.db_table
+        self.counts[name] = self.counts.get(name, 0) + count
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed else 0
+        self.log(
+            f"{name}: {count} rows in {elapsed:.2f} s ({rate:.0f} rows/s)"
+        )
+
+    def create_shops(self):
+        users = self._bulk_create(
+            CustomUser,
+            (
+                CustomUser(
+                    email=f"shop{i}@{EMAIL_DOMAIN}",
+                    password=self.password,
+                    type="shop",
+                    is_active=True,
+                )
+                for i in range(self.shops)
+            ),
+        )
+        return self._bulk_create(
+            Shop,
+            (
+                Shop(name=f"Магазин {i}", user_id=user_id)
+                for i, user_id in enumerate(users)
+            ),
+        )
+
+    def create_categories(self, shop_ids):
+        category_ids = self._bulk_create(
+            Category,
+            (
+                Category(
+                    external_id=i,
+                    name=f"{CATEGORY_NAMES[i % len(CATEGORY_NAMES)]} {i}",
+                )
+                for i in range(self.categories)
+            ),
+        )
+        # Каждый магазин торгует всеми категориями
+        Through = Shop.categories.through
+        self._bulk_create(
+            Through,
+            (
+                Through(shop_id=shop_id, category_id=category_id)
+                for shop_id in shop_ids
+                for category_id in category_ids
+            ),
+        )
+        return category_ids
+
+    def create_products(self, category_ids):
+        rnd = self.rnd
+        return self._bulk_create(
+            Product,
+            (
+                Product(
+                    name=f"{rnd.choice(BRANDS)} {CATEGORY_NAMES[i % 10]} "
+                    f"модель {i}",
+                    category_id=category_ids[i % len(category_ids)],
+                )
+                for i in range(self.products)
+            ),
+        )
+
+    def create_product_infos(self, shop_ids, product_ids):
+        """
+        Создаёт позиции магазинов с параметрами.
+
+        Возвращает:
+            Кортеж массивов (product_id, shop_id, price_rrc) позиций.
+        """
+        rnd = self.rnd
+        # Имена параметров общие для всех магазинов, существующие
+        # переиспользуются, как при импорте прайс-листа
+        parameter_ids = dict(
+            Parameter.objects.filter(name__in=PARAMETERS).values_list(
+                "name", "id"
+            )
+        )
+        missing = [name for name in PARAMETERS if name not in parameter_ids]
+        parameter_ids.update(
+            zip(
+                missing,
+                self._bulk_create(
+                    Parameter, (Parameter(name=name) for name in missing)
+                ),
+            )
+        )
+        generators = [
+            (parameter_ids[name], generate)
+            for name, generate in PARAMETERS.items()
+        ]
+
+        product_col, shop_col, price_col = array("q"), array("q"), array("q")
+        shops = list(shop_ids)
+
+        def infos():
+            for i, product_id in enumerate(product_ids):
+                for shop_id in rnd.sample(shops, self.offers):
+                    price = rnd.randrange(500, 300000, 10)
+                    price_rrc = price + rnd.randrange(0, 10000, 10)
+                    product_col.append(product_id)
+                    shop_col.append(shop_id)
+                    price_col.append(price_rrc)
+                    yield ProductInfo(
+                        model=f"{rnd.choice(BRANDS).lower()}/{i}",
+                        external_id=i,
+                        product_id=product_id,
+                        shop_id=shop_id,
+                        quantity=rnd.randrange(0, 200),
+                        price=price,
+                        price_rrc=price_rrc,
+                    )
+
+        info_ids = self._bulk_create(ProductInfo, infos())
+        self.refresh_catalog(info_ids)
+        self._bulk_create(
+            ProductParameter,
+            (
+                ProductParameter(
+                    product_info_id=info_id,
+                    parameter_id=parameter_id,
+                    value=value,
+                    **typed_values(value),
+                )
+                for info_id in info_ids
+                for parameter_id, generate in rnd.sample(
+                    generators, self.parameters
+                )
+                for value in (str(generate(rnd)),)
+            ),
+        )
+        self.refresh_facets(shop_ids)
+        return product_col, shop_col, price_col, info_ids
+
+    def refresh_catalog(self, info_ids):
+        started = time.perf_counter()
+        count = 0
+        for start in range(0, len(info_ids), self.batch_size):
+            count += refresh_catalog(
+                ProductInfo.objects.filter(
+                    id__in=info_ids[start : start + self.batch_size]
+                )
+            )
+        self._report(CatalogEntry, count, started)
+
+    def refresh_facets(self, shop_ids):
+        started = time.perf_counter()
+        count = sum(refresh_shop_facets(shop_id) for shop_id in shop_ids)
+        self._report(ParameterFacet, count, started)
+
+    def create_buyers(self):
+        """
+        Создаёт покупателей с контактами.
+
+        Возвращает:
+            Кортеж массивов (user_id, contact_id).
+        """
+        rnd = self.rnd
+        user_ids = self._bulk_create(
+            CustomUser,
+            (
+                CustomUser(
+                    email=f"buyer{i}@{EMAIL_DOMAIN}",
+                    password=self.password,
+                    first_name=f"Покупатель {i}",
+                    is_active=True,
+                )
+                for i in range(self.buyers)
+            ),
+        )
+        contact_ids = self._bulk_create(
+            Contact,
+            (
+                Contact(
+                    user_id=user_id,
+                    city=rnd.choice(CITIES),
+                    street=f"Улица {rnd.randrange(1, 500)}",
+                    house=str(rnd.randrange(1, 200)),
+                    phone=f"+7900{rnd.randrange(10**7):07d}",
+                )
+                for user_id in user_ids
+            ),
+        )
+        return user_ids, contact_ids
+
+    def create_orders(self, buyers, infos):
+        """
+        Создаёт историю заказов за год до SEED_EPOCH. Заказы и их
+        позиции пишутся пачками в отдельных транзакциях.
+        """
+        if not self.orders or not buyers[0] or not infos[0]:
+            return
+        rnd = self.rnd
+        user_ids, contact_ids = buyers
+        product_col, shop_col, price_col, info_ids = infos
+        statuses = list(ORDER_STATUS_WEIGHTS)
+        weights = list(ORDER_STATUS_WEIGHTS.values())
+        seconds = 365 * 24 * 3600
+
+        started = time.perf_counter()
+        created = items_created = 0
+        while created < self.orders:
+            size = min(self.batch_size, self.orders - created)
+            with transaction.atomic():
+                orders = []
+                for _ in range(size):
+                    buyer = rnd.randrange(len(user_ids))
+                    orders.append(
+                        Order(
+                            user_id=user_ids[buyer],
+                            contact_id=contact_ids[buyer],
+                            status=rnd.choices(statuses, weights)[0],
+                            dt=SEED_EPOCH
+                            - timedelta(seconds=rnd.randrange(seconds)),
+                        )
+                    )
+                items = []
+                for order in Order.objects.bulk_create(orders):
+                    for info in rnd.sample(
+                        range(len(product_col)),
+                        min(rnd.randint(1, self.items), len(product_col)),
+                    ):
+                        quantity = rnd.randint(1, 3)
+                        items.append(
+                            OrderItem(
+                                order_id=order.pk,
+                                product_id=product_col[info],
+                                shop_id=shop_col[info],
+                                quantity=quantity,
+                                unit_price=price_col[info],
+                                price_source_id=info_ids[info],
+                                total_price=quantity * price_col[info],
+                            )
+                        )
+                OrderItem.objects.bulk_create(
+                    items, batch_size=self.batch_size
+                )
+            created += size
+            items_created += len(items)
+        self._report(Order, created, started)
+        self.counts[OrderItem._meta.db_table] = items_created
+        self.log(f"{OrderItem._meta.db_table}: {items_created} rows")
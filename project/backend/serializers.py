@@ -1,7 +1,43 @@
-from django.db.models import Sum
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from rest_framework import serializers
 
-from .models import Order, OrderItem, Shop, Product, ProductInfo, Contact
+from .models import (
+    Order,
+    OrderItem,
+    Shop,
+    Product,
+    CatalogEntry,
+    Contact,
+    ImportJob,
+)
+
+
+# Формат даты заказа в ответах
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def order_items_aggregate(aggregate):
+    """
+    Подзапрос с агрегатом по позициям заказа из внешнего запроса.
+    """
+    return Subquery(
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(value=aggregate)
+        .values("value")
+    )
+
+
+# Сумма и число позиций заказа: аннотации списка заказов. Подзапросы
+# считаются в том же запросе только для строк страницы, а группировка
+# всего запроса агрегировала бы все заказы пользователя до LIMIT
+ORDER_TOTALS = {
+    "total": order_items_aggregate(Sum("total_price")),
+    "items_count": Coalesce(order_items_aggregate(Count("id")), 0),
+}
 
 
 class ShopSerializer(serializers.ModelSerializer):
@@ -19,14 +55,33 @@ class ProductSerializer(serializers.ModelSerializer):
 class ListItemsSerializer(serializers.ModelSerializer):
     product = ProductSerializer()
 
+    # Столбцы быстрого режима списка (см. fastpath.ValuesListMixin)
+    values_fields = (
+        "order_id",
+        "product_id",
+        "product__name",
+        "quantity",
+        "shop_id",
+    )
+
     class Meta:
         model = OrderItem
         fields = ("order", "product", "quantity", "shop")
 
+    @staticmethod
+    def represent_values(row):
+        return {
+            "order": row["order_id"],
+            "product": {"id": row["product_id"], "name": row["product__name"]},
+            "quantity": row["quantity"],
+            "shop": row["shop_id"],
+        }
+
 
 class GetOrderSerializer(serializers.ModelSerializer):
     total_sum = serializers.SerializerMethodField()
-    dt = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    items_count = serializers.SerializerMethodField()
+    dt = serializers.DateTimeField(format=DATETIME_FORMAT)
     orderitem_set = ListItemsSerializer(many=True, read_only=True)
 
     class Meta:
@@ -38,21 +93,66 @@ class GetOrderSerializer(serializers.ModelSerializer):
             "contact",
             "orderitem_set",
             "total_sum",
+            "items_count",
         )
 
+    # Сумма и число позиций считаются по позициям, уже выбранным
+    # для orderitem_set (prefetch_related), без отдельных запросов
+
     def get_total_sum(self, obj):
-        result = obj.orderitem_set.aggregate(sum_value=Sum("total_price"))
-        return result.get("sum_value") or 0
+        return sum(item.total_price for item in obj.orderitem_set.all())
+
+    def get_items_count(self, obj):
+        return len(obj.orderitem_set.all())
+
+
+class CatalogShopSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="shop_id")
+    name = serializers.CharField(source="shop_name")
+
+
+class CatalogProductSerializer(serializers.Serializer):
+    id = serializers.IntegerField(source="product_id")
+    name = serializers.CharField(source="product_name")
 
 
-class ProductInfoSerializer(serializers.ModelSerializer):
-    shop = ShopSerializer(read_only=True)
-    product = ProductSerializer(read_only=True)
+class CatalogEntrySerializer(serializers.ModelSerializer):
+    """
+    Строка каталога: магазин и товар вложенными объектами {id, name},
+    как у позиции магазина.
+    """
+
+    shop = CatalogShopSerializer(source="*", read_only=True)
+    product = CatalogProductSerializer(source="*", read_only=True)
+
+    # Столбцы быстрого режима списка; ключ и название категории не
+    # выводятся, но нужны курсору при сортировке по ним
+    values_fields = (
+        "product_info_id",
+        "model",
+        "quantity",
+        "price_rrc",
+        "shop_id",
+        "shop_name",
+        "product_id",
+        "product_name",
+        "category_name",
+    )
 
     class Meta:
-        model = ProductInfo
+        model = CatalogEntry
         fields = ("model", "quantity", "price_rrc", "shop", "product")
 
+    @staticmethod
+    def represent_values(row):
+        return {
+            "model": row["model"],
+            "quantity": row["quantity"],
+            "price_rrc": row["price_rrc"],
+            "shop": {"id": row["shop_id"], "name": row["shop_name"]},
+            "product": {"id": row["product_id"], "name": row["product_name"]},
+        }
+
 
 class AddProductSerializer(serializers.ModelSerializer):
     id = serializers.IntegerField(required=False)
@@ -70,8 +170,14 @@ class OrderItemSerializer(serializers.ModelSerializer):
         fields = ("order", "product", "quantity", "shop")
 
 
+class AddOrderItemSerializer(OrderItemSerializer):
+    # Магазин проверяется вместе с наличием товара одним запросом на всю
+    # корзину, а не запросом на каждую позицию
+    shop = serializers.IntegerField()
+
+
 class OrderSerializer(serializers.ModelSerializer):
-    order_items = OrderItemSerializer(many=True, source="orderitem_set")
+    order_items = AddOrderItemSerializer(many=True, source="orderitem_set")
 
     class Meta:
         model = Order
@@ -87,16 +193,36 @@ class OrderSerializer(serializers.ModelSerializer):
 
 
 class ListOrderSerializer(serializers.ModelSerializer):
-    dt = serializers.DateTimeField(format="%Y-%m-%d %H:%M:%S")
+    """
+    Заказ в списке. Ожидает заказы с аннотациями ORDER_TOTALS: сумма
+    и число позиций считаются в том же запросе, а не отдельным запросом
+    на каждый заказ.
+    """
+
+    dt = serializers.DateTimeField(format=DATETIME_FORMAT)
     total_sum = serializers.SerializerMethodField()
+    items_count = serializers.IntegerField(read_only=True)
+
+    # Столбцы быстрого режима списка (аннотации берутся из запроса)
+    values_fields = ("id", "status", "dt")
 
     class Meta:
         model = Order
-        fields = ("id", "status", "dt", "total_sum")
+        fields = ("id", "status", "dt", "total_sum", "items_count")
 
     def get_total_sum(self, obj):
-        data = obj.orderitem_set.aggregate(total=Sum("total_price"))
-        return data.get("total") or 0
+        return obj.total or 0
+
+    @staticmethod
+    def represent_values(row):
+        return {
+            "id": row["id"],
+            "status": row["status"],
+            # Как DateTimeField: время в текущем часовом поясе
+            "dt": timezone.localtime(row["dt"]).strftime(DATETIME_FORMAT),
+            "total_sum": row["total"] or 0,
+            "items_count": row["items_count"],
+        }
 
 
 class ConfirmOrderSerializer(serializers.ModelSerializer):
@@ -105,3 +231,26 @@ class ConfirmOrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ("id", "status")
+
+
+class ImportJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ImportJob
+        fields = (
+            "id",
+            "state",
+            "url",
+            "file_name",
+            "shop",
+            "merged",
+            "processed",
+            "created",
+            "updated",
+            "skipped",
+            "deleted",
+            "unchanged",
+            "errors",
+            "created_at",
+            "started_at",
+            "finished_at",
+        )
@@ -0,0 +1,62 @@
+from django.db import connections
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_migrate,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Order, OrderItem, StockHold
+from .stock import release_holds
+
+
+@receiver(pre_delete, sender=StockHold)
+def release_deleted_hold(sender, instance, **kwargs):
+    """
+    Снимает резерв, который удаляется вместе со строкой корзины: при
+    удалении заказа, контакта, пользователя или позиции магазина, в том
+    числе из админки.
+
+    Резерв удаляется здесь же через DELETE ... RETURNING, поэтому сумма
+    резервов позиции уменьшается ровно один раз, даже если резерв
+    одновременно снимает очистка; следующий за сигналом DELETE уже
+    не находит строку.
+    """
+    release_holds([instance.item_id])
+
+
+@receiver(post_save, sender=OrderItem)
+@receiver(post_delete, sender=OrderItem)
+def touch_order(sender, instance, origin=None, **kwargs):
+    """
+    Отмечает изменение заказа при сохранении или удалении его позиции,
+    в том числе при удалении позиций запросом и каскадом: по
+    updated_at заказа считаются ETag списка и карточки заказа.
+
+    Корзина меняет позиции массовыми запросами без сигналов и отмечает
+    заказ сама одним UPDATE. Позиции удаляемого заказа не отмечают его.
+    """
+    if isinstance(origin, Order) or getattr(origin, "model", None) is Order:
+        return
+    Order.objects.filter(pk=instance.order_id).update(
+        updated_at=timezone.now()
+    )
+
+
+@receiver(pre_migrate)
+def create_trigram_extension(sender, app_config, using, **kwargs):
+    """
+    Создаёт расширение pg_trgm перед миграциями приложения: оно нужно
+    триграммным индексам каталога.
+
+    Миграции приложения создаёт makemigrations при сборке образа, поэтому
+    расширение подключается здесь, а не отдельной миграцией: она сдвинула
+    бы нумерацию сгенерированных миграций на уже развёрнутых базах.
+    """
+    connection = connections[using]
+    if app_config.label != "backend" or connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
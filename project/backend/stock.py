@@ -0,0 +1,269 @@
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Case, F, PositiveIntegerField, Q, Value, When
+from django.utils import timezone
+
+from .models import ProductInfo, StockHold
+
+
+class InsufficientStock(Exception):
+    """
+    Остатка позиции магазина не хватает для заказа.
+    """
+
+    def __init__(self, offer_id, available):
+        self.offer_id = offer_id
+        self.available = available
+        super().__init__(
+            f"Insufficient stock for offer {offer_id}. Available: {available}"
+        )
+
+
+class _Short(Exception):
+    """
+    Условный UPDATE затронул не все позиции; откатывает точку
+    сохранения.
+    """
+
+
+def hold_ttl():
+    """
+    Время жизни резерва корзины (настройка STOCK_HOLD_TTL, секунды).
+    """
+    return timedelta(seconds=getattr(settings, "STOCK_HOLD_TTL", 900))
+
+
+def lock_offers(offer_ids):
+    """
+    Блокирует позиции магазинов до конца транзакции в порядке ID.
+
+    Одинаковый порядок блокировок у всех транзакций исключает взаимную
+    блокировку заказов с общими товарами: вторая транзакция ждёт первую
+    на первой общей позиции, а не захватывает позиции навстречу ей.
+    Остатки при этом не читаются.
+    """
+    list(
+        ProductInfo.objects.filter(id__in=offer_ids)
+        .order_by("id")
+        .select_for_update()
+        .values_list("id", flat=True)
+    )
+
+
+def _per_offer(values):
+    return Case(
+        *(
+            When(id=offer_id, then=Value(value))
+            for offer_id, value in values.items()
+        ),
+        default=Value(0),
+        output_field=PositiveIntegerField(),
+    )
+
+
+def _raise_short(demand, held):
+    """
+    Находит первую в порядке ID позицию, которой не хватает остатка.
+    Вызывается только после неудачного условного UPDATE, поэтому
+    успешное списание остатки не перечитывает.
+    """
+    available = dict(
+        ProductInfo.objects.filter(id__in=demand).values_list(
+            "id", F("quantity") - F("reserved")
+        )
+    )
+    for offer_id in sorted(demand):
+        free = available.get(offer_id, 0) + held.get(offer_id, 0)
+        if free < demand[offer_id]:
+            raise InsufficientStock(offer_id, max(free, 0))
+    # Остаток освободился после неудачного UPDATE
+    offer_id = min(demand)
+    raise InsufficientStock(offer_id, available.get(offer_id, 0))
+
+
+def _delete_holds(condition, params, skip_locked=False):
+    """
+    Удаляет резервы, подходящие под SQL-условие condition, одним
+    DELETE ... RETURNING. Строки резервов блокируются в порядке ID;
+    со skip_locked резервы, которые сейчас меняет другая транзакция,
+    пропускаются.
+
+    Возвращает:
+        Словарь ID позиции магазина -> снятое количество.
+    """
+    table = connection.ops.quote_name(StockHold._meta.db_table)
+    lock = "FOR UPDATE SKIP LOCKED" if skip_locked else "FOR UPDATE"
+    released = {}
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE id IN ("
+            f"SELECT id FROM {table} WHERE {condition} ORDER BY id {lock}"
+            f") AND {condition} RETURNING offer_id, quantity",
+            params * 2,
+        )
+        for offer_id, quantity in cursor.fetchall():
+            released[offer_id] = released.get(offer_id, 0) + quantity
+    return released
+
+
+def _unreserve(released):
+    """
+    Уменьшает суммы резервов позиций на снятые количества. Позиций
+    может быть много (очистка), поэтому количества передаются массивами
+    и соединяются с таблицей, а не перечисляются в CASE.
+    """
+    if not released:
+        return
+    lock_offers(released)
+    table = connection.ops.quote_name(ProductInfo._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {table} "
+            f"SET reserved = {table}.reserved - released.quantity "
+            "FROM unnest(%s::bigint[], %s::integer[]) "
+            "AS released (id, quantity) "
+            f"WHERE {table}.id = released.id",
+            [list(released), list(released.values())],
+        )
+
+
+def reserve_stock(holds):
+    """
+    Резервирует остаток под строки корзины и продлевает их резервы
+    на hold_ttl().
+
+    Количество добавляется к резерву строки, если он ещё есть, иначе
+    резерв создаётся заново. Сумма резервов позиций растёт одним
+    условным UPDATE: только если доступного остатка хватает. Если
+    не хватает хотя бы одной позиции, резервирование откатывается
+    целиком.
+
+    Аргументы:
+        holds (dict): ID строки заказа -> (ID позиции магазина,
+            резервируемое количество).
+
+    Исключения:
+        InsufficientStock: Доступного остатка позиции не хватает (первая
+            такая позиция в порядке ID).
+    """
+    if not holds:
+        return
+    demand = {}
+    for offer_id, quantity in holds.values():
+        demand[offer_id] = demand.get(offer_id, 0) + quantity
+    expires_at = timezone.now() + hold_ttl()
+    table = connection.ops.quote_name(StockHold._meta.db_table)
+    try:
+        with transaction.atomic():
+            # Резервы блокируются раньше позиций, как при очистке
+            # и подтверждении, и в порядке ID строк
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"INSERT INTO {table} "
+                    "(item_id, offer_id, quantity, expires_at) VALUES "
+                    + ", ".join(["(%s, %s, %s, %s)"] * len(holds))
+                    + " ON CONFLICT (item_id) DO UPDATE SET "
+                    f"quantity = {table}.quantity + EXCLUDED.quantity, "
+                    "expires_at = EXCLUDED.expires_at",
+                    [
+                        value
+                        for item_id in sorted(holds)
+                        for value in (item_id, *holds[item_id], expires_at)
+                    ],
+                )
+            lock_offers(demand)
+            updated = ProductInfo.objects.filter(
+                reduce(
+                    or_,
+                    (
+                        Q(id=offer_id, quantity__gte=F("reserved") + quantity)
+                        for offer_id, quantity in demand.items()
+                    ),
+                )
+            ).update(reserved=F("reserved") + _per_offer(demand))
+            if updated != len(demand):
+                raise _Short
+    except _Short:
+        _raise_short(demand, {})
+
+
+def decrement_stock(demand, item_ids=()):
+    """
+    Списывает остатки позиций магазинов одним условным UPDATE.
+
+    Резервы строк item_ids переходят в списание: они удаляются, а их
+    количество вычитается и из остатка, и из суммы резервов. Остаток
+    сверх резервов списывается, только если его хватает. Если
+    не хватает хотя бы одной позиции, списание откатывается целиком.
+
+    Аргументы:
+        demand (dict): ID позиции магазина -> списываемое количество.
+        item_ids (iterable): ID строк заказа, резервы которых
+            списываются.
+
+    Исключения:
+        InsufficientStock: Доступного остатка позиции не хватает (первая
+            такая позиция в порядке ID).
+    """
+    if not demand:
+        return
+    item_ids = list(item_ids)
+    held = {}
+    try:
+        with transaction.atomic():
+            if item_ids:
+                held = _delete_holds("item_id = ANY(%s)", [item_ids])
+            demand = {**dict.fromkeys(held, 0), **demand}
+            lock_offers(demand)
+            updated = ProductInfo.objects.filter(
+                reduce(
+                    or_,
+                    (
+                        Q(
+                            id=offer_id,
+                            quantity__gte=F("reserved")
+                            + (quantity - held.get(offer_id, 0)),
+                        )
+                        for offer_id, quantity in demand.items()
+                    ),
+                )
+            ).update(
+                quantity=F("quantity") - _per_offer(demand),
+                reserved=F("reserved") - _per_offer(held),
+            )
+            if updated != len(demand):
+                raise _Short
+    except _Short:
+        _raise_short(demand, held)
+
+
+def release_holds(item_ids):
+    """
+    Снимает резервы строк item_ids, например перед удалением строки
+    из корзины.
+    """
+    item_ids = list(item_ids)
+    if item_ids:
+        with transaction.atomic():
+            _unreserve(_delete_holds("item_id = ANY(%s)", [item_ids]))
+
+
+def release_expired_holds(now=None):
+    """
+    Снимает все просроченные резервы: одним DELETE удаляет их и одним
+    UPDATE уменьшает суммы резервов позиций. Резервы, которые в этот
+    момент продлевает другая транзакция, пропускаются.
+
+    Возвращает:
+        Количество снятых единиц товара.
+    """
+    with transaction.atomic():
+        released = _delete_holds(
+            "expires_at <= %s", [now or timezone.now()], skip_locked=True
+        )
+        _unreserve(released)
+    return sum(released.values())
@@ -6,7 +6,17 @@ app_name = "backend"
 
 urlpatterns = [
     path("upload/", views.UploadProductsView.as_view(), name="upload"),
+    path(
+        "upload/<int:pk>/",
+        views.ImportJobView.as_view(),
+        name="upload_status",
+    ),
     path("products/", views.ListProductView.as_view(), name="products"),
+    path(
+        "products/export.<str:fmt>",
+        views.ExportProductView.as_view(),
+        name="products_export",
+    ),
     path(
         "add_order_items/",
         views.AddOrderItemView.as_view(),
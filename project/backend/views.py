@@ -1,7 +1,8 @@
+from django.conf import settings
 from django.core.validators import URLValidator
-from django.db import IntegrityError
-from django.http import JsonResponse
-from requests import get
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.http import JsonResponse, StreamingHttpResponse
 from rest_framework import filters, status
 from rest_framework.exceptions import ValidationError
 from rest_framework.generics import (
@@ -14,32 +15,67 @@ from rest_framework.generics import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from yaml import load as yaml_load, Loader
 
 from users.confirm import send_confirmed_order
+from .catalog import refresh_catalog_quantities
+from .catalog_cache import (
+    bump_catalog_version,
+    cache_timeout,
+    catalog_version,
+    get_response,
+    response_key,
+    set_response,
+)
+from .conditional import ETagMixin, make_etag, query_stamp
+from .export import CONTENT_TYPES, ENCODERS, export_rows
+from .facets import catalog_facets
+from .fastpath import ValuesListMixin
+from .fetcher import PriceListUploadHandler
+from .filters import (
+    CatalogOrderingFilter,
+    CatalogScopeFilter,
+    CatalogSearchFilter,
+    OrderFilter,
+    ParameterFilter,
+)
+from .jobs import submit_import
+from .pagination import KeysetPagination, OrderPagination
+from .stock import (
+    InsufficientStock,
+    decrement_stock,
+    release_holds,
+    reserve_stock,
+)
 from .models import (
-    Shop,
-    Category,
-    Product,
     ProductInfo,
-    Parameter,
-    ProductParameter,
+    CatalogEntry,
     Order,
     OrderItem,
+    ImportJob,
 )
-from .permissions import IsOwnerOrder, IsOwnerOrderItem
+from .permissions import IsOwnerOrder, IsOwnerOrderItem, IsOwnerImportJob
 from .serializers import (
-    ProductInfoSerializer,
+    CatalogEntrySerializer,
     OrderSerializer,
     ListItemsSerializer,
     OrderItemSerializer,
     ListOrderSerializer,
     ConfirmOrderSerializer,
     GetOrderSerializer,
+    ImportJobSerializer,
+    ORDER_TOTALS,
 )
 
 
 class UploadProductsView(APIView):
+    def initialize_request(self, request, *args, **kwargs):
+        # Загруженный прайс-лист пишется сразу во временный файл на диске,
+        # а не накапливается в памяти процесса; запись прекращается
+        # на превышении предельного размера
+        self.upload_handler = PriceListUploadHandler(request)
+        request.upload_handlers = [self.upload_handler]
+        return super().initialize_request(request, *args, **kwargs)
+
     def post(self, request, *args, **kwargs):
         if not request.user.is_authenticated:
             return JsonResponse(
@@ -52,10 +88,26 @@ class UploadProductsView(APIView):
                 status=403,
             )
 
+        upload = request.FILES.get("file")
+        if self.upload_handler.too_large:
+            return JsonResponse(
+                {
+                    "Error": "File exceeds "
+                    f"{self.upload_handler.max_size} bytes."
+                },
+                status=400,
+            )
+        if upload is not None:
+            job = submit_import(request.user, upload=upload)
+            return JsonResponse(
+                {"Success": "Upload queued.", "job_id": job.id},
+                status=202,
+            )
+
         url = request.data.get("url")
         if not url:
             return JsonResponse(
-                {"Error": "URL parameter is missing."}, status=400
+                {"Error": "URL or file parameter is missing."}, status=400
             )
 
         validator = URLValidator()
@@ -64,78 +116,38 @@ class UploadProductsView(APIView):
         except ValidationError as e:
             return JsonResponse({"Error": str(e)}, status=400)
 
-        try:
-            content = get(url).content
-            data = yaml_load(content, Loader=Loader)
-        except Exception as e:
-            return JsonResponse(
-                {"Error": f"Failed to load YAML from URL: {e}"}, status=400
-            )
-
-        try:
-            shop, created = Shop.objects.get_or_create(
-                name=data["shop"], user_id=request.user.id
-            )
-
-            for cat in data.get("categories", []):
-                cat_obj, _ = Category.objects.get_or_create(
-                    external_id=cat["id"], name=cat["name"]
-                )
-                cat_obj.shops.add(shop)
-
-            for item in data.get("goods", []):
-                prod_obj, _ = Product.objects.get_or_create(
-                    name=item["name"],
-                    category=Category.objects.get(
-                        external_id=item["category"]
-                    ),
-                )
-
-                try:
-                    prod_info_obj, _ = ProductInfo.objects.get_or_create(
-                        product=prod_obj,
-                        model=item["model"],
-                        external_id=item["id"],
-                        shop=shop,
-                        quantity=item["quantity"],
-                        price=item["price"],
-                        price_rrc=item["price_rrc"],
-                    )
-                except IntegrityError:
-                    # Duplicate product info, skip this item
-                    continue
-
-                for param_name, param_value in item["parameters"].items():
-                    param_obj, _ = Parameter.objects.get_or_create(
-                        name=param_name
-                    )
-                    ProductParameter.objects.get_or_create(
-                        product_info=prod_info_obj,
-                        parameter=param_obj,
-                        value=param_value,
-                    )
-
-            return JsonResponse(
-                {"Success": "Products uploaded successfully."}, status=200
-            )
+        job = submit_import(request.user, url)
+        return JsonResponse(
+            {"Success": "Upload queued.", "job_id": job.id},
+            status=202,
+        )
 
-        except KeyError as e:
-            return JsonResponse(
-                {"Error": f"Missing key in data: {e}"}, status=400
-            )
 
+class ImportJobView(RetrieveAPIView):
+    permission_classes = [IsAuthenticated, IsOwnerImportJob]
+    serializer_class = ImportJobSerializer
 
-class ListProductView(ListAPIView):
-    queryset = ProductInfo.objects.select_related("product").prefetch_related(
-        "shop", "product__category"
-    )
-    serializer_class = ProductInfoSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    def get_queryset(self):
+        return ImportJob.objects.filter(user=self.request.user)
+
+
+class ListProductView(ETagMixin, ValuesListMixin, ListAPIView):
+    # Каталог читается из денормализованной таблицы без соединений;
+    # поисковый документ нужен только для фильтрации и не выбирается
+    queryset = CatalogEntry.objects.defer("search_vector")
+    serializer_class = CatalogEntrySerializer
+    pagination_class = KeysetPagination
+    filter_backends = [
+        CatalogScopeFilter,
+        ParameterFilter,
+        CatalogSearchFilter,
+        CatalogOrderingFilter,
+    ]
     search_fields = [
         "model",
-        "product__name",
-        "shop__name",
-        "product__category__name",
+        "product_name",
+        "shop_name",
+        "category_name",
     ]
     ordering_fields = [
         "model",
@@ -146,8 +158,93 @@ class ListProductView(ListAPIView):
         "quantity",
     ]
 
+    def get_catalog_version(self):
+        # Версия читается из базы один раз на запрос: для ETag и ключа
+        # кэша
+        if not hasattr(self, "catalog_version"):
+            self.catalog_version = catalog_version()
+        return self.catalog_version
+
+    def get_etag(self, request, *args, **kwargs):
+        # Ответ меняется только с версией каталога, поэтому ETag
+        # строится по ней, без чтения самого каталога
+        return make_etag(
+            request.build_absolute_uri(request.path),
+            query_stamp(request),
+            self.get_catalog_version(),
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not cache_timeout():
+            return self.build_list(request, *args, **kwargs)
+
+        # Ключ с версией каталога берётся до чтения базы: если каталог
+        # изменится во время запроса, ответ ляжет под устаревшую версию
+        key = response_key(request, self.get_catalog_version())
+        data = get_response(key)
+        if data is not None:
+            return Response(data, headers={"X-Cache": "HIT"})
+
+        response = self.build_list(request, *args, **kwargs)
+        set_response(key, response.data)
+        response["X-Cache"] = "MISS"
+        return response
+
+    def build_list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        # Фасеты не зависят от страницы и отдаются только с первой;
+        # они считаются по выбранным магазинам и категориям
+        if not request.query_params.get(self.paginator.cursor_query_param):
+            scope = CatalogScopeFilter.get_scope(request)
+            response.data["facets"] = catalog_facets(
+                shop_ids=scope.get("shop"),
+                category_ids=scope.get("category"),
+            )
+        return response
+
+
+class ExportProductView(APIView):
+    """
+    Потоковая выгрузка каталога в JSON Lines или CSV для партнёров.
+
+    Строки читаются курсором на стороне сервера и отправляются клиенту
+    по мере чтения, поэтому расход памяти не зависит от размера
+    каталога. Отбор по магазинам и категориям: параметры shop и
+    category (повтор ключа — любое из значений).
+    """
+
+    def get(self, request, fmt):
+        encode = ENCODERS.get(fmt)
+        if encode is None:
+            return JsonResponse(
+                {"Error": f"Unknown export format: {fmt}"}, status=400
+            )
+
+        queryset = CatalogEntry.objects.all()
+        for name in ("shop", "category"):
+            values = request.query_params.getlist(name)
+            if not values:
+                continue
+            try:
+                ids = [int(value) for value in values]
+            except ValueError:
+                return JsonResponse(
+                    {"Error": f"{name} must be an integer"}, status=400
+                )
+            queryset = queryset.filter(**{f"{name}_id__in": ids})
+
+        chunk_size = getattr(settings, "CATALOG_EXPORT_CHUNK_SIZE", 2000)
+        response = StreamingHttpResponse(
+            encode(export_rows(queryset, chunk_size), chunk_size),
+            content_type=CONTENT_TYPES[fmt],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="catalog.{fmt}"'
+        )
+        return response
+
 
-class ListItemsOrder(ListAPIView):
+class ListItemsOrder(ValuesListMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ListItemsSerializer
     filter_backends = [filters.SearchFilter, filters.OrderingFilter]
@@ -180,57 +277,141 @@ class AddOrderItemView(CreateAPIView):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         user = self.request.user
-        serializer.validated_data["user"] = user
-
-        order, created = Order.objects.get_or_create(
-            user=user,
-            contact=serializer.validated_data["contact"],
-            status="new",
-        )
-
-        info = {}
-        for item in serializer.validated_data.get("orderitem_set", []):
-            product_id = item["product"]["id"]
-            shop_id = item["shop"]
-
-            product = Product.objects.get(
-                id=product_id, product_info__shop_id=shop_id
+        contact = serializer.validated_data["contact"]
+        items = serializer.validated_data.get("orderitem_set", [])
+        product_ids = {item["product"]["id"] for item in items}
+
+        order = Order.objects.filter(
+            user=user, contact=contact, status="new"
+        ).first()
+        lines = {}
+        if order is not None:
+            for line in OrderItem.objects.filter(
+                order=order, product_id__in=product_ids
+            ).select_related("hold"):
+                lines.setdefault(line.product_id, line)
+
+        # Позиции магазинов для всех запрошенных пар (товар, магазин):
+        # первая в порядке модели, как у product_info.first(); позиции
+        # строк корзины нужны для их резервов
+        offers = {}
+        free, names = {}, {}
+        for offer in ProductInfo.objects.filter(
+            Q(
+                product_id__in=product_ids,
+                shop_id__in={item["shop"] for item in items},
             )
-            product_info = product.product_info.filter(shop_id=shop_id).first()
-            available_qty = product_info.quantity if product_info else 0
-
-            product_item = OrderItem.objects.filter(
-                order=order, product=product
-            ).first()
+            | Q(id__in=[line.price_source_id for line in lines.values()])
+        ).values(
+            "id",
+            "product_id",
+            "shop_id",
+            "quantity",
+            "reserved",
+            "price_rrc",
+            "product__name",
+        ):
+            offers.setdefault((offer["product_id"], offer["shop_id"]), offer)
+            free[offer["id"]] = offer["quantity"] - offer["reserved"]
+            names[offer["id"]] = offer["product__name"]
+
+        # Доступные остатки проверяются в памяти в порядке позиций
+        # запроса; при нехватке ничего не записывается. Резерв строки
+        # дополняется до её нового количества: часть строки без резерва
+        # (просроченного и снятого) резервируется заново
+        info = {}
+        created, updated = [], {}
+        unheld, reserve = {}, {}
+        for item in items:
+            product_id, shop_id = item["product"]["id"], item["shop"]
+            offer = offers.get((product_id, shop_id))
+            if offer is None:
+                return Response(
+                    {
+                        "Error": f"Product {product_id} is not sold by "
+                        f"shop {shop_id}."
+                    },
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            name = offer["product__name"]
 
+            product_item = lines.get(product_id)
             requested_qty = item["quantity"]
+            if product_item and product_id not in unheld:
+                hold = getattr(product_item, "hold", None)
+                unheld[product_id] = product_item.quantity - (
+                    hold.quantity if hold else 0
+                )
+            offer_id = (
+                product_item and product_item.price_source_id or offer["id"]
+            )
+            available_qty = free[offer_id] - unheld.get(product_id, 0)
+            if requested_qty > available_qty:
+                return Response(
+                    {
+                        "Error": f"Insufficient stock for {name}. "
+                        f"Available: {max(available_qty, 0)}"
+                    },
+                    status=status.HTTP_403_FORBIDDEN,
+                )
             if product_item:
-                total_requested = product_item.quantity + requested_qty
-                if total_requested > available_qty:
-                    return Response(
-                        {
-                            "Error": f"Insufficient stock for {product.name}. Available: {available_qty - product_item.quantity}"
-                        },
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-                product_item.quantity = total_requested
-                product_item.save()
-                info[product.name] = "updated quantity in order"
+                product_item.quantity += requested_qty
+                if product_item.pk is not None:
+                    updated[product_item.pk] = product_item
+                info[name] = "updated quantity in order"
             else:
-                if requested_qty > available_qty:
-                    return Response(
-                        {
-                            "Error": f"Insufficient stock for {product.name}. Available: {available_qty}"
-                        },
-                        status=status.HTTP_403_FORBIDDEN,
-                    )
-                OrderItem.objects.create(
-                    order=order,
-                    product=product,
-                    shop=shop_id,
+                product_item = OrderItem(
+                    product_id=product_id,
+                    shop_id=shop_id,
                     quantity=requested_qty,
                 )
-                info[product.name] = "added to order"
+                lines[product_id] = product_item
+                created.append(product_item)
+                info[name] = "added to order"
+            if product_item.unit_price is None:
+                # Цена запоминается при добавлении товара в заказ
+                product_item.set_price(offer["price_rrc"], offer["id"])
+            product_item.update_total()
+
+            need = unheld.get(product_id, 0) + requested_qty
+            free[offer_id] -= need
+            unheld[product_id] = 0
+            reserve[product_id] = (
+                offer_id,
+                reserve.get(product_id, (offer_id, 0))[1] + need,
+            )
+
+        try:
+            with transaction.atomic():
+                if order is None:
+                    order = Order.objects.create(
+                        user=user, contact=contact, status="new"
+                    )
+                for product_item in created:
+                    product_item.order = order
+                OrderItem.objects.bulk_create(created)
+                OrderItem.objects.bulk_update(
+                    updated.values(),
+                    ["quantity", "unit_price", "price_source", "total_price"],
+                )
+                reserve_stock(
+                    {
+                        lines[product_id].pk: hold
+                        for product_id, hold in reserve.items()
+                    }
+                )
+                # Массовые запросы обходят OrderItem.save
+                order.touch()
+        except InsufficientStock as error:
+            # Остаток успели зарезервировать параллельные корзины
+            return Response(
+                {
+                    "Error": f"Insufficient stock for "
+                    f"{names[error.offer_id]}. "
+                    f"Available: {error.available}"
+                },
+                status=status.HTTP_403_FORBIDDEN,
+            )
 
         return Response(
             {"Success": "Item(s) added successfully", "details": info},
@@ -249,29 +430,64 @@ class DeleteOrderItemView(DestroyAPIView):
 
     def destroy(self, request, *args, **kwargs):
         obj = self.get_object()
-        self.perform_destroy(obj)
+        with transaction.atomic():
+            release_holds([obj.pk])
+            self.perform_destroy(obj)
         return Response(
             {"Success": "Item deleted successfully"},
             status=status.HTTP_204_NO_CONTENT,
         )
 
 
-class ListOrderView(ListAPIView):
+class ListOrderView(ETagMixin, ValuesListMixin, ListAPIView):
     permission_classes = [IsAuthenticated]
     serializer_class = ListOrderSerializer
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    pagination_class = OrderPagination
+    filter_backends = [
+        OrderFilter,
+        filters.SearchFilter,
+        filters.OrderingFilter,
+    ]
 
     def get_queryset(self):
-        return Order.objects.filter(user=self.request.user)
+        return Order.objects.filter(user=self.request.user).annotate(
+            **ORDER_TOTALS
+        )
+
+    def get_etag(self, request, *args, **kwargs):
+        # Число заказов учитывает удалённые, время изменения — правки
+        # заказов и их позиций
+        stamp = Order.objects.filter(user=request.user).aggregate(
+            count=Count("id"), modified=Max("updated_at")
+        )
+        return make_etag(
+            request.user.pk,
+            stamp["count"],
+            stamp["modified"],
+            request.build_absolute_uri(request.path),
+            query_stamp(request),
+        )
 
 
-class DetailOrderView(RetrieveAPIView):
+class DetailOrderView(ETagMixin, RetrieveAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrder]
     queryset = Order.objects.select_related(
         "user", "contact"
     ).prefetch_related("orderitem_set__product")
     serializer_class = GetOrderSerializer
 
+    def get_etag(self, request, *args, **kwargs):
+        # Чужой или несуществующий заказ отметки не получает, и ответ
+        # с ошибкой собирается обычным образом
+        modified = (
+            Order.objects.filter(pk=kwargs["pk"], user=request.user)
+            .values_list("updated_at", flat=True)
+            .first()
+        )
+        if modified is None:
+            return None
+        return make_etag(kwargs["pk"], modified)
+
 
 class ConfirmOrderView(UpdateAPIView):
     permission_classes = [IsAuthenticated, IsOwnerOrder]
@@ -279,24 +495,84 @@ class ConfirmOrderView(UpdateAPIView):
     queryset = Order.objects.all()
     lookup_field = "id"
 
+    @staticmethod
+    def get_offer_ids(items):
+        """
+        Сопоставляет строкам заказа позиции магазинов, с которых
+        списывается остаток.
+
+        Позиция берётся из цены строки; строкам без неё позиция ищется
+        по паре товар-магазин одним запросом.
+
+        Возвращает:
+            Словарь ID строки -> ID позиции (None, если позиции нет).
+        """
+        offer_ids = {item.pk: item.price_source_id for item in items}
+        missing = [item for item in items if item.price_source_id is None]
+        if missing:
+            offers = {}
+            for pk, product_id, shop_id in ProductInfo.objects.filter(
+                product_id__in={item.product_id for item in missing},
+                shop_id__in={item.shop_id for item in missing},
+            ).values_list("id", "product_id", "shop_id"):
+                offers.setdefault((product_id, shop_id), pk)
+            for item in missing:
+                offer_ids[item.pk] = offers.get(
+                    (item.product_id, item.shop_id)
+                )
+        return offer_ids
+
+    @staticmethod
+    def insufficient(name, available):
+        return Response(
+            {
+                "Error": f"Insufficient stock for {name}. Available: {available}"
+            },
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
     def update(self, request, *args, **kwargs):
         order = self.get_object()
         serializer = self.get_serializer(order, data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        if order.status in [
-            "confirmed",
-            "assembled",
-            "sent",
-            "delivered",
-            "canceled",
-        ]:
-            return Response(
-                {"Order status": order.status},
-                status=status.HTTP_403_FORBIDDEN,
-            )
+        with transaction.atomic():
+            # Блокировка заказа не даёт подтвердить его дважды параллельно
+            order = Order.objects.select_for_update().get(pk=order.pk)
+            if order.status in [
+                "confirmed",
+                "assembled",
+                "sent",
+                "delivered",
+                "canceled",
+            ]:
+                return Response(
+                    {"Order status": order.status},
+                    status=status.HTTP_403_FORBIDDEN,
+                )
 
-        order.status = "confirmed"
+            items = list(order.orderitem_set.select_related("product"))
+            offer_ids = self.get_offer_ids(items)
+            demand = {}
+            for item in items:
+                offer_id = offer_ids.get(item.pk)
+                if offer_id is None:
+                    return self.insufficient(item.product.name, 0)
+                demand[offer_id] = demand.get(offer_id, 0) + item.quantity
+            try:
+                decrement_stock(demand, [item.pk for item in items])
+            except InsufficientStock as error:
+                item = next(
+                    item
+                    for item in items
+                    if offer_ids[item.pk] == error.offer_id
+                )
+                return self.insufficient(item.product.name, error.available)
+
+            order.status = "confirmed"
+            order.save()
+            refresh_catalog_quantities(demand)
+            bump_catalog_version()
 
         order_summary = {
             "order_id": order.id,
@@ -305,23 +581,14 @@ class ConfirmOrderView(UpdateAPIView):
             "price_order": 0,
             "products": {},
         }
-
-        for item in order.orderitem_set.all():
-            product = item.product
-            order_summary["products"][product.name] = {
+        for item in items:
+            order_summary["products"][item.product.name] = {
                 "quantity": item.quantity,
                 "total_price": item.total_price,
                 "id": item.id,
             }
             order_summary["price_order"] += item.total_price
-
-            prod_info = product.product_info.filter(shop=item.shop).first()
-            if prod_info:
-                prod_info.quantity -= item.quantity
-                prod_info.save()
-
         send_confirmed_order(order_summary, [request.user.email])
-        order.save()
 
         return Response(
             {"Success": "Order confirmed successfully"},
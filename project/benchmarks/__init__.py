@@ -0,0 +1,11 @@
+import os
+
+import django
+
+
+def setup_django():
+    """
+    Настраивает Django для запуска бенчмарков вне manage.py.
+    """
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "diplom.settings")
+    django.setup()
@@ -0,0 +1,80 @@
+"""
+Бенчмарк постраничного вывода каталога: выборка страницы по ключу
+против OFFSET на разной глубине.
+
+Запуск из каталога project на заполненной базе:
+    python manage.py seed_scale --products 500000
+    python -m benchmarks.bench_catalog_pages --depths 0 10000 100000 500000
+
+Для каждой сортировки и глубины замеряется медиана времени выборки
+одной страницы вместе с сериализацией.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings) * 1000
+
+
+def run(ordering, depths, page_size, repeat):
+    from backend.pagination import KeysetPagination, rows_after, row_value
+    from backend.views import ListProductView
+
+    serializer = ListProductView.serializer_class
+    queryset = ListProductView.queryset.order_by(*ordering.split(","))
+    fields = KeysetPagination().get_ordering(queryset)
+    queryset = queryset.order_by(*fields)
+
+    for depth in depths:
+        boundary = queryset[depth - 1] if depth else None
+
+        def keyset():
+            qs = queryset
+            if boundary is not None:
+                values = [row_value(boundary, field) for field in fields]
+                qs = qs.filter(rows_after(fields, values))
+            return serializer(qs[:page_size], many=True).data
+
+        def offset():
+            return serializer(
+                queryset[depth : depth + page_size], many=True
+            ).data
+
+        print(
+            f"{ordering:>12} depth {depth:>8}: "
+            f"keyset {measure(keyset, repeat):8.2f} ms, "
+            f"offset {measure(offset, repeat):8.2f} ms"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--orderings",
+        nargs="+",
+        default=["price_rrc", "-quantity", "model"],
+    )
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 10000, 100000]
+    )
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    for ordering in args.orderings:
+        run(ordering, args.depths, args.page_size, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
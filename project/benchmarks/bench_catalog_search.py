@@ -0,0 +1,84 @@
+"""
+Бенчмарк поиска по каталогу: режимы search_mode эндпоинта
+/api/v1/products/ на одних и тех же запросах.
+
+Запуск из каталога project на заполненной базе:
+    python manage.py seed_scale --products 500000 --parameters 0 \\
+        --orders 0 --buyers 0
+    python -m benchmarks.bench_catalog_search --modes contains fuzzy
+
+Каждый запрос выполняется через представление целиком (фильтрация,
+первая страница, сериализация); выводятся медиана и 95-й процентиль
+времени ответа и число найденных на первой странице позиций.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django
+
+
+QUERIES = [
+    "смартфон",
+    "ноутбук apple",
+    "модель 12345",
+    "samsung",
+    "телевизоры 7",
+    "магазин 3",
+    "наушники sony",
+    "игровые",
+    "samsng",
+    "lenovo/4242",
+    "xiaomi/12345",
+    "смартфны модль 777",
+]
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+def run(mode, queries, repeat):
+    from rest_framework.test import APIRequestFactory
+
+    from backend.views import ListProductView
+
+    view = ListProductView.as_view()
+    factory = APIRequestFactory()
+    timings, found = [], 0
+    for _ in range(repeat):
+        for terms in queries:
+            request = factory.get(
+                "/api/v1/products/", {"search": terms, "search_mode": mode}
+            )
+            started = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append((time.perf_counter() - started) * 1000)
+            found += len(response.data["results"])
+
+    print(
+        f"{mode:>10}: p50 {statistics.median(timings):9.2f} ms, "
+        f"p95 {percentile(timings, 0.95):9.2f} ms, "
+        f"{found / repeat:6.0f} rows on first pages"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--modes", nargs="+", default=["contains", "fulltext", "fuzzy"]
+    )
+    parser.add_argument("--queries", nargs="+", default=QUERIES)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    setup_django()
+    for mode in args.modes:
+        run(mode, args.queries, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Бенчмарк пакетного импорта прайс-листа.
+
+Запуск из каталога project:
+    python -m benchmarks.bench_import --sizes 1000 10000 100000
+
+Для каждого размера импорт выполняется внутри транзакции, которая затем
+откатывается, поэтому данные в БД не остаются.
+"""
+
+import argparse
+import time
+
+from benchmarks import setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def run(size, batch_size):
+    from django.db import connection, transaction
+    from django.test.utils import CaptureQueriesContext
+
+    from backend.importer import import_price_list
+    from benchmarks.pricelist import make_price_list
+    from users.models import CustomUser
+
+    data = make_price_list(size)
+    try:
+        with transaction.atomic():
+            user = CustomUser.objects.create_user(
+                email="bench_import@example.com", type="shop"
+            )
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                result = import_price_list(data, user, batch_size=batch_size)
+                elapsed = time.perf_counter() - started
+            raise Rollback
+    except Rollback:
+        pass
+
+    print(
+        f"{size:>8} goods: {elapsed:8.2f} s, "
+        f"{result.processed / elapsed:10.0f} rows/s, "
+        f"{len(queries):6} queries"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[1000, 10000, 100000]
+    )
+    parser.add_argument("--batch-size", type=int, default=None)
+    args = parser.parse_args()
+
+    setup_django()
+    for size in args.sizes:
+        run(size, args.batch_size)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""
+Бенчмарк разбора прайс-листа в разных форматах.
+
+Запуск из каталога project:
+    python -m benchmarks.bench_parse_formats --size 100000
+
+Для YAML, JSON и CSV, а также их gzip вариантов измеряется время от
+открытия файла до получения последнего товара.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from backend.pricelist import read_price_list
+from benchmarks.pricelist import write_csv, write_json, write_yaml, gzip_file
+
+
+def parse(path):
+    with open(path, "rb") as f:
+        data = read_price_list(f, name=path)
+        return sum(1 for _ in data["goods"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100000)
+    args = parser.parse_args()
+
+    writers = [("yaml", write_yaml), ("json", write_json), ("csv", write_csv)]
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt, write in writers:
+            path = os.path.join(tmp, f"goods.{fmt}")
+            write(path, args.size)
+            for variant in (path, gzip_file(path)):
+                size_mb = os.path.getsize(variant) / 2**20
+                started = time.perf_counter()
+                count = parse(variant)
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{os.path.basename(variant):>12} ({size_mb:6.1f} MB): "
+                    f"{elapsed:7.2f} s, {count / elapsed:9.0f} goods/s"
+                )
+
+
+if __name__ == "__main__":
+    main()
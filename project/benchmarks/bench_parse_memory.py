@@ -0,0 +1,102 @@
+"""
+Бенчмарк памяти при разборе прайс-листа YAML и JSON.
+
+Запуск из каталога project:
+    python -m benchmarks.bench_parse_memory --sizes 10000 100000
+    python -m benchmarks.bench_parse_memory --formats json
+
+Для каждого формата и размера сравнивается пиковый объём памяти Python
+(tracemalloc) при загрузке документа целиком и при потоковом разборе
+read_yaml или read_json.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from yaml import load as yaml_load
+
+from backend.pricelist import json_loads, read_json, read_yaml, YamlLoader
+from benchmarks.pricelist import write_json, write_yaml
+
+
+def full_yaml(path):
+    # Прежний путь: байты файла и всё дерево объектов в памяти
+    with open(path, "rb") as f:
+        content = f.read()
+    data = yaml_load(content, Loader=YamlLoader)
+    return len(data["goods"])
+
+
+def full_json(path):
+    with open(path, "rb") as f:
+        content = f.read()
+    return len(json_loads(content)["goods"])
+
+
+def streaming(reader):
+    def load(path):
+        with open(path, "rb") as f:
+            data = reader(f)
+            return sum(1 for _ in data["goods"])
+
+    return load
+
+
+FORMATS = {
+    "yaml": (write_yaml, full_yaml, streaming(read_yaml)),
+    "json": (write_json, full_json, streaming(read_json)),
+}
+
+
+def measure(func, path):
+    # Время меряется отдельно: tracemalloc замедляет разбор в разы
+    started = time.perf_counter()
+    func(path)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    func(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[10000, 100000]
+    )
+    parser.add_argument(
+        "--formats", nargs="+", choices=FORMATS, default=list(FORMATS)
+    )
+    parser.add_argument(
+        "--skip-full",
+        action="store_true",
+        help="Не измерять загрузку документа целиком.",
+    )
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for fmt in args.formats:
+            write, full_load, streaming_load = FORMATS[fmt]
+            for size in args.sizes:
+                path = os.path.join(tmp, f"goods_{size}.{fmt}")
+                write(path, size)
+                file_mb = os.path.getsize(path) / 2**20
+                loaders = [("streaming", streaming_load)]
+                if not args.skip_full:
+                    loaders.insert(0, ("full", full_load))
+                for name, func in loaders:
+                    elapsed, peak = measure(func, path)
+                    print(
+                        f"{fmt:>4} {size:>8} goods ({file_mb:7.1f} MB) "
+                        f"{name:>9}: {elapsed:7.2f} s, "
+                        f"peak {peak / 2**10:10.0f} KB"
+                    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Бенчмарк быстрого режима списков: сериализаторы DRF на экземплярах
+моделей против строк values() для каталога, заказов и позиций заказов.
+
+Запуск из каталога project на заполненной базе:
+    python manage.py seed_scale --products 500000 --orders 10000
+    python -m benchmarks.bench_serializers --rows 1000
+
+Для каждого списка замеряется медиана времени выборки, сериализации
+и рендеринга JSON rows строк и пересчитывается в строки в секунду;
+JSON обоих режимов сверяется байт в байт.
+"""
+
+import argparse
+import statistics
+import time
+
+from benchmarks import setup_django
+
+
+def measure(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def lists():
+    from backend.models import CatalogEntry, Order, OrderItem
+    from backend.serializers import (
+        CatalogEntrySerializer,
+        ListItemsSerializer,
+        ListOrderSerializer,
+        ORDER_TOTALS,
+    )
+
+    return [
+        (
+            "catalog",
+            CatalogEntrySerializer,
+            CatalogEntry.objects.defer("search_vector").order_by(
+                "price_rrc", "product_info_id"
+            ),
+        ),
+        (
+            "orders",
+            ListOrderSerializer,
+            Order.objects.annotate(**ORDER_TOTALS).order_by("-dt", "id"),
+        ),
+        (
+            "order items",
+            ListItemsSerializer,
+            OrderItem.objects.select_related("product").order_by("-pk"),
+        ),
+    ]
+
+
+def run(name, serializer_class, queryset, rows, repeat):
+    from rest_framework.renderers import JSONRenderer
+
+    renderer = JSONRenderer()
+
+    def instances():
+        return renderer.render(
+            serializer_class(queryset[:rows], many=True).data
+        )
+
+    def values():
+        page = queryset.values(
+            *serializer_class.values_fields,
+            *queryset.query.annotations,
+        )[:rows]
+        return renderer.render(
+            [serializer_class.represent_values(row) for row in page]
+        )
+
+    assert instances() == values(), f"{name}: outputs differ"
+    before = measure(instances, repeat)
+    after = measure(values, repeat)
+    print(
+        f"{name:>12}: instances {rows / before:9.0f} rows/s, "
+        f"values {rows / after:9.0f} rows/s ({before / after:4.1f}x)"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    setup_django()
+    for name, serializer_class, queryset in lists():
+        run(name, serializer_class, queryset, args.rows, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+import csv
+import gzip
+import json
+import random
+import shutil
+
+import yaml
+
+try:
+    from yaml import CSafeDumper as YamlDumper
+except ImportError:
+    from yaml import SafeDumper as YamlDumper
+
+
+CATEGORIES = [
+    {"id": 300, "name": "Ноутбуки"},
+    {"id": 301, "name": "Игровые консоли"},
+    {"id": 302, "name": "Наушники"},
+    {"id": 303, "name": "Смарт-часы"},
+]
+
+COLORS = ["белый", "черный", "серебристый", "синий", "красный"]
+
+
+def make_goods(count, seed=0, start_id=5000000):
+    """
+    Генерирует товары в формате shop1.yaml.
+
+    Аргументы:
+        count (int): Количество товаров.
+        seed (int): Зерно генератора, одинаковое зерно даёт одинаковые данные.
+        start_id (int): Первый внешний ID товара.
+    """
+    rnd = random.Random(seed)
+    for i in range(count):
+        price = rnd.randrange(1000, 300000, 10)
+        yield {
+            "id": start_id + i,
+            "category": CATEGORIES[i % len(CATEGORIES)]["id"],
+            "model": f"vendor-{i % 997}/model-{i}",
+            "name": f"Товар {i} серии {i % 97}",
+            "price": price,
+            "price_rrc": price + rnd.randrange(0, 10000, 10),
+            "quantity": rnd.randrange(0, 100),
+            "parameters": {
+                "Диагональ_дюймы": round(rnd.uniform(5, 17), 1),
+                "Оперативная_память_Гб": rnd.choice([4, 8, 16, 32, 64]),
+                "Накопитель_GB": rnd.choice([128, 256, 512, 1024]),
+                "Цвет": rnd.choice(COLORS),
+            },
+        }
+
+
+def make_price_list(count, seed=0, shop="Бенчмарк"):
+    """
+    Возвращает прайс-лист с count товарами в виде словаря.
+    """
+    return {
+        "shop": shop,
+        "categories": CATEGORIES,
+        "goods": list(make_goods(count, seed=seed)),
+    }
+
+
+def write_yaml(path, count, seed=0, shop="Бенчмарк"):
+    """
+    Записывает прайс-лист YAML с count товарами в файл path, не держа
+    весь документ в памяти.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(
+            yaml.dump(
+                {"shop": shop, "categories": CATEGORIES},
+                Dumper=YamlDumper,
+                allow_unicode=True,
+                sort_keys=False,
+            )
+        )
+        f.write("goods:\n")
+        for item in make_goods(count, seed=seed):
+            f.write(
+                yaml.dump(
+                    [item],
+                    Dumper=YamlDumper,
+                    allow_unicode=True,
+                    sort_keys=False,
+                )
+            )
+
+
+def write_json(path, count, seed=0, shop="Бенчмарк"):
+    """
+    Записывает прайс-лист JSON с count товарами в файл path.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(json.dumps({"shop": shop, "categories": CATEGORIES})[:-1])
+        f.write(', "goods": [')
+        for i, item in enumerate(make_goods(count, seed=seed)):
+            if i:
+                f.write(",")
+            f.write(json.dumps(item, ensure_ascii=False))
+        f.write("]}")
+
+
+def write_csv(path, count, seed=0, shop="Бенчмарк"):
+    """
+    Записывает плоский прайс-лист CSV с count товарами в файл path.
+    """
+    names = {cat["id"]: cat["name"] for cat in CATEGORIES}
+    writer = None
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        for item in make_goods(count, seed=seed):
+            row = {
+                "shop": shop,
+                "category": item["category"],
+                "category_name": names[item["category"]],
+                "id": item["id"],
+                "name": item["name"],
+                "model": item["model"],
+                "price": item["price"],
+                "price_rrc": item["price_rrc"],
+                "quantity": item["quantity"],
+                **item["parameters"],
+            }
+            if writer is None:
+                writer = csv.DictWriter(f, fieldnames=list(row))
+                writer.writeheader()
+            writer.writerow(row)
+
+
+def gzip_file(path):
+    """
+    Сжимает файл path в path.gz и возвращает путь к сжатому файлу.
+    """
+    with open(path, "rb") as src, gzip.open(path + ".gz", "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    return path + ".gz"
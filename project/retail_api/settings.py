@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # Сторонние приложения
     "rest_framework",
     "django_filters",
@@ -117,6 +118,61 @@ REST_FRAMEWORK = {
     "TEST_REQUEST_DEFAULT_FORMAT": "json",
 }
 
+# Размер страницы каталога товаров по умолчанию
+CATALOG_PAGE_SIZE = int(os.getenv("CATALOG_PAGE_SIZE", 50))
+
+# Размер страницы списка заказов по умолчанию
+ORDER_PAGE_SIZE = int(os.getenv("ORDER_PAGE_SIZE", 50))
+
+# Конфигурация полнотекстового поиска PostgreSQL по каталогу
+CATALOG_SEARCH_CONFIG = os.getenv("CATALOG_SEARCH_CONFIG", "russian")
+
+# Порог триграммного сходства (от 0 до 1) для нечёткого поиска по модели
+# и названию товара; чем он ниже, тем больше совпадений приходится
+# сортировать, а при пороге ниже 0.6 триграммные индексы не используются
+CATALOG_TRIGRAM_THRESHOLD = float(os.getenv("CATALOG_TRIGRAM_THRESHOLD", 0.6))
+
+# Сколько самых частых значений каждого параметра отдаётся в блоке
+# фасетов каталога
+CATALOG_FACET_VALUES = int(os.getenv("CATALOG_FACET_VALUES", 20))
+
+# Если по фасетам условию на параметр соответствует не больше позиций,
+# их ID выбираются по индексу параметра до основного запроса каталога
+CATALOG_PARAMETER_PREFETCH = int(os.getenv("CATALOG_PARAMETER_PREFETCH", 2000))
+
+# Кэш Django: по умолчанию в памяти процесса. Версия каталога хранится
+# в базе, поэтому изменения каталога из обработчика импорта сбрасывают
+# ответы во всех процессах и с таким кэшем; общий кэш избавляет лишь
+# от повторной сборки одного ответа в каждом процессе, например
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache и
+# CACHE_LOCATION=redis://127.0.0.1:6379
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv(
+            "CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": os.getenv("CACHE_LOCATION", ""),
+    }
+}
+
+# Время жизни ответов списка товаров в кэше в секундах (0 — без кэша);
+# при импорте и подтверждении заказа ответы сбрасываются сразу
+CATALOG_CACHE_TIMEOUT = int(os.getenv("CATALOG_CACHE_TIMEOUT", 300))
+
+# Как часто процесс записывает в базу счётчики попаданий и промахов
+# кэша каталога, в секундах
+CATALOG_CACHE_STATS_INTERVAL = int(
+    os.getenv("CATALOG_CACHE_STATS_INTERVAL", 10)
+)
+
+# Сколько строк каталога выгрузка читает из базы и отправляет клиенту
+# за раз
+CATALOG_EXPORT_CHUNK_SIZE = int(os.getenv("CATALOG_EXPORT_CHUNK_SIZE", 2000))
+
+# Сколько секунд корзина держит резерв остатка добавленного товара;
+# просроченные резервы снимает команда release_stock_holds
+STOCK_HOLD_TTL = int(os.getenv("STOCK_HOLD_TTL", 900))
+
 # Настройки почтового сервера, значения берутся из .env
 EMAIL_HOST = os.getenv("EMAIL_HOST")
 EMAIL_PORT = os.getenv("EMAIL_PORT")
@@ -141,5 +197,21 @@ USE_TZ = True  # Использовать временные зоны
 STATIC_URL = "static/"
 STATIC_ROOT = os.path.join(BASE_DIR, "static")
 
+# Загруженные файлы (прайс-листы, ожидающие импорта)
+MEDIA_ROOT = os.path.join(BASE_DIR, "media")
+
 # Тип поля по умолчанию для первичного ключа в моделях
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
+
+# Размер пачки при пакетной записи прайс-листа в БД
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", 1000))
+
+# Число товаров прайс-листа, фиксируемых одной транзакцией; прерванный
+# импорт продолжается с последней зафиксированной порции
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 10000))
+
+# Загрузка прайс-листов по ссылке: таймаут запроса в секундах,
+# предельный размер файла в байтах и размер пула соединений
+PRICE_LIST_FETCH_TIMEOUT = float(os.getenv("PRICE_LIST_FETCH_TIMEOUT", 30))
+PRICE_LIST_MAX_SIZE = int(os.getenv("PRICE_LIST_MAX_SIZE", 512 * 2**20))
+PRICE_LIST_POOL_SIZE = int(os.getenv("PRICE_LIST_POOL_SIZE", 10))
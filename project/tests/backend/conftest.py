@@ -0,0 +1,135 @@
+import copy
+import hashlib
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+from yaml import load as yaml_load, Loader
+
+from backend import catalog_cache
+from backend.importer import import_price_list
+from users.models import CustomUser
+
+
+SHOP_YAML = Path(__file__).resolve().parents[3] / "shop1.yaml"
+
+
+class PriceListServer:
+    """
+    Локальный HTTP-сервер, заменяющий сайт магазина в тестах.
+
+    Файлы задаются словарём files (путь -> bytes). Сервер отдаёт ETag и
+    Last-Modified и отвечает 304 на условные запросы с совпадающим ETag.
+    """
+
+    def __init__(self):
+        self.files = {}
+        self.requests = []
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever, daemon=True
+        )
+
+    def url(self, path):
+        host, port = self.httpd.server_address
+        return f"http://{host}:{port}{path}"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.requests.append((self.path, dict(self.headers)))
+                body = server.files.get(self.path)
+                if body is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+
+                etag = f'"{hashlib.md5(body).hexdigest()}"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "application/x-yaml")
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("ETag", etag)
+                self.send_header("Last-Modified", formatdate(usegmt=True))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+@pytest.fixture
+def price_list_server():
+    """
+    Запускает локальный HTTP-сервер с прайс-листами на время теста.
+    """
+    server = PriceListServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def clear_cache(monkeypatch):
+    """
+    Очищает кэш Django и незаписанные счётчики кэша каталога: база
+    откатывается после каждого теста, а память процесса — нет.
+    """
+    cache.clear()
+    monkeypatch.setattr(catalog_cache, "_pending", {"hits": 0, "misses": 0})
+    monkeypatch.setattr(catalog_cache, "_flushed_at", time.monotonic())
+
+
+@pytest.fixture
+def client():
+    return APIClient()
+
+
+@pytest.fixture
+def user():
+    """
+    Создаёт активного пользователя-магазин test_user@mail.ru с паролем
+    password.
+    """
+    return CustomUser.objects.create_user(
+        email="test_user@mail.ru",
+        password="password",
+        is_active=True,
+        type="shop",
+    )
+
+
+@pytest.fixture
+def price_list():
+    """
+    Возвращает прайс-лист shop1.yaml в виде словаря.
+    """
+    with open(SHOP_YAML, encoding="utf-8") as f:
+        return yaml_load(f, Loader=Loader)
+
+
+@pytest.fixture
+def catalog(price_list, django_capture_on_commit_callbacks):
+    """
+    Импортирует shop1.yaml.
+    """
+    with django_capture_on_commit_callbacks(execute=True):
+        import_price_list(copy.deepcopy(price_list), None)
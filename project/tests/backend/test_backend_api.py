@@ -2,8 +2,9 @@ import pytest
 from rest_framework.test import APIClient
 import base64
 
+from backend.jobs import process_next_job
 from backend.models import Shop, Product, ProductInfo, Order, OrderItem
-from users.models import CustomUser, Contact
+from users.models import Contact
 
 
 @pytest.fixture
@@ -15,21 +16,6 @@ def client():
     return APIClient()
 
 
-@pytest.fixture
-def user():
-    """
-    Создаёт и возвращает тестового пользователя с указанной почтой и паролем,
-    активного и с типом 'shop' для тестирования.
-    """
-    user = CustomUser.objects.create_user(
-        email="test_user@mail.ru",
-        password="password",
-        is_active=True,
-        type="shop",
-    )
-    return user
-
-
 @pytest.fixture
 def contact(user):
     """
@@ -53,8 +39,8 @@ def contact(user):
 @pytest.fixture
 def products(client):
     """
-    Загружает данные товаров из внешнего YAML-файла по URL и
-    возвращает все объекты Product из базы.
+    Загружает данные товаров из внешнего YAML-файла по URL, обрабатывает
+    задачу импорта и возвращает все объекты Product из базы.
     """
     response = client.post(
         "/api/v1/upload/",
@@ -66,6 +52,7 @@ def products(client):
             "Content-Type": "application/json",
         },
     )
+    process_next_job()
     products = Product.objects.all()
     return products
 
@@ -198,7 +185,8 @@ def test_create_delete_order(
 @pytest.mark.django_db
 def test_upload(client, user):
     """
-    Проверяет загрузку товаров по ссылке и создание магазина с нужным количеством товаров.
+    Проверяет постановку загрузки товаров по ссылке в очередь, обработку
+    задачи и создание магазина с нужным количеством товаров.
     """
     response = client.post(
         "/api/v1/upload/",
@@ -210,11 +198,16 @@ def test_upload(client, user):
             "Content-Type": "application/json",
         },
     )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    job = process_next_job()
 
     shop = Shop.objects.get(name="МВидео")
     product_count = Product.objects.count()
 
-    assert response.status_code == 200
+    assert job.id == job_id
+    assert job.state == "done"
     assert shop.name == "МВидео"
     assert product_count == 14
 
@@ -0,0 +1,179 @@
+import copy
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.importer import import_price_list
+from backend.models import ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+@pytest.fixture
+def catalog(price_list):
+    """
+    Импортирует shop1.yaml от имени двух магазинов.
+    """
+    import_price_list(copy.deepcopy(price_list), None)
+    price_list["shop"] = "Эльдорадо"
+    import_price_list(price_list, None)
+
+
+@pytest.fixture
+def contact(client, catalog):
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    client.force_authenticate(user)
+    return Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+
+
+def add(client, contact, *offers, quantity=1):
+    """
+    Добавляет в корзину позиции магазинов offers; quantity — количество
+    для всех позиций или список количеств.
+    """
+    if isinstance(quantity, int):
+        quantity = [quantity] * len(offers)
+    return client.post(
+        "/api/v1/add_order_items/",
+        {
+            "contact": contact.id,
+            "order_items": [
+                {
+                    "product": {"id": offer.product_id},
+                    "quantity": count,
+                    "shop": offer.shop_id,
+                }
+                for offer, count in zip(offers, quantity)
+            ],
+        },
+    )
+
+
+def basket(contact):
+    return {
+        (line.product_id, line.shop_id): line.quantity
+        for line in OrderItem.objects.filter(
+            order__contact=contact, order__status="new"
+        )
+    }
+
+
+@pytest.mark.django_db
+def test_add_items(client, contact):
+    offers = list(ProductInfo.objects.filter(shop__name="МВидео")[:3])
+
+    response = add(client, contact, *offers, quantity=2)
+
+    assert response.status_code == 201
+    assert response.data["details"] == {
+        offer.product.name: "added to order" for offer in offers
+    }
+    assert basket(contact) == {
+        (offer.product_id, offer.shop_id): 2 for offer in offers
+    }
+    for offer in offers:
+        line = OrderItem.objects.get(product=offer.product)
+        assert line.unit_price == offer.price_rrc
+        assert line.price_source == offer
+        assert line.total_price == 2 * offer.price_rrc
+
+    response = add(client, contact, offers[0], offers[0], quantity=1)
+
+    assert response.status_code == 201
+    assert response.data["details"] == {
+        offers[0].product.name: "updated quantity in order"
+    }
+    assert basket(contact)[offers[0].product_id, offers[0].shop_id] == 4
+    assert Order.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_insufficient_stock_writes_nothing(client, contact):
+    offers = list(ProductInfo.objects.filter(shop__name="МВидео")[:2])
+    add(client, contact, offers[0])
+    short = offers[1]
+
+    response = add(
+        client, contact, offers[0], short, quantity=[1, short.quantity + 1]
+    )
+
+    assert response.status_code == 403
+    assert response.data == {
+        "Error": f"Insufficient stock for {short.product.name}. "
+        f"Available: {short.quantity}"
+    }
+    assert basket(contact) == {(offers[0].product_id, offers[0].shop_id): 1}
+
+
+@pytest.mark.django_db
+def test_unknown_offer_is_rejected(client, contact):
+    offer = ProductInfo.objects.first()
+
+    response = client.post(
+        "/api/v1/add_order_items/",
+        {
+            "contact": contact.id,
+            "order_items": [
+                {"product": {"id": offer.product_id}, "quantity": 1, "shop": 0}
+            ],
+        },
+    )
+
+    assert response.status_code == 400
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_basket_writes_take_constant_queries(client, contact):
+    """
+    Проверяет, что число запросов не зависит от числа позиций корзины.
+    """
+    offers = list(ProductInfo.objects.order_by("id"))
+    counts = []
+    for batch in (offers[:1], offers[:2], offers):
+        with CaptureQueriesContext(connection) as queries:
+            assert add(client, contact, *batch).status_code == 201
+        counts.append(len(queries))
+
+    # Проверка контакта, поиск корзины, её строки, позиции магазинов,
+    # точка сохранения и её снятие, массовые вставка и обновление,
+    # резерв (точка сохранения, вставка резервов, блокировка позиций,
+    # их обновление, снятие точки) и отметка изменения заказа; первый
+    # запрос вместо чтения строк и обновления создаёт заказ
+    assert counts == [13, 14, 14]
+    assert len(offers) > 10
+    assert len(basket(contact)) == len({offer.product_id for offer in offers})
+
+
+@pytest.mark.django_db
+def test_line_price_comes_from_its_shop(contact):
+    """
+    Проверяет, что цена строки заказа берётся у позиции её магазина,
+    а переданная цена сохраняется без запросов к позициям.
+    """
+    offer = ProductInfo.objects.get(
+        shop__name="Эльдорадо", model="sony/playstation-5"
+    )
+    ProductInfo.objects.filter(pk=offer.pk).update(price_rrc=55555)
+    order = Order.objects.create(user=contact.user, contact=contact)
+
+    line = OrderItem.objects.create(
+        order=order, product=offer.product, shop=offer.shop, quantity=3
+    )
+    assert line.unit_price == 55555
+    assert line.price_source_id == offer.pk
+    assert line.total_price == 3 * 55555
+
+    line = OrderItem(
+        order=order, product=offer.product, shop=offer.shop, quantity=2
+    )
+    line.set_price(100, offer.pk)
+    with CaptureQueriesContext(connection) as queries:
+        line.save()
+    # Вставка строки и отметка изменения заказа
+    assert len(queries) == 2
+    assert line.total_price == 200
@@ -0,0 +1,130 @@
+import copy
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.importer import import_price_list
+from backend.models import CatalogEntry, ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+ENTRY_FIELDS = (
+    "shop_id",
+    "shop_name",
+    "product_id",
+    "product_name",
+    "category_id",
+    "category_name",
+    "model",
+    "quantity",
+    "price_rrc",
+)
+
+
+def entry_of(info):
+    """
+    Ожидаемая строка каталога для позиции.
+    """
+    return {
+        "shop_id": info.shop_id,
+        "shop_name": info.shop.name,
+        "product_id": info.product_id,
+        "product_name": info.product.name,
+        "category_id": info.product.category_id,
+        "category_name": info.product.category.name,
+        "model": info.model,
+        "quantity": info.quantity,
+        "price_rrc": info.price_rrc,
+    }
+
+
+def catalog_entries():
+    return {
+        pk: dict(zip(ENTRY_FIELDS, row))
+        for pk, *row in CatalogEntry.objects.values_list("pk", *ENTRY_FIELDS)
+    }
+
+
+@pytest.mark.django_db
+def test_import_writes_catalog(catalog):
+    assert catalog_entries() == {
+        info.pk: entry_of(info) for info in ProductInfo.objects.all()
+    }
+
+
+@pytest.mark.django_db
+def test_reimport_updates_catalog(catalog, price_list):
+    """
+    Проверяет, что повторный импорт переписывает изменённые строки
+    каталога и удаляет строки исчезнувших позиций.
+    """
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] = 99990
+    changed["goods"][0]["name"] = "Ноутбук Dell XPS 13 (2021)"
+    removed = changed["goods"].pop()
+
+    import_price_list(changed, None)
+
+    assert catalog_entries() == {
+        info.pk: entry_of(info) for info in ProductInfo.objects.all()
+    }
+    entry = CatalogEntry.objects.get(model="dell/xps-13-9310")
+    assert entry.price_rrc == 99990
+    assert entry.product_name == "Ноутбук Dell XPS 13 (2021)"
+    assert not CatalogEntry.objects.filter(model=removed["model"]).exists()
+
+
+@pytest.mark.django_db
+def test_listing_reads_catalog_without_joins(client, catalog):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            "/api/v1/products/", {"ordering": "product__category__name"}
+        )
+
+    # Первый запрос читает версию каталога
+    sql = queries[1]["sql"]
+    assert "backend_catalogentry" in sql
+    assert "JOIN" not in sql
+
+    info = ProductInfo.objects.get(model=response.data["results"][0]["model"])
+    assert response.data["results"][0] == {
+        "model": info.model,
+        "quantity": info.quantity,
+        "price_rrc": info.price_rrc,
+        "shop": {"id": info.shop_id, "name": info.shop.name},
+        "product": {"id": info.product_id, "name": info.product.name},
+    }
+
+
+@pytest.mark.django_db
+def test_order_confirmation_updates_catalog_stock(
+    client, catalog, monkeypatch
+):
+    """
+    Проверяет, что остаток в каталоге уменьшается при подтверждении
+    заказа.
+    """
+    # Письмо о заказе к проверке отношения не имеет
+    monkeypatch.setattr(
+        "backend.views.send_confirmed_order", lambda *args: None
+    )
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    contact = Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    info = ProductInfo.objects.get(model="sony/playstation-5")
+    order = Order.objects.create(user=user, contact=contact)
+    OrderItem.objects.create(
+        order=order, product=info.product, shop=info.shop, quantity=2
+    )
+    client.force_authenticate(user)
+
+    response = client.patch(
+        f"/api/v1/confirm/{order.id}/", {"status": "confirm"}
+    )
+
+    assert response.status_code == 200
+    assert CatalogEntry.objects.get(pk=info.pk).quantity == info.quantity - 2
@@ -0,0 +1,214 @@
+import copy
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from backend import catalog_cache
+from backend.catalog_cache import (
+    bump_catalog_version,
+    cache_stats,
+    catalog_version,
+    flush_stats,
+)
+from backend.importer import import_price_list
+from backend.models import ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+# Кэш в памяти другого процесса, например обработчика импорта
+WORKER_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "worker",
+    }
+}
+
+
+def prices(response):
+    return {row["model"]: row["price_rrc"] for row in response.data["results"]}
+
+
+@pytest.mark.django_db
+def test_repeated_request_is_served_from_cache(client, catalog):
+    first = client.get("/api/v1/products/", {"ordering": "price_rrc"})
+    assert first["X-Cache"] == "MISS"
+
+    with CaptureQueriesContext(connection) as queries:
+        second = client.get("/api/v1/products/", {"ordering": "price_rrc"})
+
+    assert second["X-Cache"] == "HIT"
+    # Только версия каталога
+    assert len(queries) == 1
+    assert second.data == first.data
+    assert cache_stats()["hits"] == 1
+    assert cache_stats()["misses"] == 1
+
+
+@pytest.mark.django_db
+def test_query_parameters_are_normalized(client, catalog):
+    client.get(
+        "/api/v1/products/?ordering=model"
+        "&param[Цвет]=белый&param[Цвет]=черный"
+    )
+
+    response = client.get(
+        "/api/v1/products/?param[Цвет]=черный"
+        "&param[Цвет]=белый&ordering=model"
+    )
+    assert response["X-Cache"] == "HIT"
+
+    response = client.get("/api/v1/products/?ordering=-model")
+    assert response["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db
+def test_import_invalidates_cache(
+    client, catalog, price_list, django_capture_on_commit_callbacks
+):
+    response = client.get("/api/v1/products/")
+    assert prices(response)["dell/xps-13-9310"] == 125000
+
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] = 99990
+    with django_capture_on_commit_callbacks(execute=True):
+        import_price_list(changed, None)
+
+    response = client.get("/api/v1/products/")
+    assert response["X-Cache"] == "MISS"
+    assert prices(response)["dell/xps-13-9310"] == 99990
+
+
+@pytest.mark.django_db
+def test_import_in_other_process_invalidates_cache(
+    client, catalog, price_list, django_capture_on_commit_callbacks
+):
+    """
+    Проверяет, что импорт в процессе со своим кэшем в памяти (обработчик
+    импорта) сбрасывает кэш процесса сервера.
+    """
+    client.get("/api/v1/products/")
+
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] = 99990
+    with override_settings(CACHES=WORKER_CACHES):
+        with django_capture_on_commit_callbacks(execute=True):
+            import_price_list(changed, None)
+
+    response = client.get("/api/v1/products/")
+    assert response["X-Cache"] == "MISS"
+    assert prices(response)["dell/xps-13-9310"] == 99990
+
+
+@pytest.mark.django_db
+def test_order_confirmation_invalidates_cache(
+    client, catalog, monkeypatch, django_capture_on_commit_callbacks
+):
+    monkeypatch.setattr(
+        "backend.views.send_confirmed_order", lambda *args: None
+    )
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    contact = Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    info = ProductInfo.objects.get(model="sony/playstation-5")
+    order = Order.objects.create(user=user, contact=contact)
+    OrderItem.objects.create(
+        order=order, product=info.product, shop=info.shop, quantity=2
+    )
+    client.force_authenticate(user)
+    client.get("/api/v1/products/")
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(f"/api/v1/confirm/{order.id}/", {"status": "confirm"})
+
+    response = client.get("/api/v1/products/")
+    assert response["X-Cache"] == "MISS"
+    row = next(
+        row
+        for row in response.data["results"]
+        if row["model"] == "sony/playstation-5"
+    )
+    assert row["quantity"] == info.quantity - 2
+
+
+@pytest.mark.django_db
+def test_cache_can_be_disabled(client, catalog, settings):
+    settings.CATALOG_CACHE_TIMEOUT = 0
+
+    client.get("/api/v1/products/")
+    response = client.get("/api/v1/products/")
+
+    assert "X-Cache" not in response
+    assert cache_stats()["hits"] == 0
+
+
+@pytest.mark.django_db
+def test_cache_stats_command(client, catalog):
+    client.get("/api/v1/products/")
+    client.get("/api/v1/products/")
+    client.get("/api/v1/products/")
+    out = StringIO()
+
+    call_command("catalog_cache_stats", stdout=out)
+
+    assert out.getvalue().startswith(
+        "Catalog cache: 2 hits, 1 misses (66.7% hit rate), version "
+    )
+
+
+@pytest.mark.django_db
+def test_cache_stats_are_shared_between_processes(
+    client, catalog, settings, monkeypatch
+):
+    settings.CATALOG_CACHE_STATS_INTERVAL = 0
+    client.get("/api/v1/products/")
+    client.get("/api/v1/products/")
+
+    # Команда в отдельном процессе видит только записанные счётчики
+    monkeypatch.setattr(catalog_cache, "_pending", {"hits": 0, "misses": 0})
+    with override_settings(CACHES=WORKER_CACHES):
+        stats = cache_stats()
+
+    assert (stats["hits"], stats["misses"]) == (1, 1)
+
+
+@pytest.mark.django_db
+def test_version_is_bumped_after_commit(
+    catalog, django_capture_on_commit_callbacks
+):
+    """
+    Проверяет, что версия не меняется и строка версии не блокируется
+    в транзакции вызывающего кода.
+    """
+    version = catalog_version()
+
+    with django_capture_on_commit_callbacks() as callbacks:
+        with CaptureQueriesContext(connection) as queries:
+            bump_catalog_version()
+        assert len(queries) == 0
+        assert catalog_version() == version
+
+    for callback in callbacks:
+        callback()
+    assert catalog_version() == version + 1
+
+
+@pytest.mark.django_db
+def test_stats_are_not_stored_with_version(catalog):
+    """
+    Проверяет, что запись счётчиков не обращается к строке версии.
+    """
+    catalog_cache._pending["hits"] = 1
+
+    with CaptureQueriesContext(connection) as queries:
+        flush_stats()
+
+    assert queries
+    assert all("backend_catalogstate" not in q["sql"] for q in queries)
+    assert cache_stats()["hits"] == 1
@@ -0,0 +1,178 @@
+import copy
+
+import pytest
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+
+from backend.importer import import_price_list
+from backend.models import ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+# Кэш процесса обработчика импорта, отдельный от кэша сервера
+WORKER_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "worker",
+    }
+}
+
+
+@pytest.fixture
+def buyer(client):
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    client.force_authenticate(user)
+    return user
+
+
+@pytest.fixture
+def order(catalog, buyer):
+    """
+    Заказ покупателя с одной позицией.
+    """
+    contact = Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=buyer
+    )
+    order = Order.objects.create(user=buyer, contact=contact)
+    info = ProductInfo.objects.get(model="sony/playstation-5")
+    OrderItem.objects.create(
+        order=order, product=info.product, shop=info.shop, quantity=1
+    )
+    return order
+
+
+def poll(client, url, etag):
+    """
+    Повторяет запрос с If-None-Match и возвращает ответ и число
+    запросов к базе.
+    """
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    return response, len(queries)
+
+
+@pytest.mark.django_db
+def test_unchanged_catalog_is_not_modified(
+    client, catalog, price_list, django_capture_on_commit_callbacks
+):
+    url = "/api/v1/products/?ordering=price_rrc"
+    etag = client.get(url)["ETag"]
+
+    response, queries = poll(client, url, etag)
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    # Только версия каталога
+    assert queries == 1
+
+    assert client.get(url, HTTP_IF_NONE_MATCH='"other"').status_code == 200
+    assert client.get("/api/v1/products/?ordering=model")["ETag"] != etag
+
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] = 99990
+    with django_capture_on_commit_callbacks(execute=True):
+        import_price_list(changed, None)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_import_in_other_process_changes_etag(
+    client, catalog, price_list, django_capture_on_commit_callbacks
+):
+    url = "/api/v1/products/"
+    etag = client.get(url)["ETag"]
+
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] = 99990
+    with override_settings(CACHES=WORKER_CACHES):
+        with django_capture_on_commit_callbacks(execute=True):
+            import_price_list(changed, None)
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+
+@pytest.mark.django_db
+def test_unchanged_orders_are_not_modified(client, order):
+    etag = client.get("/api/v1/orders/")["ETag"]
+
+    response, queries = poll(client, "/api/v1/orders/", etag)
+    assert response.status_code == 304
+    assert queries == 1
+
+    info = ProductInfo.objects.get(model="apple/watch-series-7")
+    OrderItem.objects.create(
+        order=order, product=info.product, shop=info.shop, quantity=1
+    )
+    response = client.get("/api/v1/orders/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response["ETag"] != etag
+
+    etag = response["ETag"]
+    order.delete()
+    response = client.get("/api/v1/orders/", HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["results"] == []
+
+
+@pytest.mark.django_db
+def test_unchanged_order_is_not_modified(client, order, monkeypatch):
+    monkeypatch.setattr(
+        "backend.views.send_confirmed_order", lambda *args: None
+    )
+    url = f"/api/v1/order/{order.id}/"
+    etag = client.get(url)["ETag"]
+
+    response, queries = poll(client, url, etag)
+    assert response.status_code == 304
+    assert queries == 1
+
+    client.patch(f"/api/v1/confirm/{order.id}/", {"status": "confirm"})
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["status"] == "confirmed"
+
+    etag = response["ETag"]
+    OrderItem.objects.get(order=order).delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200
+    assert response.data["orderitem_set"] == []
+
+
+@pytest.mark.django_db
+def test_deleted_lines_change_etag(client, order):
+    url = f"/api/v1/order/{order.id}/"
+    order_etag = client.get(url)["ETag"]
+    list_etag = client.get("/api/v1/orders/")["ETag"]
+
+    # Удаление запросом обходит OrderItem.delete
+    OrderItem.objects.filter(order=order).delete()
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=order_etag)
+    assert response.status_code == 200
+    assert response.data["orderitem_set"] == []
+    response = client.get("/api/v1/orders/", HTTP_IF_NONE_MATCH=list_etag)
+    assert response.status_code == 200
+
+
+@pytest.mark.django_db
+def test_other_users_order_gets_no_etag(client, order):
+    etag = client.get(f"/api/v1/order/{order.id}/")["ETag"]
+    other = CustomUser.objects.create_user(
+        email="other@mail.ru", password="password", is_active=True
+    )
+    client.force_authenticate(other)
+
+    response = client.get(
+        f"/api/v1/order/{order.id}/", HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert response.status_code == 403
+    assert "ETag" not in response
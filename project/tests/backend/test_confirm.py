@@ -0,0 +1,146 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from backend.models import ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+@pytest.fixture(autouse=True)
+def outbox(monkeypatch):
+    """
+    Подменяет отправку писем о подтверждении заказа.
+    """
+    sent = []
+    monkeypatch.setattr(
+        "backend.views.send_confirmed_order",
+        lambda summary, recipient: sent.append(summary["order_id"]),
+    )
+    return sent
+
+
+@pytest.fixture
+def buyer(catalog):
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    return user
+
+
+def make_order(user, *lines):
+    """
+    Создаёт корзину со строками (позиция магазина, количество).
+    """
+    order = Order.objects.create(user=user, contact=user.contacts.first())
+    for offer, quantity in lines:
+        OrderItem.objects.create(
+            order=order,
+            product=offer.product,
+            shop=offer.shop,
+            quantity=quantity,
+        )
+    return order
+
+
+def confirm(user, order):
+    client = APIClient()
+    client.force_authenticate(user)
+    return client.put(
+        f"/api/v1/confirm/{order.id}/", {"status": "confirm"}
+    ).status_code
+
+
+def confirm_all(user, orders):
+    """
+    Подтверждает заказы параллельно, одновременно запуская потоки.
+    """
+    barrier = threading.Barrier(len(orders))
+
+    def run(order):
+        barrier.wait()
+        try:
+            return confirm(user, order)
+        finally:
+            # У каждого потока своё соединение с базой
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(orders)) as pool:
+        return list(pool.map(run, orders))
+
+
+def stock(offer):
+    return ProductInfo.objects.values_list("quantity", flat=True).get(
+        pk=offer.pk
+    )
+
+
+@pytest.mark.django_db
+def test_confirm_decrements_stock(buyer, outbox):
+    first, second = ProductInfo.objects.order_by("id")[:2]
+    order = make_order(buyer, (first, 2), (second, 1))
+
+    assert confirm(buyer, order) == 200
+
+    assert stock(first) == first.quantity - 2
+    assert stock(second) == second.quantity - 1
+    assert Order.objects.get(pk=order.pk).status == "confirmed"
+    assert outbox == [order.id]
+
+
+@pytest.mark.django_db
+def test_short_line_fails_whole_order(buyer, outbox):
+    first, second = ProductInfo.objects.order_by("id")[:2]
+    order = make_order(buyer, (first, 1), (second, 1))
+    ProductInfo.objects.filter(pk=second.pk).update(quantity=0)
+
+    assert confirm(buyer, order) == 403
+
+    assert stock(first) == first.quantity
+    assert Order.objects.get(pk=order.pk).status == "new"
+    assert outbox == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_confirmations_of_hot_sku(buyer, outbox):
+    """
+    Проверяет, что из параллельных подтверждений заказов одного товара
+    проходят ровно столько, на сколько хватает остатка.
+    """
+    hot = ProductInfo.objects.order_by("id").first()
+    ProductInfo.objects.filter(pk=hot.pk).update(quantity=5)
+    orders = [make_order(buyer, (hot, 1)) for _ in range(16)]
+
+    codes = confirm_all(buyer, orders)
+
+    assert sorted(codes) == [200] * 5 + [403] * 11
+    assert stock(hot) == 0
+    assert Order.objects.filter(status="confirmed").count() == 5
+    assert len(outbox) == 5
+
+
+@pytest.mark.django_db(transaction=True)
+def test_opposite_line_order_does_not_deadlock(buyer):
+    """
+    Проверяет, что заказы с общими товарами в разном порядке строк
+    подтверждаются без взаимной блокировки.
+    """
+    first, second = ProductInfo.objects.order_by("id")[:2]
+    ProductInfo.objects.filter(pk__in=[first.pk, second.pk]).update(
+        quantity=100
+    )
+    orders = [
+        make_order(buyer, *lines)
+        for _ in range(4)
+        for lines in (((first, 1), (second, 1)), ((second, 1), (first, 1)))
+    ]
+
+    codes = confirm_all(buyer, orders)
+
+    assert codes == [200] * len(orders)
+    assert stock(first) == stock(second) == 100 - len(orders)
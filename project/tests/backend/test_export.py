@@ -0,0 +1,113 @@
+import copy
+import csv
+import io
+import json
+
+import pytest
+
+from backend.export import EXPORT_FIELDS
+from backend.importer import import_price_list
+from backend.models import Category, ProductInfo, Shop
+
+
+@pytest.fixture
+def catalog(price_list):
+    """
+    Импортирует shop1.yaml от имени двух магазинов.
+    """
+    import_price_list(copy.deepcopy(price_list), None)
+    other = copy.deepcopy(price_list)
+    other["shop"] = "Эльдорадо"
+    import_price_list(other, None)
+
+
+def expected_rows(infos):
+    return [
+        {
+            "id": info.id,
+            "shop_id": info.shop_id,
+            "shop_name": info.shop.name,
+            "product_id": info.product_id,
+            "product_name": info.product.name,
+            "category_id": info.product.category_id,
+            "category_name": info.product.category.name,
+            "model": info.model,
+            "quantity": info.quantity,
+            "price_rrc": info.price_rrc,
+        }
+        for info in infos.order_by("id")
+    ]
+
+
+def export(client, fmt, **params):
+    response = client.get(f"/api/v1/products/export.{fmt}", params)
+    assert response.status_code == 200
+    assert response.streaming
+    return b"".join(response.streaming_content).decode()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("chunk_size", [2, 2000])
+def test_export_jsonl(client, catalog, settings, chunk_size):
+    settings.CATALOG_EXPORT_CHUNK_SIZE = chunk_size
+
+    body = export(client, "jsonl")
+
+    assert body.endswith("\n")
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert rows == expected_rows(ProductInfo.objects.all())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("chunk_size", [2, 2000])
+def test_export_csv(client, catalog, settings, chunk_size):
+    settings.CATALOG_EXPORT_CHUNK_SIZE = chunk_size
+
+    reader = csv.DictReader(io.StringIO(export(client, "csv")))
+
+    assert tuple(reader.fieldnames) == EXPORT_FIELDS
+    assert list(reader) == [
+        {name: str(value) for name, value in row.items()}
+        for row in expected_rows(ProductInfo.objects.all())
+    ]
+
+
+@pytest.mark.django_db
+def test_export_filters(client, catalog):
+    shop = Shop.objects.get(name="Эльдорадо")
+    categories = list(
+        Category.objects.filter(
+            name__in=["Ноутбуки", "Смарт-часы"]
+        ).values_list("id", flat=True)
+    )
+
+    body = export(client, "jsonl", shop=shop.id, category=categories)
+
+    rows = [json.loads(line) for line in body.splitlines()]
+    assert rows == expected_rows(
+        ProductInfo.objects.filter(
+            shop=shop, product__category_id__in=categories
+        )
+    )
+    assert {row["category_name"] for row in rows} == {
+        "Ноутбуки",
+        "Смарт-часы",
+    }
+
+
+@pytest.mark.django_db
+def test_empty_csv_export_has_header(client, catalog):
+    body = export(client, "csv", shop=0)
+
+    assert body.splitlines() == [",".join(EXPORT_FIELDS)]
+
+
+@pytest.mark.django_db
+def test_invalid_export_is_rejected(client, catalog):
+    response = client.get("/api/v1/products/export.xml")
+    assert response.status_code == 400
+    assert response.json() == {"Error": "Unknown export format: xml"}
+
+    response = client.get("/api/v1/products/export.csv", {"shop": "first"})
+    assert response.status_code == 400
+    assert response.json() == {"Error": "shop must be an integer"}
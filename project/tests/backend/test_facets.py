@@ -0,0 +1,321 @@
+import copy
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.facets import refresh_shop_facets
+from backend.importer import import_price_list
+from backend.models import Category, ParameterFacet, ProductParameter
+from backend.parameters import (
+    backfill_typed_values,
+    parse_flag,
+    parse_number,
+)
+
+
+def models(client, **params):
+    response = client.get("/api/v1/products/", {"ordering": "id", **params})
+    assert response.status_code == 200
+    return [row["model"] for row in response.data["results"]]
+
+
+def values(facet):
+    return {row["value"]: row["count"] for row in facet["values"]}
+
+
+@pytest.mark.django_db
+def test_listing_returns_facets(client, catalog):
+    facets = client.get("/api/v1/products/").data["facets"]
+
+    assert values(facets["Цвет"]) == {
+        "черный": 3,
+        "серебристый": 3,
+        "белый": 1,
+    }
+    assert "min" not in facets["Цвет"]
+    assert facets["Диагональ_дюймы"]["min"] == 1.4
+    assert facets["Диагональ_дюймы"]["max"] == 13.4
+
+
+@pytest.mark.django_db
+def test_facets_are_sent_with_first_page_only(client, catalog):
+    response = client.get("/api/v1/products/", {"page_size": 2})
+    assert "facets" in response.data
+
+    response = client.get(response.data["next"])
+    assert "facets" not in response.data
+
+
+@pytest.mark.django_db
+def test_facet_values_are_limited(client, catalog, settings):
+    settings.CATALOG_FACET_VALUES = 2
+
+    facets = client.get("/api/v1/products/").data["facets"]
+
+    assert [row["value"] for row in facets["Цвет"]["values"]] == [
+        "серебристый",
+        "черный",
+    ]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefetch", [0, 100])
+def test_filter_by_parameter_value(client, catalog, settings, prefetch):
+    settings.CATALOG_PARAMETER_PREFETCH = prefetch
+
+    assert models(client, **{"param[Цвет]": "белый"}) == ["sony/playstation-5"]
+
+    response = client.get(
+        "/api/v1/products/?ordering=id"
+        "&param[Цвет]=белый&param[Цвет]=серебристый"
+    )
+    assert {row["model"] for row in response.data["results"]} == {
+        "dell/xps-13-9310",
+        "sony/playstation-5",
+        "sony/wh-1000xm4",
+        "samsung/galaxy-watch-4",
+    }
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefetch", [0, 100])
+def test_filter_by_numeric_range(client, catalog, settings, prefetch):
+    """
+    Проверяет диапазон числового параметра и сочетание условий
+    по разным параметрам.
+    """
+    settings.CATALOG_PARAMETER_PREFETCH = prefetch
+
+    assert models(client, **{"param[Диагональ_дюймы][gte]": "1.5"}) == [
+        "dell/xps-13-9310",
+        "apple/watch-series-7",
+    ]
+    assert models(
+        client,
+        **{
+            "param[Диагональ_дюймы][gt]": "1",
+            "param[Диагональ_дюймы][lt]": "10",
+            "param[Цвет]": "серебристый",
+        },
+    ) == ["samsung/galaxy-watch-4"]
+
+
+@pytest.mark.django_db
+def test_invalid_parameter_filter_is_rejected(client, catalog):
+    response = client.get(
+        "/api/v1/products/", {"param[Диагональ_дюймы][gte]": "большая"}
+    )
+    assert response.status_code == 400
+    assert response.data == {
+        "Error": "param[Диагональ_дюймы][gte] must be a number"
+    }
+
+    response = client.get(
+        "/api/v1/products/", {"param[Диагональ_дюймы][between]": "1"}
+    )
+    assert response.status_code == 400
+    assert response.data == {"Error": "Unknown parameter lookup: between"}
+
+
+@pytest.mark.django_db
+def test_import_refreshes_facets_of_imported_shop(
+    client, catalog, price_list, django_capture_on_commit_callbacks
+):
+    """
+    Проверяет, что импорт пересчитывает фасеты только своего магазина.
+    """
+    other = copy.deepcopy(price_list)
+    other["shop"] = "Эльдорадо"
+    with django_capture_on_commit_callbacks(execute=True):
+        import_price_list(other, None)
+    facets = client.get("/api/v1/products/").data["facets"]
+    assert values(facets["Цвет"])["белый"] == 2
+
+    other["goods"][1]["parameters"]["Цвет"] = "черный"
+    with django_capture_on_commit_callbacks(execute=True):
+        import_price_list(other, None)
+    facets = client.get("/api/v1/products/").data["facets"]
+    assert values(facets["Цвет"]) == {
+        "черный": 7,
+        "серебристый": 6,
+        "белый": 1,
+    }
+    assert (
+        ParameterFacet.objects.get(
+            shop__name="МВидео", parameter__name="Цвет", value="белый"
+        ).count
+        == 1
+    )
+
+
+def facet_rows(shop_id):
+    return sorted(
+        ParameterFacet.objects.filter(shop_id=shop_id).values_list(
+            "category_id", "parameter_id", "value", "number", "flag", "count"
+        ),
+        key=repr,
+    )
+
+
+@pytest.mark.django_db
+def test_import_updates_facets_like_full_refresh(catalog, price_list):
+    """
+    Проверяет, что счётчики, изменённые импортом на разницу, совпадают
+    с полным пересчётом фасетов магазина.
+    """
+    changed = copy.deepcopy(price_list)
+    goods = changed["goods"]
+    goods[0]["parameters"]["Цвет"] = "черный"
+    goods[1]["category"] = 303
+    del goods[2]["parameters"]["Цвет"]
+    goods[3]["price_rrc"] += 100
+    added = copy.deepcopy(goods.pop(4))
+    added.update(id=5009999, model="new/model")
+    added["parameters"]["Цвет"] = "зеленый"
+    goods.append(added)
+
+    result = import_price_list(changed, None)
+
+    assert (result.created, result.updated, result.deleted) == (1, 4, 1)
+    imported = facet_rows(result.shop_id)
+    refresh_shop_facets(result.shop_id)
+    assert imported == facet_rows(result.shop_id)
+
+
+@pytest.mark.django_db
+def test_price_change_keeps_facets(catalog, price_list):
+    """
+    Проверяет, что импорт без изменений параметров не трогает фасеты.
+    """
+    changed = copy.deepcopy(price_list)
+    changed["goods"][0]["price_rrc"] += 100
+
+    with CaptureQueriesContext(connection) as queries:
+        result = import_price_list(changed, None)
+
+    assert result.updated == 1
+    assert all("backend_parameterfacet" not in q["sql"] for q in queries)
+
+
+@pytest.mark.django_db
+def test_facets_follow_shop_and_category(client, catalog, price_list):
+    other = copy.deepcopy(price_list)
+    other["shop"] = "Эльдорадо"
+    other["goods"] = other["goods"][:3]
+    shop_id = import_price_list(other, None).shop_id
+
+    response = client.get("/api/v1/products/", {"shop": shop_id})
+    assert len(response.data["results"]) == 3
+    assert values(response.data["facets"]["Цвет"]) == {
+        "серебристый": 1,
+        "белый": 1,
+        "черный": 1,
+    }
+
+    category_id = Category.objects.get(external_id=301).id
+    response = client.get(
+        "/api/v1/products/", {"shop": shop_id, "category": category_id}
+    )
+    assert len(response.data["results"]) == 2
+    assert values(response.data["facets"]["Цвет"]) == {
+        "белый": 1,
+        "черный": 1,
+    }
+    assert "Диагональ_дюймы" not in response.data["facets"]
+
+    response = client.get("/api/v1/products/", {"shop": "x"})
+    assert response.status_code == 400
+    assert response.data == {"Error": "shop must be an integer"}
+
+
+@pytest.mark.django_db
+def test_import_fills_typed_values(catalog):
+    assert ProductParameter.objects.get(
+        parameter__name="Диагональ_дюймы",
+        product_info__model="dell/xps-13-9310",
+    ).number == pytest.approx(13.4)
+    assert set(
+        ProductParameter.objects.filter(
+            parameter__name="Поддержка_4K"
+        ).values_list("value", "flag")
+    ) == {("True", True)}
+    assert not ProductParameter.objects.filter(
+        parameter__name="Цвет", number__isnull=False
+    ).exists()
+    assert not ProductParameter.objects.filter(
+        parameter__name="Цвет", flag__isnull=False
+    ).exists()
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("prefetch", [0, 100])
+def test_filter_by_typed_value(client, catalog, settings, prefetch):
+    """
+    Проверяет, что числа и логические значения сравниваются по значению,
+    а не по записи.
+    """
+    settings.CATALOG_PARAMETER_PREFETCH = prefetch
+
+    assert models(client, **{"param[Оперативная_память_Гб]": "16.0"}) == [
+        "dell/xps-13-9310"
+    ]
+    assert len(models(client, **{"param[Поддержка_4K]": "да"})) == 2
+    assert models(client, **{"param[Поддержка_4K]": "нет"}) == []
+
+
+@pytest.mark.django_db
+def test_backfill_typed_values(catalog):
+    ProductParameter.objects.update(number=None, flag=None)
+
+    call_command("backfill_parameter_values", stdout=StringIO())
+
+    for parameter in ProductParameter.objects.all():
+        assert parameter.number == parse_number(parameter.value)
+        assert parameter.flag == parse_flag(parameter.value)
+    assert ProductParameter.objects.filter(number__isnull=False).exists()
+    assert ProductParameter.objects.filter(flag=True).exists()
+
+
+@pytest.mark.django_db
+def test_backfill_agrees_with_import(price_list):
+    """
+    Проверяет, что база и импорт разбирают одни и те же значения
+    одинаково, в том числе с переводом строки в конце и в верхнем
+    регистре кириллицы.
+    """
+    values = [
+        "16",
+        "-3",
+        "1,5",
+        "12\n",
+        "1.",
+        " 5",
+        "ДА",
+        "Нет",
+        "нЕт",
+        "да\n",
+        "TRUE",
+        "No",
+    ]
+    data = copy.deepcopy(price_list)
+    data["goods"] = data["goods"][:1]
+    data["goods"][0]["parameters"] = {
+        f"Параметр_{i}": value for i, value in enumerate(values)
+    }
+    import_price_list(data, None)
+    imported = set(
+        ProductParameter.objects.values_list("value", "number", "flag")
+    )
+
+    ProductParameter.objects.update(number=None, flag=None)
+    backfill_typed_values()
+
+    assert (
+        set(ProductParameter.objects.values_list("value", "number", "flag"))
+        == imported
+    )
+    assert ("ДА", None, True) in imported
+    assert ("12\n", None, None) in imported
@@ -0,0 +1,96 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from backend.models import CatalogEntry, ProductInfo, Order, OrderItem
+from backend.serializers import (
+    CatalogEntrySerializer,
+    ListItemsSerializer,
+    ListOrderSerializer,
+    ORDER_TOTALS,
+)
+from users.models import CustomUser, Contact
+
+
+@pytest.fixture
+def buyer(client, catalog):
+    """
+    Покупатель с подтверждённым, пустым и корзиной-заказом.
+    """
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    contact = Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    infos = list(ProductInfo.objects.order_by("id"))
+    for status, items in (("confirmed", infos[:3]), ("canceled", [])):
+        order = Order.objects.create(user=user, contact=contact, status=status)
+        for quantity, info in enumerate(items, start=1):
+            OrderItem.objects.create(
+                order=order,
+                product=info.product,
+                shop=info.shop,
+                quantity=quantity,
+            )
+    basket = Order.objects.create(user=user, contact=contact)
+    for info in infos[3:6]:
+        OrderItem.objects.create(
+            order=basket, product=info.product, shop=info.shop, quantity=2
+        )
+    # Заказы разных дней, чтобы порядок по дате был однозначным
+    for days, order in enumerate(Order.objects.order_by("-id")):
+        Order.objects.filter(pk=order.pk).update(
+            dt=timezone.now() - timedelta(days=days, hours=22)
+        )
+    client.force_authenticate(user)
+    return user
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params, ordering",
+    [
+        ({}, ["-model", "-product_info_id"]),
+        ({"ordering": "price_rrc"}, ["price_rrc", "product_info_id"]),
+        ({"ordering": "-shop__name"}, ["-shop_name", "-product_info_id"]),
+    ],
+)
+def test_products_match_serializer(client, catalog, params, ordering):
+    response = client.get("/api/v1/products/", {"page_size": 4, **params})
+
+    expected = CatalogEntrySerializer(
+        CatalogEntry.objects.order_by(*ordering)[:4], many=True
+    ).data
+    assert render(response.data["results"]) == render(expected)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("time_zone", ["UTC", "Asia/Vladivostok"])
+def test_orders_match_serializer(client, buyer, settings, time_zone):
+    settings.TIME_ZONE = time_zone
+
+    response = client.get("/api/v1/orders/")
+
+    orders = Order.objects.filter(user=buyer).annotate(**ORDER_TOTALS)
+    assert len(response.data["results"]) == 3
+    assert render(response.data["results"]) == render(
+        ListOrderSerializer(orders.order_by("-dt", "-id"), many=True).data
+    )
+
+
+@pytest.mark.django_db
+def test_basket_matches_serializer(client, buyer):
+    response = client.get("/api/v1/basket")
+
+    items = OrderItem.objects.filter(order__user=buyer, order__status="new")
+    assert len(response.data) == 3
+    assert render(response.data) == render(
+        ListItemsSerializer(items, many=True).data
+    )
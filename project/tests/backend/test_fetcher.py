@@ -0,0 +1,85 @@
+from tempfile import TemporaryFile
+
+import pytest
+
+from backend.fetcher import (
+    fetch_price_list,
+    remember_source,
+    get_session,
+    FetchError,
+)
+
+
+BODY = b"shop: test\ncategories: []\ngoods: []\n"
+
+
+@pytest.mark.django_db
+def test_fetch_streams_body_to_file(user, price_list_server):
+    """
+    Проверяет загрузку прайс-листа в файл и сохранение его отпечатка.
+    """
+    price_list_server.files["/shop.yaml"] = BODY
+
+    with TemporaryFile() as f:
+        fetched = fetch_price_list(
+            price_list_server.url("/shop.yaml"), f, user
+        )
+        assert f.read() == BODY
+
+    assert not fetched.not_modified
+    assert fetched.size == len(BODY)
+    assert fetched.etag
+    assert fetched.fingerprint
+
+
+@pytest.mark.django_db
+def test_conditional_request_returns_not_modified(user, price_list_server):
+    """
+    Проверяет, что после успешного импорта повторная загрузка отправляет
+    If-None-Match и завершается ответом 304 без тела.
+    """
+    price_list_server.files["/shop.yaml"] = BODY
+    url = price_list_server.url("/shop.yaml")
+    with TemporaryFile() as f:
+        remember_source(fetch_price_list(url, f, user), user, None)
+
+    with TemporaryFile() as f:
+        fetched = fetch_price_list(url, f, user)
+        assert f.read() == b""
+
+    _, headers = price_list_server.requests[-1]
+    assert fetched.not_modified
+    assert headers["If-None-Match"] == fetched.etag
+
+    price_list_server.files["/shop.yaml"] = BODY + b"# changed\n"
+    with TemporaryFile() as f:
+        assert not fetch_price_list(url, f, user).not_modified
+
+
+@pytest.mark.django_db
+def test_fetch_rejects_oversized_body(user, price_list_server):
+    """
+    Проверяет ограничение размера загружаемого файла.
+    """
+    price_list_server.files["/big.yaml"] = b"x" * 1024
+
+    with TemporaryFile() as f, pytest.raises(FetchError):
+        fetch_price_list(
+            price_list_server.url("/big.yaml"), f, user, max_size=100
+        )
+
+
+@pytest.mark.django_db
+def test_fetch_reports_http_errors(user, price_list_server):
+    """
+    Проверяет, что неуспешный ответ сервера превращается в FetchError.
+    """
+    with TemporaryFile() as f, pytest.raises(FetchError):
+        fetch_price_list(price_list_server.url("/missing.yaml"), f, user)
+
+
+def test_session_is_shared():
+    """
+    Проверяет, что загрузки используют одну сессию с пулом соединений.
+    """
+    assert get_session() is get_session()
@@ -0,0 +1,33 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from backend.models import Shop, ProductInfo
+
+from .conftest import SHOP_YAML
+
+
+@pytest.mark.django_db(transaction=True)
+def test_import_pricelists_in_parallel(tmp_path):
+    """
+    Проверяет импорт нескольких магазинов из локальных файлов
+    в параллельных процессах.
+    """
+    content = SHOP_YAML.read_text(encoding="utf-8")
+    paths = []
+    for name in ("Магазин 1", "Магазин 2"):
+        path = tmp_path / f"{name}.yaml"
+        path.write_text(
+            content.replace("shop: МВидео", f"shop: {name}"), encoding="utf-8"
+        )
+        paths.append(str(path))
+
+    out = StringIO()
+    call_command("import_pricelists", *paths, "--workers", "2", stdout=out)
+
+    goods = ProductInfo.objects.filter(shop__name="Магазин 1").count()
+    assert goods > 0
+    assert ProductInfo.objects.filter(shop__name="Магазин 2").count() == goods
+    assert set(Shop.objects.values_list("user", flat=True)) == {None}
+    assert f"Total: 2 files, 2 shops, {goods * 2} goods" in out.getvalue()
@@ -0,0 +1,347 @@
+import copy
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from backend.catalog_cache import catalog_version
+from backend.importer import import_price_list, PriceListError
+from backend.models import (
+    CatalogEntry,
+    Shop,
+    Category,
+    Product,
+    ProductInfo,
+    Parameter,
+    ProductParameter,
+    ImportStage,
+    ImportStageItem,
+)
+
+
+def make_goods(count):
+    """
+    Генерирует count товаров одной категории.
+    """
+    return [
+        {
+            "id": 1000 + i,
+            "category": 1,
+            "model": f"model-{i}",
+            "name": f"Товар {i}",
+            "price": 100 + i,
+            "price_rrc": 110 + i,
+            "quantity": 5,
+            "parameters": {"Цвет": "белый", "Вес": i},
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_import_shop_yaml(user, price_list):
+    """
+    Проверяет, что импорт shop1.yaml создаёт магазин, категории, товары,
+    позиции и параметры.
+    """
+    result = import_price_list(price_list, user)
+
+    shop = Shop.objects.get(name="МВидео")
+    assert result.created == len(price_list["goods"])
+    assert Product.objects.count() == len(price_list["goods"])
+    assert shop.categories.count() == len(price_list["categories"])
+    assert ProductInfo.objects.filter(shop=shop).count() == len(
+        price_list["goods"]
+    )
+    assert (
+        ProductParameter.objects.filter(
+            product_info__external_id=5001001, parameter__name="Цвет"
+        )
+        .get()
+        .value
+        == "серебристый"
+    )
+
+
+@pytest.mark.django_db
+def test_reimport_updates_changed_goods(user, price_list):
+    """
+    Проверяет, что при повторном импорте изменившиеся позиции и параметры
+    обновляются, а остальные пропускаются.
+    """
+    import_price_list(price_list, user)
+    item = price_list["goods"][0]
+    item["price_rrc"] += 1
+    item["parameters"]["Цвет"] = "черный"
+
+    result = import_price_list(price_list, user)
+
+    info = ProductInfo.objects.get(external_id=item["id"])
+    assert result.created == 0
+    assert result.updated == 1
+    assert result.skipped == len(price_list["goods"]) - 1
+    assert info.price_rrc == item["price_rrc"]
+    assert info.product_parameters.get(parameter__name="Цвет").value == (
+        "черный"
+    )
+    assert Product.objects.count() == len(price_list["goods"])
+
+
+@pytest.mark.django_db
+def test_import_query_count_does_not_depend_on_size(user):
+    """
+    Проверяет, что число запросов определяется числом пачек,
+    а не числом товаров.
+    """
+    categories = [{"id": 1, "name": "Категория"}]
+    # Строка версии каталога создаётся при первом обращении
+    catalog_version()
+
+    def count_queries(goods):
+        with CaptureQueriesContext(connection) as queries:
+            import_price_list(
+                {"shop": "Магазин", "categories": categories, "goods": goods},
+                user,
+                batch_size=1000,
+            )
+        return len(queries)
+
+    small = count_queries(make_goods(10))
+    Shop.objects.all().delete()
+    Category.objects.all().delete()
+    Parameter.objects.all().delete()
+    large = count_queries(make_goods(500))
+
+    assert small == large
+
+
+@pytest.mark.django_db
+def test_unknown_category_rolls_back(user, price_list):
+    """
+    Проверяет, что ссылка на неизвестную категорию откатывает перенос
+    в каталог и удаляет промежуточные записи.
+    """
+    price_list["goods"][-1]["category"] = 999
+
+    with pytest.raises(PriceListError):
+        import_price_list(price_list, user, chunk_size=2)
+
+    assert not ProductInfo.objects.exists()
+    assert not ImportStage.objects.exists()
+    assert not ImportStageItem.objects.exists()
+
+
+@pytest.mark.django_db
+def test_reimport_removes_missing_goods_and_parameters(user, price_list):
+    """
+    Проверяет, что исчезнувшие из прайс-листа позиции и параметры
+    удаляются, а неизменённые позиции не перезаписываются.
+    """
+    import_price_list(price_list, user)
+    removed = price_list["goods"].pop()
+    item = price_list["goods"][0]
+    del item["parameters"]["Цвет"]
+
+    result = import_price_list(price_list, user)
+
+    assert result.deleted == 1
+    assert result.updated == 1
+    assert result.skipped == len(price_list["goods"]) - 1
+    assert not ProductInfo.objects.filter(external_id=removed["id"]).exists()
+    assert not ProductParameter.objects.filter(
+        product_info__external_id=item["id"], parameter__name="Цвет"
+    ).exists()
+
+
+@pytest.mark.django_db
+def test_renamed_category_updates_catalog(user, price_list):
+    """
+    Проверяет, что после переименования категории в прайс-листе
+    её товары переносятся в категорию с новым названием.
+    """
+    import_price_list(copy.deepcopy(price_list), user)
+    for category in price_list["categories"]:
+        if category["id"] == 300:
+            category["name"] = "Ультрабуки"
+    in_category = [
+        item for item in price_list["goods"] if item["category"] == 300
+    ]
+
+    result = import_price_list(price_list, user)
+
+    assert result.updated == len(in_category)
+    assert result.skipped == len(price_list["goods"]) - len(in_category)
+    entries = CatalogEntry.objects.filter(
+        model__in=[item["model"] for item in in_category]
+    )
+    assert set(entries.values_list("category_name", flat=True)) == {
+        "Ультрабуки"
+    }
+    assert not CatalogEntry.objects.filter(category_name="Ноутбуки").exists()
+    assert "Ноутбуки" not in Shop.objects.get().categories.values_list(
+        "name", flat=True
+    )
+
+
+@pytest.mark.django_db
+def test_unchanged_goods_are_not_written(user, price_list):
+    """
+    Проверяет, что повторный импорт того же прайс-листа не пишет
+    в каталог.
+    """
+    import_price_list(price_list, user)
+
+    with CaptureQueriesContext(connection) as queries:
+        result = import_price_list(price_list, user)
+
+    assert result.skipped == len(price_list["goods"])
+    assert not [
+        q
+        for q in queries
+        if q["sql"].startswith(("UPDATE", "DELETE"))
+        and "backend_importstage" not in q["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_same_fingerprint_skips_import(user, price_list):
+    """
+    Проверяет, что совпадение отпечатка документа с последним успешным
+    импортом пропускает импорт целиком.
+    """
+    import_price_list(price_list, user, fingerprint="abc")
+    price_list["goods"][0]["price_rrc"] += 1
+
+    result = import_price_list(price_list, user, fingerprint="abc")
+
+    assert result.unchanged
+    assert result.processed == 0
+    assert ProductInfo.objects.get(
+        external_id=price_list["goods"][0]["id"]
+    ).price_rrc == (price_list["goods"][0]["price_rrc"] - 1)
+
+
+def interrupted(goods, after):
+    """
+    Выдаёт товары и имитирует сбой после after товаров.
+    """
+    for i, item in enumerate(goods):
+        if i == after:
+            raise RuntimeError("Worker crashed")
+        yield item
+
+
+@pytest.mark.django_db(transaction=True)
+def test_interrupted_import_resumes_from_checkpoint(user):
+    """
+    Проверяет, что после сбоя каталог магазина не меняется, а повторный
+    импорт того же документа продолжается с последней записанной порции.
+    """
+    categories = [{"id": 1, "name": "Категория"}]
+    import_price_list(
+        {"shop": "Магазин", "categories": categories, "goods": make_goods(3)},
+        user,
+        fingerprint="old",
+    )
+    goods = make_goods(12)
+    data = {"shop": "Магазин", "categories": categories}
+
+    with pytest.raises(RuntimeError):
+        import_price_list(
+            {**data, "goods": interrupted(goods, 9)},
+            user,
+            fingerprint="new",
+            chunk_size=4,
+        )
+
+    stage = ImportStage.objects.get()
+    assert stage.staged == 8
+    assert ProductInfo.objects.count() == 3
+    assert Shop.objects.get().import_fingerprint == "old"
+
+    checkpoints = []
+    result = import_price_list(
+        {**data, "goods": goods},
+        user,
+        fingerprint="new",
+        chunk_size=4,
+        progress=lambda result: checkpoints.append(result.processed),
+    )
+
+    assert checkpoints == [12]
+    assert result.created == 9
+    assert result.skipped == 3
+    assert ProductInfo.objects.count() == 12
+    assert Shop.objects.get().import_fingerprint == "new"
+    assert not ImportStage.objects.exists()
+    assert not ImportStageItem.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_interrupted_import_of_other_document_starts_over(user):
+    """
+    Проверяет, что незавершённый импорт другого документа не
+    продолжается, а начинается заново.
+    """
+    categories = [{"id": 1, "name": "Категория"}]
+    data = {"shop": "Магазин", "categories": categories}
+    with pytest.raises(RuntimeError):
+        import_price_list(
+            {**data, "goods": interrupted(make_goods(10), 5)},
+            user,
+            fingerprint="first",
+            chunk_size=2,
+        )
+
+    result = import_price_list(
+        {**data, "goods": make_goods(6)},
+        user,
+        fingerprint="second",
+        chunk_size=2,
+    )
+
+    assert result.created == 6
+    assert ProductInfo.objects.count() == 6
+    assert not ImportStage.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_parallel_imports_of_same_shop(user):
+    """
+    Проверяет, что параллельные импорты одного магазина выполняются
+    по очереди: без ошибок уникальности и с каталогом одного из двух
+    прайс-листов целиком.
+    """
+    categories = [{"id": 1, "name": "Категория"}]
+    versions = []
+    for extra in (0, 1000):
+        goods = make_goods(12)
+        for item in goods:
+            item["price"] += extra
+        versions.append(
+            {"shop": "Магазин", "categories": categories, "goods": goods}
+        )
+    barrier = threading.Barrier(len(versions))
+
+    def run(data):
+        barrier.wait()
+        try:
+            return import_price_list(data, user, chunk_size=4)
+        finally:
+            # У каждого потока своё соединение с базой
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=len(versions)) as pool:
+        results = list(pool.map(run, versions))
+
+    assert sorted(result.created for result in results) == [0, 12]
+    assert Shop.objects.count() == 1
+    assert Product.objects.count() == 12
+    prices = sorted(ProductInfo.objects.values_list("price", flat=True))
+    assert prices in (
+        sorted(item["price"] for item in data["goods"]) for data in versions
+    )
+    assert ProductParameter.objects.count() == 12 * 2
+    assert not ImportStage.objects.exists()
@@ -0,0 +1,313 @@
+import base64
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.db import IntegrityError
+
+from backend import jobs
+from backend.importer import ImportResult, PriceListError
+from backend.models import ImportJob, ProductInfo, Shop
+
+from .conftest import SHOP_YAML
+
+
+@pytest.fixture
+def url(price_list_server):
+    """
+    Публикует shop1.yaml на локальном сервере и возвращает ссылку на него.
+    """
+    price_list_server.files["/shop1.yaml"] = SHOP_YAML.read_bytes()
+    return price_list_server.url("/shop1.yaml")
+
+
+def auth_headers():
+    token = base64.b64encode(b"test_user@mail.ru:password").decode()
+    return {"Authorization": f"Basic {token}"}
+
+
+@pytest.mark.django_db
+def test_submissions_are_merged_into_pending_job(user, url):
+    """
+    Проверяет, что повторные загрузки той же ссылки объединяются
+    с ожидающей задачей.
+    """
+    first = jobs.submit_import(user, url)
+    second = jobs.submit_import(user, url)
+
+    first.refresh_from_db()
+    assert first.id == second.id
+    assert first.merged == 1
+    assert ImportJob.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_other_shop_is_not_merged(user, url, price_list_server):
+    """
+    Проверяет, что прайс-лист другого магазина того же пользователя
+    не заменяет ожидающую задачу, а импортируется следом за ней.
+    """
+    other = SHOP_YAML.read_text(encoding="utf-8")
+    price_list_server.files["/other.yaml"] = other.replace(
+        "shop: МВидео", "shop: Другой"
+    ).encode()
+    first = jobs.submit_import(user, url)
+    second = jobs.submit_import(user, price_list_server.url("/other.yaml"))
+
+    assert first.id != second.id
+    assert jobs.process_next_job() == first
+    assert jobs.process_next_job() == second
+    assert jobs.process_next_job() is None
+    assert set(Shop.objects.values_list("name", flat=True)) == {
+        "МВидео",
+        "Другой",
+    }
+
+
+@pytest.mark.django_db
+def test_only_one_running_job_per_shop(user, url):
+    """
+    Проверяет, что пока импорт магазина выполняется, следующая задача
+    этого магазина ждёт в очереди.
+    """
+    running = jobs.submit_import(user, url)
+    assert jobs.claim_next_job() == running
+
+    queued = jobs.submit_import(user, url)
+
+    assert queued.id != running.id
+    assert jobs.claim_next_job() is None
+
+
+@pytest.mark.django_db
+def test_other_sources_run_in_parallel(user, url, price_list_server):
+    """
+    Проверяет, что прайс-листы из разных источников одного пользователя
+    импортируются одновременно.
+    """
+    price_list_server.files["/other.yaml"] = SHOP_YAML.read_bytes()
+    first = jobs.submit_import(user, url)
+    second = jobs.submit_import(user, price_list_server.url("/other.yaml"))
+
+    assert jobs.claim_next_job() == first
+    assert jobs.claim_next_job() == second
+    assert jobs.claim_next_job() is None
+
+
+@pytest.mark.django_db
+def test_failed_job_keeps_progress(user, url, monkeypatch):
+    """
+    Проверяет, что при ошибке импорта счётчики, записанные обработчиком
+    прогресса, сохраняются.
+    """
+
+    def fail(job, progress):
+        progress(ImportResult(processed=5, created=4, skipped=1))
+        raise PriceListError("Broken price list")
+
+    monkeypatch.setattr(jobs, "import_url", fail)
+    jobs.submit_import(user, url)
+
+    job = jobs.process_next_job()
+
+    job.refresh_from_db()
+    assert job.state == "failed"
+    assert job.errors == ["Broken price list"]
+    assert (job.processed, job.created, job.skipped) == (5, 4, 1)
+
+
+@pytest.mark.django_db
+def test_upload_status_endpoint(client, user, url):
+    """
+    Проверяет постановку загрузки в очередь и отчёт о ходе импорта.
+    """
+    response = client.post(
+        "/api/v1/upload/", data={"url": url}, headers=auth_headers()
+    )
+    assert response.status_code == 202
+    job_id = response.json()["job_id"]
+
+    status = client.get(f"/api/v1/upload/{job_id}/", headers=auth_headers())
+    assert status.json()["state"] == "pending"
+
+    jobs.process_next_job()
+
+    status = client.get(f"/api/v1/upload/{job_id}/", headers=auth_headers())
+    data = status.json()
+    assert status.status_code == 200
+    assert data["state"] == "done"
+    assert data["processed"] == ProductInfo.objects.count()
+    assert data["created"] == ProductInfo.objects.count()
+    assert data["errors"] == []
+
+
+@pytest.mark.django_db
+def test_failed_job_reports_error(user, price_list_server):
+    """
+    Проверяет, что ошибка в прайс-листе отражается в задаче.
+    """
+    price_list_server.files["/broken.yaml"] = b"shop: test\ngoods:\n  - id: 1"
+    jobs.submit_import(user, price_list_server.url("/broken.yaml"))
+
+    job = jobs.process_next_job()
+
+    assert job.state == "failed"
+    assert "Missing key" in job.errors[0]
+    assert not ProductInfo.objects.exists()
+
+
+@pytest.mark.django_db
+def test_same_price_list_is_not_reimported(user, url):
+    """
+    Проверяет, что повторная загрузка того же файла завершается
+    без изменений.
+    """
+    jobs.submit_import(user, url)
+    first = jobs.process_next_job()
+    jobs.submit_import(user, url)
+    second = jobs.process_next_job()
+
+    assert first.created == ProductInfo.objects.count()
+    assert not first.unchanged
+    assert second.state == "done"
+    assert second.unchanged
+
+
+@pytest.fixture
+def media_root(settings, tmp_path):
+    """
+    Размещает загруженные файлы во временном каталоге.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    return tmp_path
+
+
+@pytest.mark.django_db
+def test_upload_price_list_file(client, user, media_root):
+    """
+    Проверяет загрузку прайс-листа файлом: файл сохраняется для задачи,
+    импортируется обработчиком очереди и затем удаляется.
+    """
+    upload = SimpleUploadedFile(
+        "shop1.yaml", SHOP_YAML.read_bytes(), "application/x-yaml"
+    )
+    response = client.post(
+        "/api/v1/upload/",
+        data={"file": upload},
+        format="multipart",
+        headers=auth_headers(),
+    )
+    assert response.status_code == 202
+
+    job = ImportJob.objects.get(pk=response.json()["job_id"])
+    assert job.file_name == "shop1.yaml"
+    assert (media_root / job.file.name).exists()
+
+    job = jobs.process_next_job()
+
+    assert job.state == "done"
+    assert job.created == ProductInfo.objects.count() > 0
+    assert not job.file
+    assert not list((media_root / "price_lists").iterdir())
+
+
+@pytest.mark.django_db
+def test_oversized_upload_stops_streaming(
+    client, user, media_root, settings, tmp_path, monkeypatch
+):
+    """
+    Проверяет, что файл сверх PRICE_LIST_MAX_SIZE перестаёт писаться
+    на диск, как только превысит предел, и задача не создаётся.
+    """
+    settings.PRICE_LIST_MAX_SIZE = 1000
+    settings.FILE_UPLOAD_TEMP_DIR = tmp_path / "uploads"
+    settings.FILE_UPLOAD_TEMP_DIR.mkdir()
+    written = []
+    receive = TemporaryFileUploadHandler.receive_data_chunk
+    monkeypatch.setattr(
+        TemporaryFileUploadHandler,
+        "receive_data_chunk",
+        lambda self, data, start: written.append(len(data))
+        or receive(self, data, start),
+    )
+    upload = SimpleUploadedFile("big.yaml", b"x" * 10 * 2**20)
+
+    response = client.post(
+        "/api/v1/upload/",
+        data={"file": upload},
+        format="multipart",
+        headers=auth_headers(),
+    )
+
+    assert response.status_code == 400
+    assert response.json() == {"Error": "File exceeds 1000 bytes."}
+    assert sum(written) <= 1000
+    assert not list(settings.FILE_UPLOAD_TEMP_DIR.iterdir())
+    assert not ImportJob.objects.exists()
+
+
+@pytest.mark.django_db
+def test_failed_submission_deletes_stored_file(user, media_root, monkeypatch):
+    """
+    Проверяет, что файл, не попавший ни в одну задачу, удаляется
+    из хранилища.
+    """
+
+    def fail(*args, **kwargs):
+        raise IntegrityError("duplicate key")
+
+    monkeypatch.setattr(ImportJob, "save", fail)
+
+    with pytest.raises(IntegrityError):
+        jobs.submit_import(
+            user, upload=SimpleUploadedFile("shop.json", b'{"shop": "test"}')
+        )
+
+    assert not list((media_root / "price_lists").iterdir())
+
+
+@pytest.mark.django_db
+def test_upload_file_replaces_pending_file(
+    user, url, media_root, django_capture_on_commit_callbacks
+):
+    """
+    Проверяет, что файл с тем же именем заменяет файл ожидающей задачи,
+    а задача по ссылке остаётся отдельной.
+    """
+    by_url = jobs.submit_import(user, url)
+    first = jobs.submit_import(
+        user, upload=SimpleUploadedFile("shop.json", b'{"shop": "test"}')
+    )
+    old_name = first.file.name
+
+    with django_capture_on_commit_callbacks(execute=True):
+        second = jobs.submit_import(
+            user, upload=SimpleUploadedFile("shop.json", b'{"shop": "new"}')
+        )
+
+    assert first.id == second.id != by_url.id
+    assert second.file_name == "shop.json"
+    assert second.file.read() == b'{"shop": "new"}'
+    assert not (media_root / old_name).exists()
+
+
+@pytest.mark.django_db
+def test_interrupted_jobs_are_requeued(user, url):
+    """
+    Проверяет, что прерванная задача возвращается в очередь, а если
+    магазин успел загрузить новый прайс-лист, завершается с ошибкой.
+    """
+    interrupted = jobs.submit_import(user, url)
+    jobs.claim_next_job()
+
+    assert jobs.requeue_interrupted_jobs() == 1
+    interrupted.refresh_from_db()
+    assert interrupted.state == "pending"
+
+    jobs.claim_next_job()
+    newer = jobs.submit_import(user, url)
+
+    assert jobs.requeue_interrupted_jobs() == 0
+    interrupted.refresh_from_db()
+    assert interrupted.state == "failed"
+    assert jobs.process_next_job() == newer
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from backend.models import ProductInfo, Order, OrderItem
+from users.models import CustomUser, Contact
+
+
+STATUSES = ["new", "confirmed", "sent", "delivered", "canceled"]
+
+
+@pytest.fixture
+def buyer(client, catalog):
+    """
+    Покупатель после импорта shop1.yaml.
+    """
+    user = CustomUser.objects.create_user(
+        email="buyer@mail.ru", password="password", is_active=True
+    )
+    Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    client.force_authenticate(user)
+    return user
+
+
+def make_orders(user, count, start=None):
+    """
+    Создаёт count заказов с 0..2 позициями, статусами по кругу и датами
+    по часу назад от start; возвращает их от новых к старым.
+    """
+    start = start or timezone.now()
+    offers = list(ProductInfo.objects.order_by("id")[:2])
+    orders = []
+    for number in range(count):
+        order = Order.objects.create(
+            user=user,
+            contact=user.contacts.first(),
+            status=STATUSES[number % len(STATUSES)],
+        )
+        for quantity, offer in enumerate(offers[: number % 3], start=1):
+            OrderItem.objects.create(
+                order=order,
+                product=offer.product,
+                shop=offer.shop,
+                quantity=quantity,
+            )
+        order.dt = start - timedelta(hours=number)
+        Order.objects.filter(pk=order.pk).update(dt=order.dt)
+        orders.append(order)
+    return orders
+
+
+def pages(client, url):
+    """
+    Проходит все страницы списка по ссылкам next.
+    """
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids += [order["id"] for order in response.data["results"]]
+        url = response.data["next"]
+    return ids
+
+
+@pytest.mark.django_db
+def test_list_counts_totals_in_one_query(client, buyer):
+    make_orders(buyer, 3)
+    with CaptureQueriesContext(connection) as few:
+        client.get("/api/v1/orders/")
+    make_orders(buyer, 30)
+    with CaptureQueriesContext(connection) as many:
+        response = client.get("/api/v1/orders/")
+
+    # Отметка ETag и страница заказов с суммами
+    assert len(few) == len(many) == 2
+    for row in response.data["results"]:
+        items = OrderItem.objects.filter(order_id=row["id"])
+        assert row["items_count"] == items.count()
+        assert row["total_sum"] == sum(
+            (item.total_price for item in items), Decimal(0)
+        )
+
+
+@pytest.mark.django_db
+def test_detail_totals_from_prefetched_items(client, buyer):
+    order = make_orders(buyer, 3)[2]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(f"/api/v1/order/{order.id}/")
+
+    items = OrderItem.objects.filter(order=order)
+    assert response.data["items_count"] == 2
+    assert response.data["total_sum"] == sum(
+        item.total_price for item in items
+    )
+    # Отметка ETag, заказ, его позиции и их товары
+    assert len(queries) == 4
+
+
+@pytest.mark.django_db
+def test_cursor_pages_cover_all_orders(client, buyer):
+    orders = make_orders(buyer, 7)
+    # Заказы в пределах одной миллисекунды
+    moment = timezone.make_aware(datetime(2024, 9, 1, 12, 0, 0, 100))
+    for offset, order in enumerate(orders[4:]):
+        Order.objects.filter(pk=order.pk).update(
+            dt=moment + timedelta(microseconds=offset)
+        )
+
+    ids = pages(client, "/api/v1/orders/?page_size=2")
+
+    assert ids == list(
+        Order.objects.order_by("-dt", "-id").values_list("id", flat=True)
+    )
+
+
+@pytest.mark.django_db
+def test_filter_by_status(client, buyer):
+    make_orders(buyer, 10)
+
+    ids = pages(client, "/api/v1/orders/?status=new,sent&page_size=3")
+
+    assert sorted(ids) == sorted(
+        Order.objects.filter(status__in=["new", "sent"]).values_list(
+            "id", flat=True
+        )
+    )
+    response = client.get("/api/v1/orders/?status=lost")
+    assert response.status_code == 400
+    assert response.data == {"Error": "Unknown order status: lost"}
+
+
+@pytest.mark.django_db
+def test_filter_by_date_range(client, buyer, settings):
+    settings.TIME_ZONE = "UTC"
+    start = timezone.make_aware(datetime(2024, 9, 3, 1, 0))
+    make_orders(buyer, 50, start=start)
+
+    response = client.get(
+        "/api/v1/orders/",
+        {"date_from": "2024-09-02", "date_to": "2024-09-02"},
+    )
+
+    dates = {row["dt"][:10] for row in response.data["results"]}
+    assert dates == {"2024-09-02"}
+    assert len(response.data["results"]) == 24
+
+    response = client.get(
+        "/api/v1/orders/", {"date_from": "2024-09-02T23:30:00"}
+    )
+    assert len(response.data["results"]) == 2
+
+    response = client.get("/api/v1/orders/", {"date_to": "вчера"})
+    assert response.status_code == 400
+    assert response.data == {
+        "Error": "date_to must be a date or a date and time"
+    }
@@ -0,0 +1,142 @@
+import gzip
+import io
+import json
+import types
+
+import pytest
+from yaml import load as yaml_load, Loader
+
+from backend.pricelist import (
+    read_json,
+    read_yaml,
+    read_price_list,
+    detect_format,
+)
+
+from .conftest import SHOP_YAML
+
+
+def test_read_yaml_matches_full_load():
+    """
+    Проверяет, что потоковый разбор даёт те же данные, что и загрузка
+    документа целиком, а товары выдаются генератором.
+    """
+    expected = yaml_load(SHOP_YAML.read_bytes(), Loader=Loader)
+
+    with open(SHOP_YAML, "rb") as f:
+        data = read_yaml(f)
+        assert isinstance(data["goods"], types.GeneratorType)
+        assert data["shop"] == expected["shop"]
+        assert data["categories"] == expected["categories"]
+        assert list(data["goods"]) == expected["goods"]
+
+
+def test_read_yaml_categories_after_goods():
+    """
+    Проверяет разбор документа, в котором категории идут после товаров.
+    """
+    data = read_yaml(
+        io.BytesIO(
+            "shop: Тест\n"
+            "goods:\n"
+            "  - {id: 1, category: 10, parameters: &p {Цвет: белый}}\n"
+            "  - {id: 2, category: 10, parameters: *p}\n"
+            "categories:\n"
+            "  - {id: 10, name: Категория}\n".encode()
+        )
+    )
+
+    assert data["categories"] == [{"id": 10, "name": "Категория"}]
+    assert [item["parameters"] for item in data["goods"]] == [
+        {"Цвет": "белый"},
+        {"Цвет": "белый"},
+    ]
+
+
+def test_read_json_streams_goods():
+    """
+    Проверяет, что товары JSON выдаются генератором и совпадают
+    с загрузкой документа целиком, в том числе когда категории идут
+    после товаров.
+    """
+    expected = yaml_load(SHOP_YAML.read_bytes(), Loader=Loader)
+    reordered = {
+        "goods": expected["goods"],
+        "shop": expected["shop"],
+        "categories": expected["categories"],
+    }
+
+    for document in (expected, reordered):
+        content = json.dumps(document, ensure_ascii=False).encode()
+        data = read_json(io.BytesIO(content))
+        assert isinstance(data["goods"], types.GeneratorType)
+        assert data["shop"] == expected["shop"]
+        assert data["categories"] == expected["categories"]
+        assert list(data["goods"]) == expected["goods"]
+
+    with pytest.raises(ValueError):
+        read_json(io.BytesIO(b"[1, 2]"))
+
+
+def test_detect_format():
+    """
+    Проверяет определение формата по типу содержимого и расширению.
+    """
+    assert detect_format("application/json; charset=utf-8") == ("json", False)
+    assert detect_format("text/plain", "/feeds/shop.csv") == ("csv", False)
+    assert detect_format("", "shop.yaml.gz") == ("yaml", True)
+    assert detect_format("application/gzip", "shop") == (None, True)
+
+
+def test_read_price_list_json_and_gzip():
+    """
+    Проверяет, что JSON и сжатый gzip JSON без явного формата дают те же
+    товары, что и YAML.
+    """
+    expected = yaml_load(SHOP_YAML.read_bytes(), Loader=Loader)
+    content = json.dumps(expected, ensure_ascii=False).encode()
+
+    for stream in (io.BytesIO(content), io.BytesIO(gzip.compress(content))):
+        data = read_price_list(stream)
+        assert data["shop"] == expected["shop"]
+        assert list(data["goods"]) == expected["goods"]
+
+
+def test_read_price_list_csv():
+    """
+    Проверяет разбор плоского CSV: категории собираются из строк, пустые
+    ячейки параметров пропускаются.
+    """
+    content = (
+        "shop;category;category_name;id;name;model;price;price_rrc;"
+        "quantity;Цвет;Вес\n"
+        "Тест;10;Телефоны;1;Телефон;m-1;100;110;5;белый;\n"
+        "Тест;10;;2;Чехол;m-2;10;12;50;черный;30\n"
+    ).encode()
+
+    data = read_price_list(io.BytesIO(gzip.compress(content)), name="p.csv.gz")
+
+    assert data["shop"] == "Тест"
+    assert data["categories"] == [{"id": 10, "name": "Телефоны"}]
+    assert list(data["goods"]) == [
+        {
+            "id": 1,
+            "category": 10,
+            "name": "Телефон",
+            "model": "m-1",
+            "price": 100,
+            "price_rrc": 110,
+            "quantity": 5,
+            "parameters": {"Цвет": "белый"},
+        },
+        {
+            "id": 2,
+            "category": 10,
+            "name": "Чехол",
+            "model": "m-2",
+            "price": 10,
+            "price_rrc": 12,
+            "quantity": 50,
+            "parameters": {"Цвет": "черный", "Вес": "30"},
+        },
+    ]
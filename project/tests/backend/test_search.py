@@ -0,0 +1,175 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+
+from backend.models import Shop, Category, Product, ProductInfo, CatalogEntry
+
+
+def search(client, terms, **params):
+    response = client.get(
+        "/api/v1/products/",
+        {"search": terms, "search_mode": "fulltext", **params},
+    )
+    assert response.status_code == 200
+    return [row["product"]["name"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_import_fills_catalog(catalog):
+    assert CatalogEntry.objects.count() == ProductInfo.objects.count()
+    assert not CatalogEntry.objects.filter(search_vector=None).exists()
+
+
+@pytest.mark.django_db
+def test_rebuilt_search_vectors_match_imported(catalog):
+    """
+    Проверяет, что документ, записанный при импорте, совпадает
+    с пересчитанным по столбцам каталога.
+    """
+    imported = dict(CatalogEntry.objects.values_list("pk", "search_vector"))
+
+    call_command("rebuild_search_vectors", stdout=StringIO())
+
+    assert (
+        dict(CatalogEntry.objects.values_list("pk", "search_vector"))
+        == imported
+    )
+
+
+@pytest.mark.django_db
+def test_fulltext_search_matches_word_forms_and_prefixes(client, catalog):
+    """
+    Проверяет поиск по словоформам, началу слова и названию магазина.
+    """
+    assert search(client, "наушник") == [
+        "Наушники Sony WH-1000XM4",
+        "Наушники Bose QuietComfort 45",
+    ]
+    assert search(client, "игровых консолей sony") == [
+        "Игровая консоль Sony PlayStation 5"
+    ]
+    assert search(client, "смарт-час") == [
+        "Смарт-часы Samsung Galaxy Watch 4",
+        "Смарт-часы Apple Watch Series 7",
+    ]
+    assert len(search(client, "мвидео")) == ProductInfo.objects.count()
+
+
+@pytest.mark.django_db
+def test_fulltext_search_ranks_name_above_category(client):
+    """
+    Проверяет, что совпадение в названии товара важнее совпадения
+    в категории.
+    """
+    shop = Shop.objects.create(name="Магазин")
+    phones = Category.objects.create(external_id=1, name="Телефоны")
+    cases = Category.objects.create(external_id=2, name="Чехлы")
+    for i, (name, category) in enumerate(
+        [("Чехол для телефона", cases), ("Смартфон Pixel", phones)]
+    ):
+        ProductInfo.objects.create(
+            product=Product.objects.create(name=name, category=category),
+            shop=shop,
+            external_id=i,
+            model="",
+            quantity=1,
+            price=1,
+            price_rrc=1,
+        )
+    call_command("rebuild_catalog", stdout=StringIO())
+
+    assert search(client, "телефон") == [
+        "Чехол для телефона",
+        "Смартфон Pixel",
+    ]
+
+
+@pytest.mark.django_db
+def test_fulltext_search_pages_by_rank(client, catalog):
+    """
+    Проверяет постраничный вывод результатов, отсортированных
+    по релевантности.
+    """
+    expected = search(client, "мвидео", page_size=100)
+
+    names = []
+    response = client.get(
+        "/api/v1/products/",
+        {"search": "мвидео", "search_mode": "fulltext", "page_size": 2},
+    )
+    while True:
+        names += [row["product"]["name"] for row in response.data["results"]]
+        if not response.data["next"]:
+            break
+        response = client.get(response.data["next"])
+
+    assert names == expected
+
+
+@pytest.mark.django_db
+def test_unknown_search_mode_is_rejected(client, catalog):
+    response = client.get(
+        "/api/v1/products/", {"search": "sony", "search_mode": "regex"}
+    )
+
+    assert response.status_code == 400
+    assert response.data == {"Error": "Unknown search mode: regex"}
+
+
+def fuzzy(client, terms, **params):
+    response = client.get(
+        "/api/v1/products/",
+        {"search": terms, "search_mode": "fuzzy", **params},
+    )
+    assert response.status_code == 200
+    return [row["model"] for row in response.data["results"]]
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_tolerates_typos_and_fragments(client, catalog):
+    """
+    Проверяет нечёткий поиск по фрагменту модели и по строке
+    с опечатками.
+    """
+    assert fuzzy(client, "xps-13")[0] == "dell/xps-13-9310"
+    assert fuzzy(client, "playstaton")[0] == "sony/playstation-5"
+    assert fuzzy(client, "galaxy wacth")[0] == "samsung/galaxy-watch-4"
+    assert fuzzy(client, "Наушнки")[:2] == [
+        "sony/wh-1000xm4",
+        "bose/quietcomfort-45",
+    ]
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_threshold(client, catalog):
+    """
+    Проверяет, что порог сходства отсекает слабые совпадения.
+    """
+    assert len(fuzzy(client, "sony xbox", min_similarity=0.2)) > 1
+    assert fuzzy(client, "sony xbox", min_similarity=0.9) == []
+
+    response = client.get(
+        "/api/v1/products/",
+        {"search": "sony", "search_mode": "fuzzy", "min_similarity": 2},
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.django_db
+def test_fuzzy_search_keeps_session_threshold(client, catalog):
+    """
+    Проверяет, что порог запроса не меняет порог оператора %> на
+    соединении, которое переиспользуют следующие запросы.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+        before = cursor.fetchone()[0]
+
+    assert fuzzy(client, "sony xbox", min_similarity=0.2)
+    assert fuzzy(client, "playstaton", min_similarity=0.9) == []
+
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW pg_trgm.word_similarity_threshold")
+        assert cursor.fetchone()[0] == before
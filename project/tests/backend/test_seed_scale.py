@@ -0,0 +1,83 @@
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from backend.models import (
+    Shop,
+    Product,
+    ProductInfo,
+    ProductParameter,
+    Order,
+    OrderItem,
+)
+from users.models import CustomUser, Contact
+
+
+SEED_ARGS = (
+    "--shops=3",
+    "--categories=4",
+    "--products=50",
+    "--offers=2",
+    "--parameters=3",
+    "--buyers=5",
+    "--orders=20",
+    "--batch-size=16",
+)
+
+
+def snapshot():
+    """
+    Возвращает содержимое сгенерированных таблиц без первичных ключей.
+    """
+    return (
+        list(
+            ProductInfo.objects.order_by(
+                "shop__name", "external_id"
+            ).values_list("shop__name", "product__name", "price", "quantity")
+        ),
+        list(
+            Order.objects.order_by("dt").values_list(
+                "user__email", "status", "dt"
+            )
+        ),
+    )
+
+
+@pytest.mark.django_db
+def test_seed_scale_generates_requested_rows():
+    """
+    Проверяет количество сгенерированных строк.
+    """
+    out = StringIO()
+    call_command("seed_scale", *SEED_ARGS, stdout=out)
+
+    assert Shop.objects.count() == 3
+    assert Product.objects.count() == 50
+    assert ProductInfo.objects.count() == 100
+    assert ProductParameter.objects.count() == 300
+    assert CustomUser.objects.filter(type="buyer").count() == 5
+    assert Contact.objects.count() == 5
+    assert Order.objects.count() == 20
+    assert OrderItem.objects.count() >= 20
+    assert "Total:" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_seed_scale_is_deterministic():
+    """
+    Проверяет, что одно зерно даёт одинаковые данные, а повторный запуск
+    на заполненной базе отклоняется.
+    """
+    call_command("seed_scale", *SEED_ARGS, stdout=StringIO())
+    first = snapshot()
+
+    with pytest.raises(CommandError):
+        call_command("seed_scale", *SEED_ARGS, stdout=StringIO())
+
+    CustomUser.objects.all().delete()
+    Product.objects.all().delete()
+    call_command("seed_scale", *SEED_ARGS, stdout=StringIO())
+
+    assert snapshot() == first
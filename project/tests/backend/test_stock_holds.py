@@ -0,0 +1,184 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from backend.models import ProductInfo, Order, OrderItem, StockHold
+from backend.stock import release_expired_holds
+from users.models import CustomUser, Contact
+
+
+@pytest.fixture(autouse=True)
+def outbox(monkeypatch):
+    monkeypatch.setattr(
+        "backend.views.send_confirmed_order", lambda summary, recipient: None
+    )
+
+
+@pytest.fixture
+def offer(catalog):
+    """
+    Импортирует shop1.yaml и оставляет у первой позиции 3 шт.
+    """
+    offer = ProductInfo.objects.order_by("id").first()
+    ProductInfo.objects.filter(pk=offer.pk).update(quantity=3)
+    return offer
+
+
+def buyer(email):
+    user = CustomUser.objects.create_user(
+        email=email, password="password", is_active=True
+    )
+    contact = Contact.objects.create(
+        city="test", street="test", house="test", phone="test", user=user
+    )
+    client = APIClient()
+    client.force_authenticate(user)
+    return client, contact
+
+
+def add(client, contact, offer, quantity):
+    return client.post(
+        "/api/v1/add_order_items/",
+        {
+            "contact": contact.id,
+            "order_items": [
+                {
+                    "product": {"id": offer.product_id},
+                    "quantity": quantity,
+                    "shop": offer.shop_id,
+                }
+            ],
+        },
+    )
+
+
+def stock(offer):
+    return ProductInfo.objects.values_list("quantity", "reserved").get(
+        pk=offer.pk
+    )
+
+
+@pytest.mark.django_db
+def test_basket_holds_stock(offer, settings):
+    settings.STOCK_HOLD_TTL = 60
+    first, first_contact = buyer("first@mail.ru")
+    second, second_contact = buyer("second@mail.ru")
+
+    assert add(first, first_contact, offer, 2).status_code == 201
+
+    assert stock(offer) == (3, 2)
+    hold = StockHold.objects.get()
+    assert hold.offer_id == offer.pk
+    assert hold.quantity == 2
+    assert hold.expires_at > timezone.now() + timedelta(seconds=50)
+
+    response = add(second, second_contact, offer, 2)
+
+    assert response.status_code == 403
+    assert response.data == {
+        "Error": f"Insufficient stock for {offer.product.name}. "
+        "Available: 1"
+    }
+    assert add(first, first_contact, offer, 1).status_code == 201
+    assert stock(offer) == (3, 3)
+    assert StockHold.objects.get().quantity == 3
+
+
+@pytest.mark.django_db
+def test_sweeper_releases_expired_holds(offer):
+    first, first_contact = buyer("first@mail.ru")
+    second, second_contact = buyer("second@mail.ru")
+    add(first, first_contact, offer, 2)
+    add(second, second_contact, offer, 1)
+    StockHold.objects.filter(item__order__contact=first_contact).update(
+        expires_at=timezone.now() - timedelta(seconds=1)
+    )
+
+    assert release_expired_holds() == 2
+
+    assert stock(offer) == (3, 1)
+    assert StockHold.objects.get().item.order.contact == second_contact
+    # Строка без резерва при следующем добавлении резервируется целиком
+    assert add(second, second_contact, offer, 1).status_code == 201
+    response = add(first, first_contact, offer, 1)
+    assert response.status_code == 403
+    assert response.data["Error"].endswith("Available: 0")
+    assert stock(offer) == (3, 2)
+
+
+@pytest.mark.django_db
+def test_confirmation_converts_holds(offer):
+    client, contact = buyer("buyer@mail.ru")
+    add(client, contact, offer, 2)
+    order = Order.objects.get()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.put(
+            f"/api/v1/confirm/{order.id}/", {"status": "confirm"}
+        )
+
+    assert response.status_code == 200
+    assert stock(offer) == (1, 0)
+    assert not StockHold.objects.exists()
+    # Остатки позиций не читаются: только блокировка и UPDATE
+    table = ProductInfo._meta.db_table
+    assert not [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith("SELECT")
+        and f'"{table}"."quantity"' in query["sql"]
+    ]
+
+
+@pytest.mark.django_db
+def test_confirmation_after_expiry_takes_free_stock(offer):
+    client, contact = buyer("buyer@mail.ru")
+    add(client, contact, offer, 2)
+    order = Order.objects.get()
+    StockHold.objects.update(expires_at=timezone.now())
+    release_expired_holds()
+    ProductInfo.objects.filter(pk=offer.pk).update(quantity=1)
+
+    response = client.put(
+        f"/api/v1/confirm/{order.id}/", {"status": "confirm"}
+    )
+
+    assert response.status_code == 403
+    assert response.data["Error"].endswith("Available: 1")
+    assert stock(offer) == (1, 0)
+
+
+@pytest.mark.django_db
+def test_deleting_line_releases_hold(offer):
+    client, contact = buyer("buyer@mail.ru")
+    add(client, contact, offer, 2)
+
+    response = client.delete(
+        f"/api/v1/delete_order_item/{OrderItem.objects.get().pk}/"
+    )
+
+    assert response.status_code == 204
+    assert stock(offer) == (3, 0)
+    assert not StockHold.objects.exists()
+
+
+@pytest.mark.django_db
+def test_cascade_delete_releases_holds(offer):
+    client, contact = buyer("buyer@mail.ru")
+    add(client, contact, offer, 2)
+    other, other_contact = buyer("other@mail.ru")
+    add(other, other_contact, offer, 1)
+    assert stock(offer) == (3, 3)
+
+    # Контакт удаляется вместе с заказом, строкой и её резервом
+    response = client.delete(f"/api/v1/delete_contact/{contact.id}/")
+    assert response.status_code == 204
+    assert stock(offer) == (3, 1)
+
+    CustomUser.objects.get(email="other@mail.ru").delete()
+    assert stock(offer) == (3, 0)
+    assert not StockHold.objects.exists()
@@ -40,7 +40,7 @@ def send_confirmed_order(order_info, recipient):
     for product_name, details in order_info["products"].items():
         products_description += (
             f"{product_name} x {details['quantity']}, "
-            f"итоговая стоимость: {details['total price']}, "
+            f"итоговая стоимость: {details['total_price']}, "
             f"идентификатор товара: {details['id']}\n"
         )
 
@@ -0,0 +1,216 @@
+# Generated by Django 5.1.1 on 2026-10-18 06:26
+
+import django.db.models.deletion
+import django.utils.timezone
+import users.managers
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CustomUser",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("password", models.CharField(max_length=128, verbose_name="password")),
+                (
+                    "last_login",
+                    models.DateTimeField(
+                        blank=True, null=True, verbose_name="last login"
+                    ),
+                ),
+                (
+                    "is_superuser",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates that this user has all permissions without explicitly assigning them.",
+                        verbose_name="superuser status",
+                    ),
+                ),
+                (
+                    "first_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="first name"
+                    ),
+                ),
+                (
+                    "last_name",
+                    models.CharField(
+                        blank=True, max_length=150, verbose_name="last name"
+                    ),
+                ),
+                (
+                    "is_staff",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Designates whether the user can log into this admin site.",
+                        verbose_name="staff status",
+                    ),
+                ),
+                (
+                    "date_joined",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now, verbose_name="date joined"
+                    ),
+                ),
+                (
+                    "email",
+                    models.EmailField(
+                        max_length=254, unique=True, verbose_name="email_address"
+                    ),
+                ),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("buyer", "Покупатель"), ("shop", "Магазин")],
+                        default="buyer",
+                        max_length=5,
+                        verbose_name="Тип пользователя",
+                    ),
+                ),
+                (
+                    "is_active",
+                    models.BooleanField(
+                        default=False,
+                        help_text="Определяет, активен ли пользователь. Для деактивации аккаунта лучше снять галочку, чем удалять его.",
+                        verbose_name="active",
+                    ),
+                ),
+                (
+                    "groups",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="The groups this user belongs to. A user will get all permissions granted to each of their groups.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.group",
+                        verbose_name="groups",
+                    ),
+                ),
+                (
+                    "user_permissions",
+                    models.ManyToManyField(
+                        blank=True,
+                        help_text="Specific permissions for this user.",
+                        related_name="user_set",
+                        related_query_name="user",
+                        to="auth.permission",
+                        verbose_name="user permissions",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Пользователь",
+                "verbose_name_plural": "Список пользователей",
+                "ordering": ("email",),
+            },
+            managers=[
+                ("objects", users.managers.CustomUserManager()),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ConfirmToken",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "token",
+                    models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+                ),
+                ("dt", models.DateTimeField(auto_now_add=True)),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="tokens",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Токен подтверждения",
+                "verbose_name_plural": "Список токенов подтверждения",
+            },
+        ),
+        migrations.CreateModel(
+            name="Contact",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("city", models.CharField(max_length=50, verbose_name="Город")),
+                ("street", models.CharField(max_length=100, verbose_name="Улица")),
+                (
+                    "house",
+                    models.CharField(blank=True, max_length=20, verbose_name="Дом"),
+                ),
+                (
+                    "structure",
+                    models.CharField(blank=True, max_length=20, verbose_name="Корпус"),
+                ),
+                (
+                    "building",
+                    models.CharField(
+                        blank=True, max_length=20, verbose_name="Строение"
+                    ),
+                ),
+                (
+                    "apartment",
+                    models.CharField(
+                        blank=True, max_length=20, verbose_name="Квартира"
+                    ),
+                ),
+                ("phone", models.CharField(max_length=20, verbose_name="Телефон")),
+                (
+                    "additional_desc",
+                    models.TextField(
+                        blank=True, null=True, verbose_name="Дополнительная информация"
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="contacts",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Пользователь",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Контактная информация",
+                "verbose_name_plural": "Список контактной информации",
+                "ordering": ("-city",),
+            },
+        ),
+    ]